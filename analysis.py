@@ -0,0 +1,141 @@
+import os
+import math
+import numpy as np
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+from waveform import read_wav_layout, normalize
+
+BLOCK_FRAMES = 1 << 20 # ~24s at 44.1 kHz per memory-mapped block
+WINDOW_MS = 10 # Silence detection resolution
+SILENCE_DB = -50.0
+TRUNCATION_TOLERANCE = 2.0 # seconds
+
+def to_db(value):
+    return 20 * math.log10(value) if value > 0 else float('-inf')
+
+def analyze_wav(path, expected_duration=None, silence_db=SILENCE_DB):
+    """
+    Streams a WAV file through a memory map in fixed-size blocks and returns
+    duration, RMS/peak level and leading/trailing silence. Memory use is
+    bounded by BLOCK_FRAMES regardless of file size.
+    """
+    dtype, channels, sample_rate, data_offset, frames = read_wav_layout(path)
+    window = max(1, sample_rate * WINDOW_MS // 1000)
+    threshold = 10 ** (silence_db / 20)
+
+    sum_squares = 0.0
+    peak = 0.0
+    first_loud = None # Frame index of first window above the threshold
+    last_loud = None # Frame index just after the last loud window
+
+    if frames:
+        data = np.memmap(path, dtype=dtype, mode='r', offset=data_offset, shape=(frames, channels))
+        block_frames = BLOCK_FRAMES - BLOCK_FRAMES % window
+        for start in range(0, frames, block_frames):
+            block = normalize(data[start:start + block_frames], dtype)
+            sum_squares += float(np.square(block, dtype=np.float64).sum())
+            block_peak = float(np.abs(block).max())
+            peak = max(peak, block_peak)
+
+            # Per-window peaks; the last window of the file may be short
+            count = -(-len(block) // window)
+            padded = np.zeros((count * window, channels), dtype=np.float32)
+            padded[:len(block)] = block
+            window_peaks = np.abs(padded).reshape(count, window * channels).max(axis=1)
+            loud = np.flatnonzero(window_peaks > threshold)
+            if len(loud):
+                if first_loud is None:
+                    first_loud = start + int(loud[0]) * window
+                last_loud = min(frames, start + (int(loud[-1]) + 1) * window)
+        del data
+
+    duration = frames / sample_rate if sample_rate else 0.0
+    rms = math.sqrt(sum_squares / (frames * channels)) if frames else 0.0
+    silent = first_loud is None
+
+    result = {
+        'duration': duration,
+        'rms_db': to_db(rms),
+        'peak_db': to_db(peak),
+        'leading_silence': duration if silent else first_loud / sample_rate,
+        'trailing_silence': duration if silent else (frames - last_loud) / sample_rate,
+        'silent': silent,
+        'truncated': bool(expected_duration) and duration < expected_duration - TRUNCATION_TOLERANCE,
+        'sample_rate': sample_rate,
+        'channels': channels,
+    }
+    return result
+
+# --- Process Pool ---
+_executor = None
+
+def get_executor():
+    # Analysis is CPU-bound NumPy work; keep it off the GUI and download threads
+    global _executor
+    if _executor is None:
+        # spawn, not fork: forking a process with live Qt threads can deadlock
+        _executor = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) // 2),
+                                        mp_context=multiprocessing.get_context('spawn'))
+    return _executor
+
+class AnalysisSignals(QObject):
+    finished = pyqtSignal(str, dict) # path, result
+    error = pyqtSignal(str, str) # path, message
+
+_pending = set() # Signals awaiting delivery; kept alive here until they have fired
+
+def submit_analysis(path, expected_duration=None, on_finished=None, on_error=None):
+    """
+    Queues analysis in the process pool. on_finished(path, result) or
+    on_error(path, message) is called on the GUI thread when it is done.
+    They are connected before the job is submitted, so a result that is
+    ready at once (e.g. a broken pool) isn't lost.
+    """
+    signals = AnalysisSignals()
+    if on_finished:
+        signals.finished.connect(on_finished)
+    if on_error:
+        signals.error.connect(on_error)
+    # Connected last, so the signals outlive the caller's slots
+    signals.finished.connect(lambda *_: _pending.discard(signals))
+    signals.error.connect(lambda *_: _pending.discard(signals))
+    _pending.add(signals)
+
+    try:
+        future = get_executor().submit(analyze_wav, path, expected_duration)
+    except Exception as e: # Pool broken or shut down
+        signals.error.emit(path, str(e))
+        return signals
+
+    def on_done(done):
+        try:
+            signals.finished.emit(path, done.result())
+        except Exception as e:
+            signals.error.emit(path, str(e))
+
+    future.add_done_callback(on_done)
+    return signals
+
+def summarize(result):
+    """Short human-readable summary and list of warnings for the UI."""
+    minutes, seconds = divmod(int(result['duration']), 60)
+    summary = f"{minutes}:{seconds:02} · RMS {result['rms_db']:.1f} dB · Peak {result['peak_db']:.1f} dB"
+
+    warnings = []
+    if result['silent']:
+        warnings.append("Silent")
+    else:
+        if result['leading_silence'] >= 1:
+            warnings.append(f"Lead silence {result['leading_silence']:.1f}s")
+        if result['trailing_silence'] >= 1:
+            warnings.append(f"Tail silence {result['trailing_silence']:.1f}s")
+    if result['truncated']:
+        warnings.append("Truncated")
+    return summary, warnings
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+from bandwidth import limiter
+
+try:
+    import aiohttp
+except ImportError: # Optional; callers fall back to QThreadPool workers
+    aiohttp = None
+
+BATCH_INTERVAL = 0.05 # Seconds between result batches sent to Qt
+MAX_CONNECTIONS = 256
+MAX_PER_HOST = 16
+
+class AsyncFetcher(QObject):
+    """
+    One background thread running an asyncio loop with a pooled keep-alive
+    aiohttp session. Hundreds of small GETs (thumbnails, metadata) are
+    multiplexed over a few connections per host, optionally post-processed
+    on a small executor, and delivered to Qt in batches.
+    """
+    batchReady = pyqtSignal(list) # [(tag, result), ...]
+
+    def __init__(self, max_per_host=MAX_PER_HOST, max_connections=MAX_CONNECTIONS, batch_interval=BATCH_INTERVAL):
+        super().__init__()
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is not installed.")
+        self.max_per_host = max_per_host
+        self.max_connections = max_connections
+        self.batch_interval = batch_interval
+        self.loop = asyncio.new_event_loop()
+        self.pending = [] # Results waiting for the next batch
+        self.pending_lock = threading.Lock()
+        self.flush_scheduled = False
+        self.session = None
+
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self.run_loop, args=(ready,), daemon=True)
+        self.thread.start()
+        ready.wait()
+
+    def run_loop(self, ready):
+        asyncio.set_event_loop(self.loop)
+
+        async def create_session():
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_per_host,
+                                             keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector,
+                                                 timeout=aiohttp.ClientTimeout(total=20))
+
+        self.loop.run_until_complete(create_session())
+        ready.set()
+        self.loop.run_forever()
+
+    def fetch(self, url, tag, processor=None, token=None):
+        """
+        Thread-safe. Queues a GET; when done, (tag, result) is delivered via
+        batchReady, where result is processor(bytes) or the bytes, or None on
+        failure. Returns a concurrent Future that can be cancelled; with a
+        CancelToken, cancelling the token cancels it (nothing is delivered).
+        """
+        future = asyncio.run_coroutine_threadsafe(self.get(url, tag, processor), self.loop)
+        if token:
+            remove = token.on_cancel(future.cancel)
+            future.add_done_callback(lambda _: remove())
+        return future
+
+    async def get(self, url, tag, processor):
+        result = None
+        try:
+            # The connector caps connections per host; extra requests queue there
+            async with self.session.get(url) as response:
+                if response.status == 200:
+                    result = await response.read()
+            if result is not None and limiter.limit_thumbnails:
+                await self.loop.run_in_executor(None, limiter.consume, len(result))
+            if result is not None and processor:
+                # CPU work (decode/scale) stays off the event loop
+                result = await self.loop.run_in_executor(None, processor, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            result = None
+        self.deliver(tag, result)
+
+    def deliver(self, tag, result):
+        with self.pending_lock:
+            self.pending.append((tag, result))
+            if self.flush_scheduled:
+                return
+            self.flush_scheduled = True
+        self.loop.call_later(self.batch_interval, self.flush)
+
+    def flush(self):
+        with self.pending_lock:
+            batch, self.pending = self.pending, []
+            self.flush_scheduled = False
+        if batch:
+            self.batchReady.emit(batch) # Queued onto the GUI thread
+
+    def close(self):
+        async def shutdown():
+            await self.session.close()
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
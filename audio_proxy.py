@@ -0,0 +1,357 @@
+import os
+import re
+import json
+import bisect
+import threading
+import mimetypes
+import requests
+from PyQt6.QtCore import QStandardPaths
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CHUNK_SIZE = 256 * 1024
+MAX_CACHE_BYTES = 2 * 1024 * 1024 * 1024 # 2 GB
+
+def cache_key(video_id, format_id):
+    safe_format = re.sub(r'[^A-Za-z0-9_-]', '_', str(format_id or 'best'))
+    return f"{video_id}-{safe_format}"
+
+def preview_cache_dir():
+    cache_root = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    return os.path.join(cache_root, "preview_cache")
+
+# One RangeCache per entry per process, shared by the proxy and downloaders
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_range_cache(directory, key):
+    with _caches_lock:
+        path = os.path.join(directory, key)
+        if path not in _caches:
+            _caches[path] = RangeCache(directory, key)
+        return _caches[path]
+
+def drop_range_cache(directory, key):
+    with _caches_lock:
+        cache = _caches.pop(os.path.join(directory, key), None)
+    (cache or RangeCache(directory, key)).delete()
+
+def fetch_range(session, url, cache, start, end, sink=None, headers=None):
+    """
+    Fetches [start, end) from upstream into the cache, forwarding bytes to
+    sink as they arrive. Returns the position reached.
+    """
+    request_headers = dict(headers or {})
+    request_headers['Range'] = f"bytes={start}-{end - 1}"
+    pos = start
+    with session.get(url, headers=request_headers, stream=True, timeout=15) as response:
+        response.raise_for_status()
+        if response.status_code != 206 and start > 0:
+            raise IOError("Upstream ignored the Range request.")
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if not chunk:
+                continue
+            chunk = chunk[:end - pos]
+            cache.write(pos, chunk)
+            pos += len(chunk)
+            if sink:
+                sink(chunk)
+            if pos >= end:
+                break
+    return pos
+
+# --- Range Cache ---
+class RangeCache:
+    """
+    Sparse on-disk cache of byte ranges for a single remote stream.
+    Data lives in <key>.bin at its real offsets; <key>.json records which
+    [start, end) ranges of it are valid.
+    """
+    def __init__(self, directory, key):
+        self.key = key
+        self.data_path = os.path.join(directory, key + '.bin')
+        self.meta_path = os.path.join(directory, key + '.json')
+        self.lock = threading.RLock()
+        self.total_size = None
+        self.content_type = None
+        self.ranges = []
+
+        if os.path.exists(self.meta_path) and os.path.exists(self.data_path):
+            try:
+                with open(self.meta_path, 'r') as f:
+                    meta = json.load(f)
+                self.total_size = meta.get('total_size')
+                self.content_type = meta.get('content_type')
+                self.ranges = [tuple(r) for r in meta.get('ranges', [])]
+            except (OSError, ValueError):
+                self.ranges = []
+
+    def save(self):
+        with self.lock:
+            tmp_path = self.meta_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'total_size': self.total_size,
+                    'content_type': self.content_type,
+                    'ranges': self.ranges,
+                }, f)
+            os.replace(tmp_path, self.meta_path)
+
+    def _add_range(self, start, end):
+        merged = []
+        for r_start, r_end in self.ranges:
+            if r_end < start or r_start > end:
+                merged.append((r_start, r_end))
+            else:
+                start = min(start, r_start)
+                end = max(end, r_end)
+        merged.append((start, end))
+        merged.sort()
+        self.ranges = merged
+
+    def cached_until(self, pos):
+        """Returns the end of the cached range containing pos, or None."""
+        with self.lock:
+            for r_start, r_end in self.ranges:
+                if r_start <= pos < r_end:
+                    return r_end
+        return None
+
+    def next_cached_start(self, pos):
+        with self.lock:
+            starts = [r[0] for r in self.ranges]
+            i = bisect.bisect_right(starts, pos)
+            return starts[i] if i < len(starts) else None
+
+    def missing(self, start, end):
+        """Returns the [start, end) gaps not yet cached."""
+        gaps = []
+        pos = start
+        with self.lock:
+            for r_start, r_end in self.ranges:
+                if r_end <= pos:
+                    continue
+                if r_start >= end:
+                    break
+                if r_start > pos:
+                    gaps.append((pos, r_start))
+                pos = max(pos, r_end)
+        if pos < end:
+            gaps.append((pos, end))
+        return gaps
+
+    def cached_bytes(self):
+        with self.lock:
+            return sum(r_end - r_start for r_start, r_end in self.ranges)
+
+    def is_complete(self):
+        return self.total_size is not None and not self.missing(0, self.total_size)
+
+    def read(self, start, length):
+        with self.lock, open(self.data_path, 'rb') as f:
+            f.seek(start)
+            return f.read(length)
+
+    def write(self, start, data):
+        with self.lock:
+            mode = 'r+b' if os.path.exists(self.data_path) else 'wb'
+            with open(self.data_path, mode) as f:
+                f.seek(start)
+                f.write(data)
+            self._add_range(start, start + len(data))
+
+    def delete(self):
+        with self.lock:
+            for path in (self.data_path, self.meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.ranges = []
+
+# --- Proxy Handler ---
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body):
+        video_id = self.path.strip('/').split('?')[0]
+        source = self.server.proxy.sources.get(video_id)
+        if not source:
+            self.send_error(404)
+            return
+
+        try:
+            if source['type'] == 'file':
+                self.serve_file(source['path'], send_body)
+            else:
+                self.serve_remote(source, send_body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass # Player closed the connection (seek or stop)
+
+    def parse_range(self, total_size):
+        header = self.headers.get('Range')
+        match = re.match(r'bytes=(\d*)-(\d*)', header or '')
+        if not match or (not match.group(1) and not match.group(2)):
+            return 0, total_size - 1, False
+        if not match.group(1):
+            # Suffix range: last N bytes
+            length = int(match.group(2))
+            return max(0, total_size - length), total_size - 1, True
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else total_size - 1
+        return start, min(end, total_size - 1), True
+
+    def send_range_headers(self, start, end, total_size, content_type, partial):
+        self.send_response(206 if partial else 200)
+        self.send_header('Content-Type', content_type or 'application/octet-stream')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        if partial:
+            self.send_header('Content-Range', f"bytes {start}-{end}/{total_size}")
+        self.end_headers()
+
+    def serve_file(self, path, send_body):
+        total_size = os.path.getsize(path)
+        start, end, partial = self.parse_range(total_size)
+        if start >= total_size:
+            self.send_error(416)
+            return
+        content_type = mimetypes.guess_type(path)[0]
+        self.send_range_headers(start, end, total_size, content_type, partial)
+        if not send_body:
+            return
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = f.read(min(CHUNK_SIZE, remaining))
+                if not data:
+                    break
+                self.wfile.write(data)
+                remaining -= len(data)
+
+    def serve_remote(self, source, send_body):
+        proxy = self.server.proxy
+        cache = proxy.get_cache(source['key'])
+        if cache.total_size is None:
+            proxy.probe(source, cache)
+
+        total_size = cache.total_size
+        start, end, partial = self.parse_range(total_size)
+        if start >= total_size:
+            self.send_error(416)
+            return
+        self.send_range_headers(start, end, total_size, cache.content_type, partial)
+        if not send_body:
+            return
+
+        pos = start
+        try:
+            while pos <= end:
+                cached_end = cache.cached_until(pos)
+                if cached_end is not None:
+                    # Serve from disk
+                    length = min(cached_end, end + 1, pos + CHUNK_SIZE) - pos
+                    self.wfile.write(cache.read(pos, length))
+                    pos += length
+                    continue
+
+                # Fetch the gap up to the next cached range from upstream
+                next_start = cache.next_cached_start(pos)
+                gap_end = min(end + 1, next_start) if next_start is not None else end + 1
+                reached = fetch_range(proxy.session, source['url'], cache, pos, gap_end, self.wfile.write)
+                if reached == pos:
+                    break # Upstream returned nothing
+                pos = reached
+        finally:
+            cache.save()
+
+# --- Audio Proxy ---
+class AudioProxy:
+    """
+    Loopback HTTP server that QMediaPlayer streams from. Remote streams are
+    cached by byte range on disk so replays and seeks within fetched ranges
+    never touch the network; downloaded files are served directly.
+    """
+    def __init__(self, cache_dir, max_cache_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_cache_bytes = max_cache_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.sources = {} # video_id -> source dict
+        self.session = requests.Session()
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ProxyHandler)
+        self.server.daemon_threads = True
+        self.server.proxy = self
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url_for(self, video_id):
+        return f"http://127.0.0.1:{self.port}/{video_id}"
+
+    def register_remote(self, video_id, url, format_id=None):
+        self.sources[video_id] = {
+            'type': 'remote',
+            'url': url,
+            'key': cache_key(video_id, format_id),
+        }
+        self.evict()
+        return self.url_for(video_id)
+
+    def cached_url(self, video_id):
+        """Returns a proxy URL if a complete cached copy exists, else None."""
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(video_id + '-') and name.endswith('.json'):
+                key = name[:-5]
+                if self.get_cache(key).is_complete():
+                    self.sources[video_id] = {'type': 'remote', 'url': None, 'key': key}
+                    return self.url_for(video_id)
+        return None
+
+    def register_file(self, video_id, path):
+        self.sources[video_id] = {'type': 'file', 'path': path}
+        return self.url_for(video_id)
+
+    def get_cache(self, key):
+        return get_range_cache(self.cache_dir, key)
+
+    def probe(self, source, cache):
+        # A one-byte range request reveals the total size via Content-Range
+        response = self.session.get(source['url'], headers={'Range': 'bytes=0-0'}, timeout=15)
+        response.raise_for_status()
+        content_range = response.headers.get('Content-Range', '')
+        if '/' in content_range:
+            cache.total_size = int(content_range.split('/')[-1])
+        else:
+            cache.total_size = int(response.headers.get('Content-Length', 0))
+        cache.content_type = response.headers.get('Content-Type')
+        cache.save()
+
+    def evict(self):
+        """Drops least-recently-used cache entries beyond the size budget."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.bin'):
+                path = os.path.join(self.cache_dir, name)
+                entries.append((os.path.getatime(path), os.path.getsize(path), name[:-4]))
+        total = sum(size for _, size, _ in entries)
+        active = {s['key'] for s in self.sources.values() if s['type'] == 'remote'}
+        for _, size, key in sorted(entries):
+            if total <= self.max_cache_bytes:
+                break
+            if key in active:
+                continue
+            drop_range_cache(self.cache_dir, key)
+            total -= size
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,119 @@
+import threading
+import time
+from datetime import datetime
+
+# --- Schedule Parsing ---
+def parse_schedule(text):
+    """
+    Parses a schedule string like "08:00=512, 18:00=0" into a sorted list of
+    (minute_of_day, bytes_per_sec) tuples. Rates are given in KB/s, 0 = unlimited.
+    """
+    schedule = []
+    for entry in (text or "").split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            when, rate = entry.split('=')
+            hours, minutes = when.strip().split(':')
+            minute_of_day = int(hours) * 60 + int(minutes)
+            if not 0 <= minute_of_day < 24 * 60:
+                raise ValueError
+            schedule.append((minute_of_day, max(0, int(rate)) * 1024))
+        except ValueError:
+            raise ValueError(f"Invalid schedule entry '{entry}'. Expected HH:MM=KBps.")
+    schedule.sort()
+    return schedule
+
+# --- Token Bucket ---
+class TokenBucket:
+    """
+    Process-wide rate limiter shared by all download workers.
+
+    Callers report bytes they have just transferred via consume(); the call
+    blocks long enough to keep the aggregate rate under the limit. Reservations
+    are handed out in lock order, so concurrent workers share the link fairly.
+    """
+    def __init__(self, rate=0, burst_seconds=0.5):
+        self._cond = threading.Condition()
+        self._rate = rate # bytes/sec, 0 = unlimited
+        self._schedule = []
+        self._burst_seconds = burst_seconds
+        self._tat = time.monotonic() # theoretical arrival time
+        self._generation = 0
+        self.limit_thumbnails = False
+
+    def set_rate(self, rate):
+        with self._cond:
+            self._rate = max(0, int(rate))
+            self._reset()
+
+    def set_schedule(self, schedule):
+        with self._cond:
+            self._schedule = list(schedule)
+            self._reset()
+
+    def schedule(self):
+        return list(self._schedule)
+
+    def _reset(self):
+        # Wake sleepers so a new limit takes effect immediately
+        self._tat = time.monotonic()
+        self._generation += 1
+        self._cond.notify_all()
+
+    def current_rate(self):
+        if not self._schedule:
+            return self._rate
+        now = datetime.now()
+        minute_of_day = now.hour * 60 + now.minute
+        rate = self._schedule[-1][1] # Wraps around from the previous day
+        for start, scheduled_rate in self._schedule:
+            if start <= minute_of_day:
+                rate = scheduled_rate
+        return rate
+
+    def consume(self, nbytes):
+        if nbytes <= 0:
+            return
+        with self._cond:
+            while True:
+                rate = self.current_rate()
+                if rate <= 0:
+                    return
+                now = time.monotonic()
+                self._tat = max(self._tat, now)
+                self._tat += nbytes / rate
+                deadline = self._tat - self._burst_seconds
+                generation = self._generation
+
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    self._cond.wait(remaining)
+                    if self._generation != generation:
+                        break # Limit changed, re-reserve at the new rate
+
+# Shared instance used by downloads and thumbnail fetches
+limiter = TokenBucket()
+
+def int_setting(settings, key, default=0):
+    """A whole-number setting; default if it is unset or doesn't parse (e.g. a hand-edited config)."""
+    value = settings.value(key, default)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        print(f"Ignoring setting {key}={value!r}: not a number")
+        return default
+
+def configure_limiter(settings):
+    limiter.set_rate(int_setting(settings, "bandwidth_limit") * 1024)
+    try:
+        limiter.set_schedule(parse_schedule(settings.value("bandwidth_schedule", "")))
+    except ValueError as e:
+        print(f"Ignoring bandwidth schedule: {e}")
+        limiter.set_schedule([])
+    limiter.limit_thumbnails = str(settings.value("limit_thumbnails", "false")).lower() == "true"
@@ -0,0 +1,52 @@
+import itertools
+import threading
+
+class Cancelled(Exception):
+    """Raised by CancelToken.check() once the work is no longer wanted."""
+
+class CancelToken:
+    """
+    Shared by all work started for one generation of the UI (e.g. one
+    channel search). Cancelling it makes queued jobs return without doing
+    anything and runs the abort callbacks registered by running ones, such
+    as closing an HTTP response. Thread-safe.
+    """
+    def __init__(self):
+        self.cancelled = False
+        self.lock = threading.Lock()
+        self.callbacks = {}
+        self.keys = itertools.count()
+
+    def cancel(self):
+        with self.lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self.callbacks = list(self.callbacks.values()), {}
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass # Aborting is best effort
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+    def on_cancel(self, callback):
+        """
+        Runs callback when the token is cancelled (right away if it already
+        is). Returns a function that unregisters it; call that when the work
+        finishes so finished jobs don't pile up here.
+        """
+        with self.lock:
+            if not self.cancelled:
+                key = next(self.keys)
+                self.callbacks[key] = callback
+                return lambda: self._remove(key)
+        callback()
+        return lambda: None
+
+    def _remove(self, key):
+        with self.lock:
+            self.callbacks.pop(key, None)
@@ -0,0 +1,280 @@
+import sys
+import json
+import struct
+from array import array
+from datetime import datetime, timezone
+
+# Thumbnail variant -> file name under https://i.ytimg.com/vi/<id>/
+THUMBNAIL_FILES = [
+    ('default', 'default.jpg', 120, 90),
+    ('medium', 'mqdefault.jpg', 320, 180),
+    ('high', 'hqdefault.jpg', 480, 360),
+    ('standard', 'sddefault.jpg', 640, 480),
+    ('maxres', 'maxresdefault.jpg', 1280, 720),
+]
+
+def parse_timestamp(published_at):
+    return int(datetime.fromisoformat(published_at.replace('Z', '+00:00')).timestamp())
+
+def format_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+SNAPSHOT_VERSION = 2
+COLUMNS = ('title_offsets', 'published', 'channel_index', 'thumb_flags', 'thumb_prefix')
+
+# --- Column Store ---
+class VideoCatalog:
+    """
+    Array-backed store of video metadata. Titles are packed into one UTF-8
+    buffer, timestamps are integers, channel names and thumbnail URL prefixes
+    are interned, and thumbnails are a per-row bitmask of available variants.
+    Rows are accessed through lightweight VideoRow views.
+    """
+    def __init__(self):
+        self.ids = [] # Also the keys of row_of, so each ID string exists once
+        self.row_of = {} # video id -> row
+        self.title_data = bytearray()
+        self.title_offsets = array('Q', [0])
+        self.published = array('q') # Unix seconds
+        self.channel_index = array('I')
+        self.channels = [] # Interned channel names
+        self._channel_lookup = {}
+        self.thumb_flags = array('B') # Bit i set = THUMBNAIL_FILES[i] available
+        self.thumb_prefix = array('H')
+        self.prefixes = [] # Interned URL prefixes, e.g. "https://i.ytimg.com/vi/"
+        self._prefix_lookup = {}
+        self.thumb_overrides = {} # (row, variant) -> URL that doesn't follow the pattern
+        self.thumb_sizes = {} # (row, variant) -> (width, height) when not the variant's standard size
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return (VideoRow(self, row) for row in range(len(self.ids)))
+
+    def __getitem__(self, row):
+        if not 0 <= row < len(self.ids):
+            raise IndexError(row)
+        return VideoRow(self, row)
+
+    def __contains__(self, video_id):
+        return video_id in self.row_of
+
+    def get(self, video_id):
+        row = self.row_of.get(video_id)
+        return None if row is None else VideoRow(self, row)
+
+    def _intern(self, value, values, lookup):
+        index = lookup.get(value)
+        if index is None:
+            index = len(values)
+            values.append(value)
+            lookup[value] = index
+        return index
+
+    def append(self, video):
+        """Adds a video dict (as produced by YouTubeManager). Returns its row."""
+        video_id = video['id']
+        if video_id in self.row_of:
+            return self.row_of[video_id]
+
+        row = len(self.ids)
+        self.ids.append(video_id)
+        self.row_of[video_id] = row
+        self.title_data += video['title'].encode('utf-8')
+        self.title_offsets.append(len(self.title_data))
+        self.published.append(parse_timestamp(video['published_at']))
+        self.channel_index.append(self._intern(video.get('channel', ''), self.channels, self._channel_lookup))
+
+        flags = 0
+        prefix = None
+        thumbnails = video.get('thumbnails') or {}
+        if not thumbnails and video.get('thumbnail'):
+            thumbnails = {'high': {'url': video['thumbnail']}}
+        for bit, (name, filename, width, height) in enumerate(THUMBNAIL_FILES):
+            thumbnail = thumbnails.get(name) or {}
+            url = thumbnail.get('url')
+            if not url:
+                continue
+            flags |= 1 << bit
+            size = (thumbnail.get('width') or width, thumbnail.get('height') or height)
+            if size != (width, height):
+                self.thumb_sizes[(row, name)] = size
+            suffix = f"{video_id}/{filename}"
+            if url.endswith(suffix) and (prefix is None or url == prefix + suffix):
+                prefix = url[:-len(suffix)]
+            else:
+                self.thumb_overrides[(row, name)] = url
+        self.thumb_flags.append(flags)
+        self.thumb_prefix.append(self._intern(prefix or '', self.prefixes, self._prefix_lookup))
+        return row
+
+    def extend(self, videos):
+        for video in videos:
+            self.append(video)
+
+    def title(self, row):
+        return self.title_data[self.title_offsets[row]:self.title_offsets[row + 1]].decode('utf-8')
+
+    def thumbnails(self, row):
+        """Rebuilds the API-style thumbnails dict for one row."""
+        video_id = self.ids[row]
+        prefix = self.prefixes[self.thumb_prefix[row]]
+        flags = self.thumb_flags[row]
+        result = {}
+        for bit, (name, filename, width, height) in enumerate(THUMBNAIL_FILES):
+            if flags & (1 << bit):
+                url = self.thumb_overrides.get((row, name)) or f"{prefix}{video_id}/{filename}"
+                width, height = self.thumb_sizes.get((row, name), (width, height))
+                result[name] = {'url': url, 'width': width, 'height': height}
+        return result
+
+    def match_rows(self, text="", since=None, until=None):
+        """
+        Rows whose title contains every word of text (case-insensitive) and
+        whose publish time is within [since, until) Unix seconds.
+        """
+        words = text.lower().split()
+        rows = []
+        for row in range(len(self.ids)):
+            published = self.published[row]
+            if (since is not None and published < since) or (until is not None and published >= until):
+                continue
+            if words:
+                title = self.title(row).lower()
+                if not all(word in title for word in words):
+                    continue
+            rows.append(row)
+        return rows
+
+    def rows_by_date(self, newest_first=True):
+        return sorted(range(len(self.ids)), key=self.published.__getitem__, reverse=newest_first)
+
+    def to_bytes(self):
+        """
+        Serializes the columns as-is: a JSON header for the string lists, then
+        the title buffer and each array's raw bytes, so loading is a handful
+        of memcpys rather than one append() per video.
+        """
+        header = json.dumps({
+            'version': SNAPSHOT_VERSION,
+            'ids': self.ids,
+            'channels': self.channels,
+            'prefixes': self.prefixes,
+            'overrides': [[row, name, url] for (row, name), url in self.thumb_overrides.items()],
+            'sizes': [[row, name, width, height] for (row, name), (width, height) in self.thumb_sizes.items()],
+        }).encode('utf-8')
+        parts = [header, bytes(self.title_data)] + [getattr(self, name).tobytes() for name in COLUMNS]
+        return b''.join(struct.pack('<Q', len(part)) + part for part in parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Inverse of to_bytes(). Raises ValueError on data from another version."""
+        parts = []
+        pos = 0
+        while pos < len(data):
+            (length,) = struct.unpack_from('<Q', data, pos)
+            parts.append(data[pos + 8:pos + 8 + length])
+            pos += 8 + length
+        if len(parts) != 2 + len(COLUMNS):
+            raise ValueError("Truncated catalog snapshot.")
+        header = json.loads(parts[0])
+        if header.get('version') != SNAPSHOT_VERSION:
+            raise ValueError("Unsupported catalog snapshot version.")
+
+        catalog = cls()
+        catalog.ids = header['ids']
+        catalog.row_of = {video_id: row for row, video_id in enumerate(catalog.ids)}
+        catalog.channels = header['channels']
+        catalog._channel_lookup = {name: i for i, name in enumerate(catalog.channels)}
+        catalog.prefixes = header['prefixes']
+        catalog._prefix_lookup = {prefix: i for i, prefix in enumerate(catalog.prefixes)}
+        catalog.thumb_overrides = {(row, name): url for row, name, url in header['overrides']}
+        catalog.thumb_sizes = {(row, name): (width, height) for row, name, width, height in header['sizes']}
+        catalog.title_data = bytearray(parts[1])
+        for name, raw in zip(COLUMNS, parts[2:]):
+            column = array(getattr(catalog, name).typecode)
+            column.frombytes(raw)
+            setattr(catalog, name, column)
+        return catalog
+
+class VideoRow:
+    """View of one catalog row; holds no data of its own."""
+    __slots__ = ('catalog', 'row')
+
+    def __init__(self, catalog, row):
+        self.catalog = catalog
+        self.row = row
+
+    @property
+    def id(self):
+        return self.catalog.ids[self.row]
+
+    @property
+    def title(self):
+        return self.catalog.title(self.row)
+
+    @property
+    def published(self):
+        return self.catalog.published[self.row]
+
+    @property
+    def published_at(self):
+        return format_timestamp(self.catalog.published[self.row])
+
+    @property
+    def channel(self):
+        return self.catalog.channels[self.catalog.channel_index[self.row]]
+
+    @property
+    def thumbnails(self):
+        return self.catalog.thumbnails(self.row)
+
+    @property
+    def thumbnail(self):
+        return self.thumbnails.get('high', {}).get('url')
+
+# --- Memory Benchmark ---
+def _sample_videos(count, channels=20):
+    for i in range(count):
+        video_id = f"v{i:010d}"
+        base = f"https://i.ytimg.com/vi/{video_id}"
+        yield {
+            'id': video_id,
+            'title': f"Sample upload number {i} with a typical length title",
+            'published_at': format_timestamp(1420070400 + i * 3600),
+            'thumbnail': f"{base}/hqdefault.jpg",
+            'thumbnails': {
+                'default': {'url': f"{base}/default.jpg", 'width': 120, 'height': 90},
+                'medium': {'url': f"{base}/mqdefault.jpg", 'width': 320, 'height': 180},
+                'high': {'url': f"{base}/hqdefault.jpg", 'width': 480, 'height': 360},
+            },
+            'channel': f"Channel {i % channels}",
+        }
+
+def benchmark(count=100000):
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # Fresh strings per row, as decoded from JSON API responses
+    dicts = [dict(v, channel=''.join(v['channel'])) for v in _sample_videos(count)]
+    dict_bytes = tracemalloc.get_traced_memory()[0] - before
+    del dicts
+    gc.collect()
+
+    before = tracemalloc.get_traced_memory()[0]
+    catalog = VideoCatalog()
+    catalog.extend(_sample_videos(count))
+    catalog_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"{count} videos")
+    print(f"  list of dicts: {dict_bytes / count:8.1f} bytes/row ({dict_bytes / 1e6:.1f} MB)")
+    print(f"  VideoCatalog:  {catalog_bytes / count:8.1f} bytes/row ({catalog_bytes / 1e6:.1f} MB)")
+    print(f"  ratio: {dict_bytes / catalog_bytes:.1f}x")
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
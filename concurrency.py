@@ -0,0 +1,99 @@
+import re
+import math
+import time
+import random
+from collections import deque
+
+DEFAULT_MAX_DOWNLOADS = 4
+MAX_RETRIES = 4
+
+# Errors that mean "slow down" rather than "this video is broken"
+THROTTLE_PATTERN = re.compile(
+    r"HTTP Error (403|429|5\d\d)|Too Many Requests|rate.?limit|timed? ?out|"
+    r"Connection (reset|aborted|refused)|Remote end closed|IncompleteRead|"
+    r"Read timed out|Temporary failure",
+    re.IGNORECASE)
+
+def is_throttle_error(message):
+    return bool(THROTTLE_PATTERN.search(message or ""))
+
+# --- AIMD Controller ---
+class AimdController:
+    """
+    Picks how many downloads run at once. Each success adds 1/target (about
+    +1 per round of downloads); a throttling error or a download far slower
+    than usual halves the target. Throttling also pauses new starts for an
+    exponentially growing, jittered backoff. Decreases are applied at most
+    once per cooldown, so a burst of simultaneous 429s counts as one event.
+    """
+    def __init__(self, max_limit=DEFAULT_MAX_DOWNLOADS, min_limit=1,
+                 base_backoff=2.0, max_backoff=300.0, cooldown=5.0, window=20):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.target = float(max_limit)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.cooldown = cooldown
+        self.backoff_level = 0
+        self.paused_until = 0.0
+        self.last_decrease = float('-inf')
+        self.outcomes = deque(maxlen=window) # True = ok, False = throttled
+        self.throughput = None # EWMA of per-download bytes/sec
+
+    def set_max_limit(self, max_limit):
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.target = min(self.target, self.max_limit)
+
+    def limit(self):
+        return max(self.min_limit, min(self.max_limit, int(self.target)))
+
+    def backoff_remaining(self):
+        return max(0.0, self.paused_until - time.monotonic())
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def record_success(self, throughput=None, slow_fraction=0.3):
+        """
+        Reports a finished download and its throughput in bytes/sec (None when
+        a bandwidth limit makes it meaningless).
+        """
+        self.outcomes.append(True)
+        self.backoff_level = max(0, self.backoff_level - 1)
+
+        if throughput and self.throughput and throughput < self.throughput * slow_fraction:
+            # Far below the usual per-download rate: the link is saturated
+            self._decrease()
+        else:
+            self.target = min(self.max_limit, self.target + 1.0 / max(1.0, self.target))
+        if throughput:
+            self.throughput = throughput if self.throughput is None else 0.8 * self.throughput + 0.2 * throughput
+
+    def record_throttle(self):
+        """Reports a throttling error. Returns the backoff delay in seconds."""
+        self.outcomes.append(False)
+        if self._decrease():
+            self.backoff_level += 1
+        delay = min(self.max_backoff, self.base_backoff * 2 ** max(0, self.backoff_level - 1))
+        delay *= random.uniform(0.5, 1.0) # Jitter so clients don't retry in lockstep
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        return self.backoff_remaining()
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self.last_decrease < self.cooldown:
+            return False
+        self.last_decrease = now
+        self.target = max(float(self.min_limit), self.target / 2)
+        return True
+
+    def describe(self, running):
+        text = f"Parallel: {running}/{self.limit()}"
+        remaining = self.backoff_remaining()
+        if remaining > 0:
+            text += f" · backing off {math.ceil(remaining)}s"
+        if self.outcomes and self.error_rate() > 0:
+            text += f" · {self.error_rate():.0%} throttled"
+        return text
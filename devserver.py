@@ -0,0 +1,220 @@
+"""
+Local fake of the YouTube Data API endpoints the app uses, plus a thumbnail
+host, for offline testing and benchmarks.
+
+    python devserver.py --port 8765 --channels 3 --videos 500 --latency 30
+
+Then run the app with:
+
+    YOUTUBE_API_KEY=dev YOUTUBE_API_ENDPOINT=http://127.0.0.1:8765/
+
+Channels are named @channel0, @channel1, ... (IDs UCfake0, UCfake1, ...).
+Responses carry ETags and honour If-None-Match with 304. POST
+/_admin/upload?channel=UCfake0 publishes a new video to a channel.
+"""
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+PAGE_SIZE = 50
+
+def make_jpeg(width, height):
+    # A real JPEG so clients exercise the decode path
+    from PyQt6.QtGui import QImage, QColor
+    from PyQt6.QtCore import QBuffer, QByteArray
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor("#3ea6ff"))
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QBuffer.OpenModeFlag.WriteOnly)
+    image.save(buffer, "JPG")
+    return bytes(data)
+
+class FakeYouTube:
+    def __init__(self, channels, videos, port):
+        self.lock = threading.Lock()
+        self.port = port
+        self.channels = {}
+        start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+        for c in range(channels):
+            channel_id = f"UCfake{c}"
+            uploads = [self.make_video(channel_id, c, v, start + timedelta(days=v)) for v in range(videos)]
+            uploads.reverse() # Newest first, like the uploads playlist
+            self.channels[channel_id] = {
+                'handle': f"@channel{c}",
+                'title': f"Fake Channel {c}",
+                'uploads': uploads,
+            }
+        self.requests = 0
+        self.not_modified = 0
+        self.thumbnails = {}
+
+    def make_video(self, channel_id, c, v, published):
+        video_id = f"{c:02d}v{v:08d}"[-11:]
+        base = f"http://127.0.0.1:{self.port}/vi/{video_id}"
+        return {
+            'id': video_id,
+            'title': f"Video {v} of channel {c}",
+            'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'thumbnails': {
+                'default': {'url': f"{base}/default.jpg", 'width': 120, 'height': 90},
+                'medium': {'url': f"{base}/mqdefault.jpg", 'width': 320, 'height': 180},
+                'high': {'url': f"{base}/hqdefault.jpg", 'width': 480, 'height': 360},
+            },
+        }
+
+    def upload(self, channel_id):
+        with self.lock:
+            channel = self.channels[channel_id]
+            c = int(channel_id[len("UCfake"):])
+            latest = datetime.strptime(channel['uploads'][0]['publishedAt'], '%Y-%m-%dT%H:%M:%SZ')
+            video = self.make_video(channel_id, c, len(channel['uploads']),
+                                    latest.replace(tzinfo=timezone.utc) + timedelta(hours=1))
+            channel['uploads'].insert(0, video)
+            return video
+
+    def find_channel(self, handle=None, channel_id=None):
+        for cid, channel in self.channels.items():
+            if cid == channel_id or (handle and channel['handle'] == handle):
+                return cid, channel
+        return None, None
+
+    def search(self, params):
+        cid, _ = self.find_channel(handle=params.get('q'))
+        items = [{'snippet': {'channelId': cid}}] if cid else []
+        return {'kind': 'youtube#searchListResponse', 'items': items}
+
+    def channels_list(self, params):
+        cid, channel = self.find_channel(channel_id=params.get('id'))
+        items = []
+        if channel:
+            items.append({
+                'id': cid,
+                'snippet': {'title': channel['title']},
+                'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + cid[2:]}},
+            })
+        return {'kind': 'youtube#channelListResponse', 'items': items}
+
+    def playlist_items(self, params):
+        cid = 'UC' + params.get('playlistId', '')[2:]
+        _, channel = self.find_channel(channel_id=cid)
+        if not channel:
+            return None
+        with self.lock:
+            uploads = list(channel['uploads'])
+        offset = int(params.get('pageToken') or 0)
+        limit = min(int(params.get('maxResults') or 5), PAGE_SIZE)
+        page = uploads[offset:offset + limit]
+        response = {
+            'kind': 'youtube#playlistItemListResponse',
+            'items': [{
+                'snippet': {'title': v['title'], 'publishedAt': v['publishedAt'], 'thumbnails': v['thumbnails']},
+                'contentDetails': {'videoId': v['id']},
+            } for v in page],
+        }
+        if offset + limit < len(uploads):
+            response['nextPageToken'] = str(offset + limit)
+        return response
+
+    def thumbnail(self, variant):
+        sizes = {'default.jpg': (120, 90), 'mqdefault.jpg': (320, 180), 'hqdefault.jpg': (480, 360)}
+        size = sizes.get(variant)
+        if not size:
+            return None
+        with self.lock:
+            if variant not in self.thumbnails:
+                self.thumbnails[variant] = make_jpeg(*size)
+            return self.thumbnails[variant]
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == '/_admin/upload' and params.get('channel') in self.server.fake.channels:
+            video = self.server.fake.upload(params['channel'])
+            self.send_body(200, json.dumps(video).encode(), 'application/json')
+        else:
+            self.send_body(404, b'{}', 'application/json')
+
+    def do_GET(self):
+        fake = self.server.fake
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = url.path.strip('/').split('/')
+
+        if parts[0] == 'vi' and len(parts) == 3:
+            data = fake.thumbnail(parts[2])
+            if data is None:
+                self.send_body(404, b'', 'text/plain')
+            else:
+                self.send_body(200, data, 'image/jpeg')
+            return
+
+        handlers = {
+            'search': fake.search,
+            'channels': fake.channels_list,
+            'playlistItems': fake.playlist_items,
+        }
+        handler = handlers.get(parts[-1])
+        response = handler(params) if handler else None
+        if response is None:
+            self.send_body(404, b'{"error": {"code": 404, "message": "Not found"}}', 'application/json')
+            return
+
+        fake.requests += 1
+        body = json.dumps(response, sort_keys=True).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        response['etag'] = etag
+        if self.headers.get('If-None-Match') == etag:
+            fake.not_modified += 1
+            self.send_body(304, b'', 'application/json', {'ETag': etag})
+            return
+        self.send_body(200, json.dumps(response).encode(), 'application/json', {'ETag': etag})
+
+def start_server(port=0, channels=3, videos=500, latency_ms=0):
+    """Starts the fake API in a background thread; returns the server."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    server.latency = latency_ms / 1000
+    server.fake = FakeYouTube(channels, videos, server.server_address[1])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake YouTube Data API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--channels', type=int, default=3)
+    parser.add_argument('--videos', type=int, default=500)
+    parser.add_argument('--latency', type=int, default=0, help="Added latency per request (ms)")
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.channels, args.videos, args.latency)
+    print(f"Fake YouTube API on http://127.0.0.1:{server.server_address[1]}/")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sys.exit(0)
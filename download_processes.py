@@ -0,0 +1,223 @@
+import json
+import time
+import struct
+import threading
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+from PyQt6.QtCore import QObject, pyqtSignal
+from bandwidth import limiter
+from tracing import tracer
+from encoding import DEFAULT_FORMATS
+
+PROGRESS_INTERVAL = 0.1 # Per-job progress records sent at most this often
+BATCH_INTERVAL = 0.1 # Progress batches delivered to Qt at most this often
+
+# --- Wire Format ---
+# Each message is one send_bytes() record starting with a kind byte.
+# Progress: kind, job id, percent, status code, then speed/eta/total as
+# length-prefixed ASCII (~40 bytes). Finished/error carry a JSON payload.
+KIND_PROGRESS, KIND_FINISHED, KIND_ERROR = 1, 2, 3
+STATUSES = ['Downloading', 'Converting']
+PROGRESS = struct.Struct('<BIfB')
+FINAL = struct.Struct('<BI')
+
+def pack_progress(job_id, data):
+    status = STATUSES.index(data['status']) if data.get('status') in STATUSES else 0
+    record = bytearray(PROGRESS.pack(KIND_PROGRESS, job_id, data.get('percent', 0), status))
+    for key in ('speed', 'eta', 'total'):
+        text = str(data.get(key, '')).encode('ascii', 'replace')[:255]
+        record.append(len(text))
+        record += text
+    return bytes(record)
+
+def pack_final(kind, job_id, payload):
+    return FINAL.pack(kind, job_id) + json.dumps(payload).encode('utf-8')
+
+def unpack(record):
+    """Returns (kind, job_id, payload)."""
+    kind = record[0]
+    if kind != KIND_PROGRESS:
+        _, job_id = FINAL.unpack_from(record)
+        return kind, job_id, json.loads(record[FINAL.size:])
+
+    _, job_id, percent, status = PROGRESS.unpack_from(record)
+    data = {'percent': percent, 'status': STATUSES[status]}
+    pos = PROGRESS.size
+    for key in ('speed', 'eta', 'total'):
+        length = record[pos]
+        data[key] = record[pos + 1:pos + 1 + length].decode('ascii')
+        pos += 1 + length
+    return kind, job_id, data
+
+# --- Worker Process ---
+class PipeSignal:
+    def __init__(self, emit):
+        self.emit = emit
+
+class PipeSignals:
+    """Stands in for DownloadSignals inside a worker process."""
+    def __init__(self, conn, job_id):
+        self.conn = conn
+        self.job_id = job_id
+        self.last_sent = 0.0
+        self.last_status = None
+        self.progress = PipeSignal(self.send_progress)
+        # The job's spans travel with its result so the parent's timeline has them
+        self.finished = PipeSignal(lambda path, meta: self.conn.send_bytes(
+            pack_final(KIND_FINISHED, self.job_id, {'path': path, 'meta': meta, 'spans': tracer.drain()})))
+        self.error = PipeSignal(lambda message: self.conn.send_bytes(
+            pack_final(KIND_ERROR, self.job_id, {'error': message, 'spans': tracer.drain()})))
+
+    def send_progress(self, data):
+        # Coalesce: yt-dlp calls the hook for every chunk
+        now = time.monotonic()
+        if data.get('status') == self.last_status and now - self.last_sent < PROGRESS_INTERVAL:
+            return
+        self.last_sent = now
+        self.last_status = data.get('status')
+        self.conn.send_bytes(pack_progress(self.job_id, data))
+
+def worker_main(conn):
+    # Imported here so the parent doesn't pay for it and the child gets fresh state
+    from downloads import DownloadWorker
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        limiter.set_rate(job['rate'])
+        limiter.set_schedule(job['schedule'])
+        worker = DownloadWorker(job['video_id'], job['title'], job['download_path'], job['cache_dir'],
+                                job['staging_path'], job['trace_track'], job['sections'], job['formats'])
+        worker.signals = PipeSignals(conn, job['job_id'])
+        worker.run()
+
+# --- Process Pool ---
+class WorkerProcess:
+    __slots__ = ('process', 'conn', 'job_id')
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.job_id = None
+
+class DownloadProcessPool(QObject):
+    """
+    Runs DownloadWorker jobs in long-lived worker processes, one job per
+    process at a time, so yt-dlp's Python work doesn't contend with the GUI
+    for the GIL. A single reader thread multiplexes all pipes and delivers
+    the latest progress per job in batches.
+
+    The bandwidth limit is split evenly between the pool's slots; changes
+    apply to jobs started afterwards.
+    """
+    progressBatch = pyqtSignal(dict) # job id -> progress dict
+    finished = pyqtSignal(int, str, dict) # job id, filepath, metadata
+    error = pyqtSignal(int, str) # job id, message
+
+    def __init__(self, max_processes=4, target=worker_main):
+        super().__init__()
+        self.max_processes = max_processes
+        self.target = target
+        self.context = multiprocessing.get_context('spawn') # fork is unsafe with Qt threads
+        self.workers = []
+        self.pending = deque()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.reader = threading.Thread(target=self.read_events, daemon=True)
+        self.reader.start()
+
+    def submit(self, job_id, video_id, title, download_path, cache_dir=None, staging_path=None, trace_track=None,
+               sections='', formats=DEFAULT_FORMATS):
+        job = {'job_id': job_id, 'video_id': video_id, 'title': title, 'download_path': download_path,
+               'cache_dir': cache_dir, 'staging_path': staging_path, 'trace_track': trace_track,
+               'sections': sections, 'formats': formats}
+        with self.lock:
+            self.pending.append(job)
+            self._dispatch()
+
+    def _dispatch(self):
+        while self.pending:
+            worker = next((w for w in self.workers if w.job_id is None), None)
+            if worker is None:
+                if len(self.workers) >= self.max_processes:
+                    return
+                worker = self._spawn()
+            job = self.pending.popleft()
+            share = self.max_processes
+            job['rate'] = limiter.current_rate() // share
+            job['schedule'] = [(minute, rate // share) for minute, rate in limiter.schedule()]
+            worker.job_id = job['job_id']
+            worker.conn.send(job)
+
+    def _spawn(self):
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=self.target, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        worker = WorkerProcess(process, parent_conn)
+        self.workers.append(worker)
+        return worker
+
+    def read_events(self):
+        progress = {}
+        last_flush = time.monotonic()
+        while not self.closed:
+            with self.lock:
+                conns = {w.conn: w for w in self.workers}
+            if not conns:
+                time.sleep(BATCH_INTERVAL)
+                continue
+
+            for conn in wait(list(conns), timeout=BATCH_INTERVAL):
+                worker = conns[conn]
+                try:
+                    kind, job_id, payload = unpack(conn.recv_bytes())
+                except (EOFError, OSError):
+                    self.on_worker_died(worker)
+                    continue
+
+                if kind == KIND_PROGRESS:
+                    progress[job_id] = payload
+                    continue
+                progress.pop(job_id, None)
+                tracer.extend(payload.get('spans', []))
+                with self.lock:
+                    worker.job_id = None
+                    self._dispatch()
+                if kind == KIND_FINISHED:
+                    self.finished.emit(job_id, payload['path'], payload['meta'])
+                else:
+                    self.error.emit(job_id, payload['error'])
+
+            if progress and time.monotonic() - last_flush >= BATCH_INTERVAL:
+                self.progressBatch.emit(progress)
+                progress = {}
+                last_flush = time.monotonic()
+
+    def on_worker_died(self, worker):
+        with self.lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+            job_id = worker.job_id
+            self._dispatch()
+        worker.conn.close()
+        if job_id is not None:
+            self.error.emit(job_id, f"Download process exited unexpectedly (code {worker.process.exitcode}).")
+
+    def shutdown(self):
+        self.closed = True
+        with self.lock:
+            self.pending.clear()
+            for worker in self.workers:
+                try:
+                    worker.conn.send(None)
+                except OSError:
+                    pass
+                if worker.job_id is not None:
+                    worker.process.terminate()
+            self.workers = []
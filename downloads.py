@@ -1,14 +1,41 @@
 import os
 import re
+import math
+import json
+import sqlite3
+import requests
 import yt_dlp
+from yt_dlp.postprocessor import get_postprocessor
+import time
+from collections import deque
+from datetime import datetime
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar, 
-                             QScrollArea, QFrame, QPushButton, QMessageBox, QTabWidget)
-from PyQt6.QtCore import Qt, pyqtSignal, QRunnable, QThreadPool, QObject, QSettings, QStandardPaths
+                             QScrollArea, QFrame, QPushButton, QMessageBox, QTabWidget, QSpinBox,
+                             QListView, QStyledItemDelegate, QComboBox, QStyle, QListWidget, QFileDialog)
+from PyQt6.QtCore import (Qt, pyqtSignal, QRunnable, QThreadPool, QObject, QSettings, QStandardPaths,
+                          QAbstractListModel, QModelIndex, QSize, QRectF, QTimer)
+from PyQt6.QtGui import QPainter, QColor, QFont, QPainterPath
+from bandwidth import limiter, configure_limiter, int_setting
+from audio_proxy import cache_key, get_range_cache, fetch_range, preview_cache_dir
+from waveform import WaveformWorker, PeakPyramid, overview_peaks
+from analysis import submit_analysis, summarize
+from history import get_history, STATUS_COMPLETED, STATUS_FAILED
+from download_processes import DownloadProcessPool
+import work_queue # Its statuses are the queue's, not history's; kept qualified
+from staging import (disk_usage, free_bytes, estimate_output_size, finalize, copy_preallocated,
+                     InsufficientSpace, INSUFFICIENT_SPACE, DISK_TOO_SMALL, DEFAULT_MIN_FREE_MB)
+from info_cache import InfoCache, info_cache_path, extract_shared, AUDIO_FORMAT
+from singleflight import SingleFlight
+from tracing import tracer, PROCESS_DOWNLOADS
+from sections import (ydl_options, section_outputs, parse_sections, requested_duration,
+                      describe as describe_sections)
+from encoding import MultiEncodePP, EXTRA_FILEPATHS, DEFAULT_FORMATS, output_bytes_per_second
+from concurrency import AimdController, is_throttle_error, DEFAULT_MAX_DOWNLOADS, MAX_RETRIES
 
 # --- Worker Signals ---
 class DownloadSignals(QObject):
     progress = pyqtSignal(dict) # percent, speed, eta, total_bytes
-    finished = pyqtSignal(str) # filename
+    finished = pyqtSignal(str, dict) # filepath, metadata
     error = pyqtSignal(str)
 
 # --- Logger ---
@@ -16,27 +43,56 @@ class MyLogger:
     def debug(self, msg):
         pass
     def warning(self, msg):
-        pass
+        tracer.instant("yt-dlp warning", {'message': msg[:200]})
     def error(self, msg):
+        tracer.instant("yt-dlp error", {'message': msg[:200]})
         print(msg)
 
+def extra_label(section, path):
+    """History label of an extra output format, e.g. 'mp3' or '1:00–2:00, mp3'."""
+    name = os.path.splitext(path)[1][1:].lower()
+    return f"{section}, {name}" if section else name
+
 # --- Download Worker ---
 class DownloadWorker(QRunnable):
-    def __init__(self, video_id, title, download_path="downloads"):
+    def __init__(self, video_id, title, download_path="downloads", cache_dir=None, staging_path=None,
+                 trace_track=None, sections='', formats=DEFAULT_FORMATS):
         super().__init__()
+        self.trace_track = trace_track # Timeline track for this job's spans
         self.video_id = video_id
         self.title = title
+        self.sections = sections # Section spec (see sections.py); empty for the whole video
+        self.formats = formats # Output formats, e.g. "wav,mp3" (see encoding.py)
         self.download_path = download_path
+        self.cache_dir = cache_dir
+        self.staging_path = staging_path or None # Download and convert here, then move
         self.signals = DownloadSignals()
         
-        if not os.path.exists(self.download_path):
-            os.makedirs(self.download_path)
+        for path in (self.download_path, self.staging_path):
+            if path and not os.path.exists(path):
+                os.makedirs(path)
 
     def run(self):
+        with tracer.on_track(self.trace_track):
+            self.download()
+
+    def download(self):
+        last_downloaded = {'bytes': 0}
+        transfer = {'bytes': 0, 'start': None, 'end': None} # For the concurrency controller
+
         def progress_hook(d):
             if d['status'] == 'downloading':
                 total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
                 downloaded = d.get('downloaded_bytes', 0)
+
+                # Throttle against the shared bandwidth limiter (blocks this worker only)
+                if downloaded < last_downloaded['bytes']:
+                    last_downloaded['bytes'] = 0 # New fragment/file started
+                limiter.consume(downloaded - last_downloaded['bytes'])
+                if transfer['start'] is None:
+                    transfer['start'] = time.monotonic()
+                transfer['bytes'] += downloaded - last_downloaded['bytes']
+                last_downloaded['bytes'] = downloaded
                 
                 if total > 0:
                     percent = (downloaded / total) * 100
@@ -59,6 +115,11 @@ class DownloadWorker(QRunnable):
                     'status': 'Downloading'
                 })
             elif d['status'] == 'finished':
+                last_downloaded['bytes'] = 0
+                transfer['end'] = time.monotonic()
+                if transfer['start'] is not None:
+                    tracer.complete("download", transfer['start'], transfer['end'],
+                                    {'bytes': transfer['bytes'], 'file': os.path.basename(d.get('filename', ''))})
                 self.signals.progress.emit({
                     'percent': 100,
                     'speed': '-',
@@ -67,26 +128,161 @@ class DownloadWorker(QRunnable):
                     'status': 'Converting'
                 })
 
+        postprocess_started = {}
+
+        def postprocessor_hook(d):
+            if d['status'] == 'started':
+                postprocess_started[d['postprocessor']] = time.monotonic()
+            elif d['status'] == 'finished' and d['postprocessor'] in postprocess_started:
+                tracer.complete(f"postprocess {d['postprocessor']}", postprocess_started.pop(d['postprocessor']),
+                                time.monotonic())
+
+        directory = self.staging_path or self.download_path
         ydl_opts = {
-            'format': 'bestaudio/best',
-            'outtmpl': os.path.join(self.download_path, '%(title)s.%(ext)s'),
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'wav',
-            }],
+            'format': AUDIO_FORMAT,
+            'outtmpl': os.path.join(directory, '%(title)s.%(ext)s'),
             'progress_hooks': [progress_hook],
+            'postprocessor_hooks': [postprocessor_hook],
             'logger': MyLogger(),
             'quiet': True,
             'no_warnings': True,
         }
+        section_opts = ydl_options(self.sections, directory) if self.sections else {}
+        if section_opts:
+            # Sections are converted on their own; chapters are split from the primary output
+            ydl_opts['outtmpl'] = {'default': ydl_opts['outtmpl'], **section_opts['outtmpl']}
+            if 'download_ranges' in section_opts:
+                ydl_opts['download_ranges'] = section_opts['download_ranges']
 
+        # Preview and earlier attempts may already have extracted this video
+        info_cache = InfoCache(info_cache_path(self.cache_dir)) if self.cache_dir else None
+        from_cache = False
         try:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([f"https://www.youtube.com/watch?v={self.video_id}"])
-            self.signals.finished.emit(self.title)
+                # Added here rather than in ydl_opts so the encode runs before the chapter splitter
+                ydl.add_post_processor(MultiEncodePP(ydl, self.formats))
+                for pp in section_opts.get('postprocessors', []):
+                    pp = dict(pp)
+                    ydl.add_post_processor(get_postprocessor(pp.pop('key'))(ydl, **pp))
+                info = info_cache.get(self.video_id) if info_cache else None
+                from_cache = info is not None
+                if info is None:
+                    with tracer.span("extract"):
+                        info = extract_shared(ydl, self.video_id, info_cache)
+                else:
+                    tracer.instant("info cache hit")
+                self.check_free_space(info)
+                if self.cache_dir and 'download_ranges' not in ydl_opts:
+                    with tracer.span("preview cache fill") as args:
+                        args['filled'] = self.prefill_from_preview_cache(ydl, info)
+                info = ydl.process_ie_result(info, download=True)
+            # Final paths after postprocessing (the converted files, primary format first)
+            downloads = info.get('requested_downloads') or [{}]
+            # (path, label, expected length); each part is checked against its own length
+            if self.sections:
+                outputs = section_outputs(info, self.sections)
+            else:
+                outputs = [(downloads[0].get('filepath') or '', '', info.get('duration') or None)]
+            # Extra formats are labelled with their format, so history keeps the primary
+            # file as the video's unlabelled entry (find_path, waveform, playback)
+            if self.sections and parse_sections(self.sections).split:
+                outputs += [(path, extra_label('', path), info.get('duration') or None)
+                            for path in downloads[0].get(EXTRA_FILEPATHS) or []] # Not split
+            else:
+                outputs += [(path, extra_label(label, path), duration)
+                            for d, (_, label, duration) in zip(downloads, list(outputs))
+                            for path in d.get(EXTRA_FILEPATHS) or []]
+            if self.staging_path:
+                with tracer.span("move to target") as args:
+                    args['files'] = len(outputs)
+                    outputs = [(finalize(path, self.download_path) if path else path, label, duration)
+                               for path, label, duration in outputs]
+            elapsed = (transfer['end'] or 0) - (transfer['start'] or 0)
+            meta = {
+                'duration': info.get('duration') or 0,
+                'channel': info.get('channel') or info.get('uploader') or '',
+                'upload_date': info.get('upload_date') or '',
+                'throughput': transfer['bytes'] / elapsed if elapsed > 0.5 else None,
+            }
+            if len(outputs) > 1 or self.sections:
+                meta['parts'] = [list(output) for output in outputs]
+            self.signals.finished.emit(outputs[0][0] if outputs else '', meta)
         except Exception as e:
+            if from_cache:
+                info_cache.drop(self.video_id) # The retry extracts fresh URLs
             self.signals.error.emit(str(e))
 
+    def check_free_space(self, info):
+        duration = requested_duration(info, self.sections) if self.sections else None
+        needed = estimate_output_size(info, output_bytes_per_second(self.formats), duration)
+        for path in {self.staging_path or self.download_path, self.download_path}:
+            usage = disk_usage(path)
+            if usage.total < needed:
+                # Waiting for space would never help
+                raise InsufficientSpace(f"{DISK_TOO_SMALL}: {needed / 1e6:.0f} MB needed, "
+                                        f"{usage.total / 1e6:.0f} MB is the whole of {path}")
+            if usage.free < needed:
+                raise InsufficientSpace(f"{INSUFFICIENT_SPACE}: {needed / 1e6:.0f} MB needed, "
+                                        f"{usage.free / 1e6:.0f} MB free in {path}")
+
+    def prefill_from_preview_cache(self, ydl, info):
+        """
+        If this format was (partly) buffered by a preview, completes the cached
+        copy with range requests for the gaps only and places it where yt-dlp
+        would download it, so yt-dlp skips straight to postprocessing.
+        Returns True if the file was placed.
+        """
+        if info.get('requested_formats') or not info.get('url'):
+            return False # Merged formats are never previewed
+
+        cache = get_range_cache(self.cache_dir, cache_key(self.video_id, info.get('format_id')))
+        total = cache.total_size or info.get('filesize')
+        if not cache.cached_bytes() or not total:
+            return False
+        cache.total_size = total
+
+        fetched = {'bytes': cache.cached_bytes()}
+
+        def sink(chunk):
+            limiter.consume(len(chunk))
+            fetched['bytes'] += len(chunk)
+            self.signals.progress.emit({
+                'percent': fetched['bytes'] / total * 100,
+                'speed': '-',
+                'eta': '-',
+                'total': f"{total / (1024 * 1024):.2f}MiB",
+                'status': 'Downloading'
+            })
+
+        try:
+            with requests.Session() as session:
+                for start, end in cache.missing(0, total):
+                    pos = start
+                    while pos < end:
+                        reached = fetch_range(session, info['url'], cache, pos, end, sink, info.get('http_headers'))
+                        if reached == pos:
+                            raise IOError("Upstream returned no data.")
+                        pos = reached
+        except (requests.RequestException, IOError) as e:
+            print(f"Preview cache fill failed, downloading normally: {e}")
+            return False
+        finally:
+            cache.save()
+
+        filename = ydl.prepare_filename(info)
+        part_path = filename + '.part'
+        with cache.lock:
+            copy_preallocated(cache.data_path, part_path)
+        os.replace(part_path, filename)
+        self.signals.progress.emit({
+            'percent': 100,
+            'speed': '-',
+            'eta': '0s',
+            'total': f"{total / (1024 * 1024):.2f}MiB",
+            'status': 'Converting'
+        })
+        return True
+
 # --- Download Item Widget ---
 class DownloadItemWidget(QFrame):
     def __init__(self, title):
@@ -192,23 +388,243 @@ class DownloadItemWidget(QFrame):
         self.eta_label.setStyleSheet("color: #4caf50; font-weight: bold; font-size: 12px;")
         self.size_value.setText(self.current_size) # Show final size
 
+    def set_retrying(self, attempt, delay):
+        self.progress_bar.setValue(0)
+        self.eta_label.setText(f"Throttled, retry {attempt}/{MAX_RETRIES} in {math.ceil(delay)}s")
+        self.eta_label.setStyleSheet("color: #ff9800; font-size: 12px;")
+
     def set_error(self, error):
         self.eta_label.setText("Error")
         self.eta_label.setStyleSheet("color: #f44336; font-weight: bold; font-size: 12px;")
         self.size_value.setText("Failed")
 
+# --- Download Queue ---
+DISK_RECHECK_SECONDS = 30
+
+def download_key(video_id, sections=''):
+    # Single-flight key; the section spec is what distinguishes the output
+    # files (output formats are a global setting)
+    return ('download', video_id, sections)
+
+class DownloadJob:
+    __slots__ = ('video_id', 'title', 'sections', 'item', 'attempts', 'track', 'queued_at', 'started_at')
+
+    def __init__(self, video_id, title, sections=''):
+        self.video_id = video_id
+        self.title = title
+        self.sections = sections # Section spec for a partial download, see sections.py
+        self.item = None # Widget is created when the job starts
+        self.attempts = 0
+        self.track = tracer.track(f"{title} [{video_id}]", PROCESS_DOWNLOADS)
+        self.queued_at = time.monotonic()
+        self.started_at = None
+
+# --- History Model ---
+HISTORY_PAGE_SIZE = 200
+
+class HistoryModel(QAbstractListModel):
+    """One page of history records; rows are painted by HistoryDelegate."""
+    RecordRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, history):
+        super().__init__()
+        self.history = history
+        self.records = []
+        self.filters = {}
+        self.page_index = 0
+        self.total = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.records[index.row()]
+        if role == self.RecordRole:
+            return record
+        if role == Qt.ItemDataRole.DisplayRole:
+            return record.title
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return record.error or record.path
+        return None
+
+    def page_count(self):
+        return max(1, -(-self.total // HISTORY_PAGE_SIZE))
+
+    def set_filters(self, **filters):
+        self.filters = filters
+        self.page_index = 0
+        self.reload()
+
+    def set_page(self, page_index):
+        self.page_index = max(0, min(page_index, self.page_count() - 1))
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self.total = self.history.count(**self.filters)
+        self.page_index = min(self.page_index, self.page_count() - 1)
+        self.records = self.history.page(self.page_index * HISTORY_PAGE_SIZE, HISTORY_PAGE_SIZE, **self.filters)
+        self.endResetModel()
+
+    def refresh_record(self, record_id):
+        for row, record in enumerate(self.records):
+            if record.id == record_id:
+                self.records[row] = self.history.get(record_id)
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+                return
+
+def format_size(size):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.2f} {unit}"
+        size /= 1024
+
+class HistoryDelegate(QStyledItemDelegate):
+    """Paints a download record in the style of DownloadItemWidget."""
+    ROW_HEIGHT = 76
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        record = index.data(HistoryModel.RecordRole)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        rect = QRectF(option.rect).adjusted(0, 4, -4, -4)
+        selected = option.state & QStyle.StateFlag.State_Selected
+        path = QPainterPath()
+        path.addRoundedRect(rect, 12, 12)
+        painter.fillPath(path, QColor("#2a2a2a" if selected else "#252526"))
+        painter.setPen(QColor("#333"))
+        painter.drawPath(path)
+
+        # Format badge
+        failed = record.status == STATUS_FAILED
+        badge = QRectF(rect.left() + 12, rect.top() + (rect.height() - 44) / 2, 44, 44)
+        badge_path = QPainterPath()
+        badge_path.addRoundedRect(badge, 8, 8)
+        painter.fillPath(badge_path, QColor("#f44336" if failed else "#3ea6ff"))
+        font = QFont(option.font)
+        font.setBold(True)
+        font.setPixelSize(12)
+        painter.setFont(font)
+        painter.setPen(QColor("#fff"))
+        extension = os.path.splitext(record.path)[1][1:].upper() or "WAV"
+        painter.drawText(badge, Qt.AlignmentFlag.AlignCenter, "ERR" if failed else extension[:4])
+
+        # Waveform overview on the right
+        right = rect.right() - 12
+        if record.peaks:
+            wave_rect = QRectF(right - len(record.peaks), rect.top() + 14, len(record.peaks), rect.height() - 28)
+            mid = wave_rect.center().y()
+            half = wave_rect.height() / 2
+            for x, peak in enumerate(record.peaks):
+                height = max(1.0, peak / 255 * half)
+                painter.fillRect(QRectF(wave_rect.left() + x, mid - height, 1, height * 2), QColor("#3ea6ff"))
+            right = wave_rect.left() - 12
+
+        # Text
+        text_left = badge.right() + 14
+        text_width = right - text_left
+        font.setPixelSize(14)
+        painter.setFont(font)
+        painter.setPen(QColor("#fff"))
+        title_rect = QRectF(text_left, rect.top() + 10, text_width, 20)
+        title = painter.fontMetrics().elidedText(record.title, Qt.TextElideMode.ElideRight, int(text_width))
+        painter.drawText(title_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, title)
+
+        font.setBold(False)
+        font.setPixelSize(12)
+        painter.setFont(font)
+        finished = datetime.fromtimestamp(record.finished_at).strftime("%Y-%m-%d %H:%M")
+        details = " · ".join(part for part in (record.channel, finished, format_size(record.size) if record.size else "") if part)
+        painter.setPen(QColor("#aaa"))
+        painter.drawText(QRectF(text_left, rect.top() + 30, text_width, 18),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, details)
+
+        if failed:
+            status_text, color = record.error or "Failed", "#f44336"
+        elif record.analysis:
+            summary, _ = summarize(json.loads(record.analysis))
+            status_text = summary + (f" · {record.warnings}" if record.warnings else "")
+            color = "#ff9800" if record.warnings else "#4caf50"
+        else:
+            status_text, color = "Completed", "#4caf50"
+        painter.setPen(QColor(color))
+        status_text = painter.fontMetrics().elidedText(status_text, Qt.TextElideMode.ElideRight, int(text_width))
+        painter.drawText(QRectF(text_left, rect.top() + 48, text_width, 18),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, status_text)
+        painter.restore()
+
 # --- Downloads View ---
 class DownloadsView(QWidget):
     def __init__(self):
         super().__init__()
         self.threadpool = QThreadPool()
+
+        # Downloads wait here until the AIMD controller allows another one
+        self.controller = AimdController()
+        self.download_queue = deque()
+        self.flights = SingleFlight() # Queued and running jobs by download_key()
+        self.running_downloads = 0
+        self.disk_hold_until = 0.0 # Set when a job found too little free space
+        self.disk_held = False
+        self.process_pool = None # Created when "process_downloads" is enabled
+        self.process_jobs = {} # job id -> DownloadJob
+        self.next_job_id = 1
+        self.resume_timer = QTimer(self)
+        self.resume_timer.setSingleShot(True)
+        self.resume_timer.timeout.connect(self.start_queued_downloads)
+        self.status_timer = QTimer(self)
+        self.status_timer.timeout.connect(self.update_concurrency_label)
+        self.status_timer.start(1000)
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         
+        header_row = QHBoxLayout()
         header = QLabel("Downloads")
         header.setStyleSheet("font-size: 24px; font-weight: bold; color: #fff; margin-bottom: 20px;")
-        layout.addWidget(header)
+        header_row.addWidget(header)
+        header_row.addStretch()
+
+        self.concurrency_label = QLabel("")
+        self.concurrency_label.setStyleSheet("color: #aaa; font-size: 13px; margin-right: 12px;")
+        header_row.addWidget(self.concurrency_label)
+
+        # Bandwidth Limit (applies live to all workers)
+        limit_label = QLabel("Limit:")
+        limit_label.setStyleSheet("color: #aaa; font-size: 13px;")
+        header_row.addWidget(limit_label)
+
+        self.limit_spin = QSpinBox()
+        self.limit_spin.setRange(0, 1000000)
+        self.limit_spin.setSingleStep(256)
+        self.limit_spin.setSuffix(" KB/s")
+        self.limit_spin.setSpecialValueText("Unlimited")
+        self.limit_spin.setFixedWidth(130)
+        self.limit_spin.setStyleSheet("""
+            QSpinBox {
+                padding: 6px;
+                border: 1px solid #333;
+                border-radius: 6px;
+                background-color: #252526;
+                color: #fff;
+            }
+        """)
+        self.limit_spin.valueChanged.connect(self.on_limit_changed)
+        header_row.addWidget(self.limit_spin)
+
+        trace_btn = QPushButton("Export Trace")
+        trace_btn.setToolTip("Save a timeline of recent jobs for chrome://tracing or ui.perfetto.dev")
+        trace_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        trace_btn.clicked.connect(self.export_trace)
+        header_row.addWidget(trace_btn)
+        layout.addLayout(header_row)
         
         # Tabs
         self.tabs = QTabWidget()
@@ -220,6 +636,10 @@ class DownloadsView(QWidget):
         self.active_layout = QVBoxLayout(self.active_widget)
         self.active_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
         self.active_layout.setSpacing(10)
+
+        self.queued_label = QLabel("")
+        self.queued_label.setStyleSheet("color: #aaa; font-size: 13px;")
+        self.active_layout.addWidget(self.queued_label)
         
         active_scroll = QScrollArea()
         active_scroll.setWidgetResizable(True)
@@ -227,41 +647,379 @@ class DownloadsView(QWidget):
         active_scroll.setStyleSheet("background: transparent; border: none;")
         self.tabs.addTab(active_scroll, "Active")
         
-        # Completed Tab
-        self.completed_widget = QWidget()
-        self.completed_widget.setStyleSheet("background: transparent;")
-        self.completed_layout = QVBoxLayout(self.completed_widget)
-        self.completed_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self.completed_layout.setSpacing(10)
-        
-        completed_scroll = QScrollArea()
-        completed_scroll.setWidgetResizable(True)
-        completed_scroll.setWidget(self.completed_widget)
-        completed_scroll.setStyleSheet("background: transparent; border: none;")
-        self.tabs.addTab(completed_scroll, "Completed")
+        # Completed Tab (persistent history, only visible rows are painted)
+        self.history = get_history()
+        self.history_model = HistoryModel(self.history)
 
-    def add_download(self, video_id, title):
-        # Get Path from Settings
+        completed_tab = QWidget()
+        completed_layout = QVBoxLayout(completed_tab)
+        completed_layout.setContentsMargins(0, 10, 0, 0)
+
+        filter_row = QHBoxLayout()
+        combo_style = """
+            QComboBox {
+                padding: 6px;
+                border: 1px solid #333;
+                border-radius: 6px;
+                background-color: #252526;
+                color: #fff;
+            }
+        """
+        self.date_filter = QComboBox()
+        self.date_filter.addItems(["Any Time", "Today", "Last 7 Days", "Last 30 Days"])
+        self.status_filter = QComboBox()
+        self.status_filter.addItems(["All Statuses", "Completed", "Failed", "With Warnings"])
+        self.channel_filter = QComboBox()
+        self.channel_filter.setMinimumWidth(180)
+        for combo in (self.date_filter, self.channel_filter, self.status_filter):
+            combo.setStyleSheet(combo_style)
+            combo.currentIndexChanged.connect(self.apply_history_filters)
+            filter_row.addWidget(combo)
+        filter_row.addStretch()
+
+        self.prev_page_btn = QPushButton("<")
+        self.next_page_btn = QPushButton(">")
+        self.page_label = QLabel("")
+        self.page_label.setStyleSheet("color: #aaa; font-size: 12px;")
+        for btn in (self.prev_page_btn, self.next_page_btn):
+            btn.setFixedSize(32, 28)
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.prev_page_btn.clicked.connect(lambda: self.change_history_page(-1))
+        self.next_page_btn.clicked.connect(lambda: self.change_history_page(1))
+        filter_row.addWidget(self.prev_page_btn)
+        filter_row.addWidget(self.page_label)
+        filter_row.addWidget(self.next_page_btn)
+        completed_layout.addLayout(filter_row)
+
+        self.history_view = QListView()
+        self.history_view.setModel(self.history_model)
+        self.history_view.setItemDelegate(HistoryDelegate())
+        self.history_view.setUniformItemSizes(True)
+        self.history_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.history_view.setStyleSheet("QListView { background: transparent; border: none; }")
+        completed_layout.addWidget(self.history_view)
+        self.tabs.addTab(completed_tab, "Completed")
+
+        # Shared Queue Tab (coordinator mode, shown when a queue file is configured)
+        self.shared_queue = None
+        self.shared_tab = QWidget()
+        shared_layout = QVBoxLayout(self.shared_tab)
+        shared_layout.setContentsMargins(0, 10, 0, 0)
+        self.shared_summary = QLabel("")
+        self.shared_summary.setStyleSheet("color: #aaa; font-size: 13px;")
+        shared_layout.addWidget(self.shared_summary)
+        self.shared_list = QListWidget()
+        self.shared_list.setStyleSheet("QListWidget { background: transparent; border: none; color: #fff; }")
+        shared_layout.addWidget(self.shared_list)
+        self.shared_timer = QTimer(self)
+        self.shared_timer.timeout.connect(self.refresh_shared_queue)
+
+        self.refresh_channel_filter()
+        self.apply_history_filters()
+
+        self.reload_settings()
+
+    def reload_settings(self):
         settings = QSettings("YouTubeFetcher", "Config")
+        configure_limiter(settings)
         default_path = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.DownloadLocation)
-        download_path = settings.value("download_path", default_path)
+        self.download_path = settings.value("download_path", default_path)
+        self.staging_path = settings.value("staging_path", "") or None
+        self.min_free_bytes = int_setting(settings, "min_free_mb", DEFAULT_MIN_FREE_MB) * 1024 * 1024
+        self.output_formats = settings.value("output_formats", DEFAULT_FORMATS) or DEFAULT_FORMATS
+        self.limit_spin.blockSignals(True)
+        self.limit_spin.setValue(int_setting(settings, "bandwidth_limit"))
+        self.limit_spin.blockSignals(False)
+        self.controller.set_max_limit(int_setting(settings, "max_downloads", DEFAULT_MAX_DOWNLOADS))
+        # Room for every permitted download plus post-download workers
+        self.threadpool.setMaxThreadCount(self.controller.max_limit + 2)
+        self.use_processes = str(settings.value("process_downloads", "false")).lower() == "true"
+        if self.process_pool:
+            self.process_pool.max_processes = self.controller.max_limit
+        self.open_shared_queue(settings.value("shared_queue", "") or "")
+        self.start_queued_downloads()
+
+    def open_shared_queue(self, path):
+        if self.shared_queue and self.shared_queue.path == path:
+            return
+        if self.shared_queue:
+            self.shared_queue.close()
+            self.shared_queue = None
+            self.shared_timer.stop()
+            self.tabs.removeTab(self.tabs.indexOf(self.shared_tab))
+        if not path:
+            return
+        try:
+            self.shared_queue = work_queue.WorkQueue(path)
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Shared Queue", f"Could not open {path}: {e}")
+            return
+        self.tabs.addTab(self.shared_tab, "Shared Queue")
+        self.shared_timer.start(2000)
+        self.refresh_shared_queue()
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "youtube-fetcher-trace.json",
+                                              "Chrome Trace (*.json)")
+        if not path:
+            return
+        try:
+            count = tracer.export(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Export Trace", f"Could not write {path}: {e}")
+            return
+        QMessageBox.information(self, "Export Trace",
+                                f"Saved {count} events. Open the file in ui.perfetto.dev or chrome://tracing.")
+
+    def on_limit_changed(self, value):
+        settings = QSettings("YouTubeFetcher", "Config")
+        settings.setValue("bandwidth_limit", value)
+        limiter.set_rate(value * 1024)
+
+    def add_download(self, video_id, title):
+        self.add_downloads([(video_id, title)])
+
+    def add_downloads(self, videos):
+        """
+        Queues [(video_id, title), ...] at once; the UI is updated a single
+        time. An optional third item is a section spec for a partial download.
+        """
+        if self.shared_queue:
+            # Coordinator mode: headless workers (work_queue.py) do the download
+            self.shared_queue.enqueue(videos)
+            self.refresh_shared_queue()
+            self.tabs.setCurrentWidget(self.shared_tab)
+            return
+
+        # Already queued or running (double click, re-selected): the existing job covers it
+        videos = [video for video in videos if self.flights.join(download_key(*video[:1], *video[2:3]))]
+        self.download_queue.extend(DownloadJob(*video) for video in videos)
+        self.start_queued_downloads()
+        self.tabs.setCurrentIndex(0)
+
+    def has_free_space(self):
+        if time.monotonic() < self.disk_hold_until:
+            return False
+        try:
+            return all(free_bytes(path) >= self.min_free_bytes
+                       for path in {self.download_path, self.staging_path} if path)
+        except OSError:
+            return True # Unreachable target; let the download report it
+
+    def start_queued_downloads(self):
+        remaining = self.controller.backoff_remaining()
+        self.disk_held = bool(self.download_queue) and not self.has_free_space()
+        if remaining > 0:
+            self.resume_timer.start(int(remaining * 1000) + 50)
+        elif self.disk_held:
+            self.resume_timer.start(DISK_RECHECK_SECONDS * 1000)
+        else:
+            while self.download_queue and self.running_downloads < self.controller.limit():
+                self.start_download(self.download_queue.popleft())
+        self.update_concurrency_label()
+        count = len(self.download_queue)
+        self.queued_label.setText(f"{count:,} queued" if count else "")
+        self.queued_label.setVisible(bool(count))
+
+    def start_download(self, job):
+        job.started_at = time.monotonic()
+        tracer.complete("queued", job.queued_at, job.started_at, {'attempt': job.attempts + 1}, track=job.track)
+        if job.item is None:
+            label = f"{job.title} [{describe_sections(job.sections)}]" if job.sections else job.title
+            job.item = DownloadItemWidget(label)
+            self.active_layout.insertWidget(1, job.item) # Newest first, below the queue count
+        download_path = self.download_path
+        self.running_downloads += 1
+
+        if self.use_processes:
+            self.start_process_download(job, download_path)
+            return
 
-        # Create Widget
-        item = DownloadItemWidget(title)
-        self.active_layout.insertWidget(0, item) # Add to top
-        
         # Create Worker
-        worker = DownloadWorker(video_id, title, download_path)
-        worker.signals.progress.connect(item.update_progress)
-        worker.signals.finished.connect(lambda: self.on_download_finished(item))
-        worker.signals.error.connect(item.set_error)
-        
+        worker = DownloadWorker(job.video_id, job.title, download_path, preview_cache_dir(), self.staging_path,
+                                job.track, job.sections, self.output_formats)
+        worker.signals.progress.connect(job.item.update_progress)
+        worker.signals.finished.connect(lambda path, meta: self.on_download_finished(job, path, meta))
+        worker.signals.error.connect(lambda e: self.on_download_error(job, e))
         self.threadpool.start(worker)
-        self.tabs.setCurrentIndex(0)
 
-    def on_download_finished(self, item):
-        item.set_finished()
-        # Move to completed
-        self.active_layout.removeWidget(item)
-        self.completed_layout.insertWidget(0, item)
-        item.setParent(self.completed_widget) # Reparent explicitly just in case
+    def start_process_download(self, job, download_path):
+        if self.process_pool is None:
+            self.process_pool = DownloadProcessPool(self.controller.max_limit)
+            self.process_pool.progressBatch.connect(self.on_process_progress)
+            self.process_pool.finished.connect(
+                lambda job_id, path, meta: self.on_download_finished(self.process_jobs.pop(job_id), path, meta))
+            self.process_pool.error.connect(
+                lambda job_id, e: self.on_download_error(self.process_jobs.pop(job_id), e))
+
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        self.process_jobs[job_id] = job
+        self.process_pool.submit(job_id, job.video_id, job.title, download_path, preview_cache_dir(),
+                                 self.staging_path, job.track, job.sections, self.output_formats)
+
+    def on_process_progress(self, batch):
+        for job_id, data in batch.items():
+            job = self.process_jobs.get(job_id)
+            if job:
+                job.item.update_progress(data)
+
+    def shutdown(self):
+        if self.process_pool:
+            self.process_pool.shutdown()
+
+    def update_concurrency_label(self):
+        text = self.controller.describe(self.running_downloads)
+        if self.disk_held:
+            text += " · held: low disk space"
+        self.concurrency_label.setText(text)
+
+    def on_download_finished(self, job, path, meta):
+        self.running_downloads -= 1
+        tracer.complete("attempt", job.started_at, time.monotonic(), {'result': 'finished'}, track=job.track)
+        # Under a bandwidth limit, slow downloads say nothing about the link
+        self.controller.record_success(None if limiter.current_rate() else meta.get('throughput'))
+        self.start_queued_downloads()
+        self.flights.finish(download_key(job.video_id, job.sections))
+
+        # Partial and multi-format downloads produce one file (and history entry) per section and format
+        for part_path, label, duration in meta.get('parts') or [(path, '', meta.get('duration') or None)]:
+            self.record_completed(job, part_path, label, duration, meta)
+
+        # The history list replaces the widget
+        self.active_layout.removeWidget(job.item)
+        job.item.deleteLater()
+        self.on_history_added(meta.get('channel', ''))
+
+    def record_completed(self, job, path, section, duration, meta):
+        title = f"{job.title} — {section}" if section else job.title
+        size = os.path.getsize(path) if path and os.path.exists(path) else 0
+        record_id = self.history.add(job.video_id, title, STATUS_COMPLETED,
+                                     channel=meta.get('channel', ''), path=path, size=size, section=section)
+
+        if path and path.lower().endswith('.wav'):
+            # Post-download stage: build the waveform peak pyramid
+            worker = WaveformWorker(path)
+            started = time.monotonic()
+            worker.signals.finished.connect(
+                lambda: tracer.complete("waveform", started, time.monotonic(), track=job.track))
+            worker.signals.finished.connect(lambda _, sidecar: self.on_waveform_finished(record_id, sidecar))
+            worker.signals.error.connect(lambda e: print(f"Waveform analysis failed: {e}"))
+            self.threadpool.start(worker)
+
+            # Optional quality checks, run in a separate process pool
+            settings = QSettings("YouTubeFetcher", "Config")
+            if str(settings.value("analyze_downloads", "false")).lower() == "true":
+                submit_analysis(path, duration,
+                                lambda _, result: self.on_analysis_finished(record_id, result),
+                                lambda _, e: print(f"Audio analysis failed: {e}"))
+
+    def on_download_error(self, job, error):
+        self.running_downloads -= 1
+        tracer.complete("attempt", job.started_at, time.monotonic(), {'result': error[:200]}, track=job.track)
+        if error.startswith(INSUFFICIENT_SPACE):
+            # Not the video's fault: hold the queue and try again later
+            job.item.eta_label.setText("Waiting for disk space")
+            job.queued_at = time.monotonic()
+            self.download_queue.appendleft(job)
+            self.disk_hold_until = time.monotonic() + DISK_RECHECK_SECONDS
+            self.start_queued_downloads()
+            return
+        if is_throttle_error(error) and job.attempts < MAX_RETRIES:
+            # Back off and retry ahead of newer items
+            job.attempts += 1
+            delay = self.controller.record_throttle()
+            job.item.set_retrying(job.attempts, delay)
+            job.queued_at = time.monotonic()
+            self.download_queue.appendleft(job)
+            self.start_queued_downloads()
+            return
+
+        self.start_queued_downloads()
+        self.flights.fail(download_key(job.video_id, job.sections), error)
+        job.item.set_error(error)
+        self.history.add(job.video_id, job.title, STATUS_FAILED, error=error)
+        self.on_history_added('')
+
+    def refresh_shared_queue(self):
+        queue = self.shared_queue
+        try:
+            queue.requeue_expired()
+            counts = queue.counts()
+            leased = queue.leased()
+            reported = queue.take_unreported()
+        except sqlite3.Error as e:
+            self.shared_summary.setText(f"Queue unavailable: {e}")
+            return
+
+        self.shared_summary.setText(" · ".join(f"{counts.get(status, 0)} {status}" for status in
+                                               (work_queue.STATUS_PENDING, work_queue.STATUS_LEASED,
+                                                work_queue.STATUS_DONE, work_queue.STATUS_FAILED)))
+        self.shared_list.clear()
+        for job in leased:
+            self.shared_list.addItem(f"{job.title}  —  {job.worker}  {job.progress:.0f}%")
+
+        # Results from other machines go into the local history
+        channels = set()
+        for job in reported:
+            if job.status == work_queue.STATUS_DONE:
+                meta = json.loads(job.meta or "{}")
+                channels.add(meta.get('channel', ''))
+                for path, section, *_ in meta.get('parts') or [(job.path, '')]:
+                    self.history.add(job.video_id, f"{job.title} — {section}" if section else job.title,
+                                     STATUS_COMPLETED, channel=meta.get('channel', ''), path=path, section=section)
+            else:
+                self.history.add(job.video_id, job.title, STATUS_FAILED, error=job.error)
+        for channel in channels or ([''] if reported else []):
+            self.on_history_added(channel)
+
+    def on_history_added(self, channel):
+        if channel and self.channel_filter.findText(channel) < 0:
+            self.refresh_channel_filter()
+        if self.history_model.page_index == 0:
+            self.history_model.reload()
+        self.update_page_label()
+
+    def on_waveform_finished(self, record_id, sidecar):
+        self.history.set_peaks(record_id, overview_peaks(PeakPyramid(sidecar)))
+        self.history_model.refresh_record(record_id)
+
+    def on_analysis_finished(self, record_id, result):
+        _, warnings = summarize(result)
+        self.history.set_analysis(record_id, result, warnings)
+        self.history_model.refresh_record(record_id)
+
+    # --- History Filters ---
+    def refresh_channel_filter(self):
+        current = self.channel_filter.currentText()
+        self.channel_filter.blockSignals(True)
+        self.channel_filter.clear()
+        self.channel_filter.addItem("All Channels")
+        self.channel_filter.addItems(self.history.channels())
+        index = self.channel_filter.findText(current)
+        self.channel_filter.setCurrentIndex(max(0, index))
+        self.channel_filter.blockSignals(False)
+
+    def apply_history_filters(self):
+        days = {1: 0, 2: 7, 3: 30}.get(self.date_filter.currentIndex())
+        since = None
+        if days == 0:
+            since = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        elif days:
+            since = time.time() - days * 86400
+
+        channel = self.channel_filter.currentText() if self.channel_filter.currentIndex() > 0 else None
+        status = {1: STATUS_COMPLETED, 2: STATUS_FAILED, 3: 'warnings'}.get(self.status_filter.currentIndex())
+        self.history_model.set_filters(since=since, channel=channel, status=status)
+        self.update_page_label()
+
+    def change_history_page(self, delta):
+        self.history_model.set_page(self.history_model.page_index + delta)
+        self.history_view.scrollToTop()
+        self.update_page_label()
+
+    def update_page_label(self):
+        model = self.history_model
+        self.page_label.setText(f"Page {model.page_index + 1} of {model.page_count()} ({model.total})")
+        self.prev_page_btn.setEnabled(model.page_index > 0)
+        self.next_page_btn.setEnabled(model.page_index + 1 < model.page_count())
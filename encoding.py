@@ -0,0 +1,70 @@
+"""
+Output profiles: the audio formats a download is converted to.
+
+A format list is a comma-separated string such as "wav,mp3", stored in the
+"output_formats" setting. All formats are written by one ffmpeg process
+that decodes the download once and feeds every encoder (one input, several
+outputs), so each extra format costs only its encode time, not another
+download and decode. The first format is the primary file: the one history,
+waveforms, playback and chapter splitting use.
+"""
+import os
+from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessor
+from yt_dlp.utils import replace_extension, prepend_extension
+from staging import WAV_BYTES_PER_SECOND
+
+# name -> (extension, ffmpeg output options, approximate bytes per second)
+PROFILES = {
+    'wav': ('wav', ['-c:a', 'pcm_s16le'], WAV_BYTES_PER_SECOND),
+    'flac': ('flac', ['-c:a', 'flac'], WAV_BYTES_PER_SECOND // 2),
+    'mp3': ('mp3', ['-c:a', 'libmp3lame', '-q:a', '2'], 190000 // 8),
+    'm4a': ('m4a', ['-c:a', 'aac', '-b:a', '192k'], 192000 // 8),
+    'opus': ('opus', ['-c:a', 'libopus', '-b:a', '160k'], 160000 // 8),
+}
+DEFAULT_FORMATS = "wav"
+EXTRA_FILEPATHS = 'extra_filepaths' # Info key with the non-primary outputs of a download
+
+def parse_formats(text):
+    """'wav, mp3' -> ['wav', 'mp3']. Empty means the default. Raises ValueError."""
+    formats = []
+    for name in (text or DEFAULT_FORMATS).split(','):
+        name = name.strip().lower()
+        if not name or name in formats:
+            continue
+        if name not in PROFILES:
+            raise ValueError(f"Unknown format {name!r}; expected one of {', '.join(PROFILES)}")
+        formats.append(name)
+    return formats or [DEFAULT_FORMATS]
+
+def output_bytes_per_second(formats):
+    return sum(PROFILES[name][2] for name in parse_formats(formats))
+
+class MultiEncodePP(FFmpegPostProcessor):
+    """
+    Replaces FFmpegExtractAudio: converts the downloaded file to every
+    format in one ffmpeg run. info['filepath'] becomes the primary output;
+    the others are listed under EXTRA_FILEPATHS.
+    """
+    def __init__(self, downloader=None, formats=DEFAULT_FORMATS):
+        super().__init__(downloader)
+        self.formats = parse_formats(formats)
+
+    @FFmpegPostProcessor._restrict_to(images=False)
+    def run(self, info):
+        source = info['filepath']
+        outputs = [replace_extension(source, PROFILES[name][0], info['ext']) for name in self.formats]
+        if source in outputs:
+            # Downloaded in one of the target containers; still re-encoded so every format matches
+            renamed = prepend_extension(source, 'orig')
+            os.replace(source, renamed)
+            source = renamed
+
+        self.to_screen(f"Encoding {', '.join(self.formats)} from one decode")
+        self.real_run_ffmpeg(
+            [(source, [])],
+            [(path, ['-map', '0:a:0', '-vn'] + PROFILES[name][1]) for path, name in zip(outputs, self.formats)])
+
+        info['filepath'] = outputs[0]
+        info['ext'] = PROFILES[self.formats[0]][0]
+        info[EXTRA_FILEPATHS] = outputs[1:]
+        return [source], info
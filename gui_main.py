@@ -1,17 +1,42 @@
 import sys
 import os
-import requests
 import yt_dlp
+from collections import deque
+from datetime import datetime
+from functools import partial
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QLineEdit, QPushButton, QScrollArea, QGridLayout, 
                              QFrame, QSizePolicy, QMessageBox, QSlider, QStyle, QStackedWidget,
-                             QTabWidget, QCheckBox, QComboBox, QFileDialog)
-from PyQt6.QtCore import Qt, pyqtSignal, QRunnable, QThreadPool, QObject, QSize, QUrl, QSettings, QStandardPaths
-from PyQt6.QtGui import QPixmap, QFont, QIcon, QColor, QPainter, QPainterPath
+                             QTabWidget, QCheckBox, QComboBox, QFileDialog, QSpinBox, QCompleter,
+                             QMenu, QInputDialog, QToolTip)
+from PyQt6.QtCore import (Qt, pyqtSignal, QRunnable, QObject, QSize, QUrl, QSettings, QStandardPaths,
+                          QTimer, QStringListModel, QEvent)
+from PyQt6.QtGui import QPixmap, QFont, QIcon, QColor, QPainter, QPainterPath, QImage
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 import qdarktheme
-from youtube_api import YouTubeManager
-from downloads import DownloadsView
+from youtube_api import YouTubeManager, pick_thumbnail
+from catalog import VideoCatalog, parse_timestamp
+from downloads import DownloadsView, format_size
+from info_cache import InfoCache, info_cache_path, estimated_wav_size, extract_shared, AUDIO_FORMAT
+from bandwidth import parse_schedule, int_setting
+from audio_proxy import AudioProxy, preview_cache_dir
+from waveform import WaveformScrubber, PeakPyramid, sidecar_path
+import analysis
+from history import get_history
+from watcher import ChannelWatcher, etag_cache_path, parse_channels, DEFAULT_INTERVAL_MINUTES
+from concurrency import DEFAULT_MAX_DOWNLOADS
+from staging import DEFAULT_MIN_FREE_MB
+from thumbnails import ImageWorker, THUMB_SIZE
+from tracing import tracer, PROCESS_CATALOG
+from snapshot import SnapshotStore, render_and_store, channel_key
+from paths import app_data_file
+from lanes import WorkLanes, INTERACTIVE, BACKGROUND
+from sections import parse_sections, SPLIT
+from encoding import parse_formats, PROFILES, DEFAULT_FORMATS
+from cancellation import CancelToken, Cancelled
+from singleflight import SingleFlight
+from watchdog import StallWatchdog
+import async_fetch
 import static_ffmpeg
 static_ffmpeg.add_paths()
 
@@ -188,77 +213,84 @@ QPushButton#controlBtn:pressed {
 
 # --- Worker Signals ---
 class WorkerSignals(QObject):
-    finished = pyqtSignal(list, str) # videos, next_page_token
+    finished = pyqtSignal(object, str) # VideoCatalog, channel
     error = pyqtSignal(str)
-    image_loaded = pyqtSignal(int, bytes) # index, data
-    url_ready = pyqtSignal(str, str) # video_id, stream_url
+    url_ready = pyqtSignal(str, str, str) # video_id, stream_url, format_id
 
 # --- Fetch Worker ---
 class FetchWorker(QRunnable):
-    def __init__(self, channel_id):
+    def __init__(self, channel_id, snapshot=None, token=None):
         super().__init__()
         self.channel_id = channel_id
+        self.snapshot = snapshot
+        self.token = token or CancelToken()
         self.signals = WorkerSignals()
 
     def run(self):
+        if self.token.cancelled:
+            return
+        track = tracer.track(f"Fetch {self.channel_id}", PROCESS_CATALOG)
         try:
-            yt = YouTubeManager()
-            videos = yt.get_channel_videos(self.channel_id)
-            self.signals.finished.emit(videos, "")
+            with tracer.on_track(track), tracer.span("fetch channel", cat='api') as args:
+                yt = YouTubeManager(etag_cache_path())
+                videos = yt.get_channel_videos(self.channel_id, self.token)
+                args['videos'] = len(videos)
+            if self.snapshot:
+                self.snapshot.save_catalog(self.channel_id, videos) # Browsable offline from now on
+            if not self.token.cancelled:
+                self.signals.finished.emit(videos, self.channel_id)
+        except Cancelled:
+            pass # Stopped between pages; nobody is waiting for it
         except Exception as e:
-            self.signals.error.emit(str(e))
-
-# --- Image Worker ---
-class ImageWorker(QRunnable):
-    def __init__(self, url, index):
-        super().__init__()
-        self.url = url
-        self.index = index
-        self.signals = WorkerSignals()
-
-    def run(self):
-        try:
-            response = requests.get(self.url, timeout=10)
-            if response.status_code == 200:
-                self.signals.image_loaded.emit(self.index, response.content)
-        except:
-            pass
+            if not self.token.cancelled:
+                self.signals.error.emit(str(e))
 
 # --- Stream URL Worker ---
 class StreamUrlWorker(QRunnable):
-    def __init__(self, video_id):
+    def __init__(self, video_id, info_cache=None, token=None):
         super().__init__()
         self.video_id = video_id
+        self.info_cache = info_cache
+        self.token = token or CancelToken()
         self.signals = WorkerSignals()
 
     def run(self):
+        if self.token.cancelled:
+            return
         try:
             ydl_opts = {
-                'format': 'bestaudio/best',
+                'format': AUDIO_FORMAT,
                 'quiet': True,
                 'no_warnings': True,
                 'noplaylist': True,
                 'extract_flat': False,
             }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(f"https://www.youtube.com/watch?v={self.video_id}", download=False)
-                url = info['url']
-                self.signals.url_ready.emit(self.video_id, url)
+            info = self.info_cache.get(self.video_id) if self.info_cache else None
+            if info is None:
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    # Joins a download's extraction of the same video if one is running; the
+                    # cached result lets DownloadWorker skip its own extraction later
+                    info = extract_shared(ydl, self.video_id, self.info_cache)
+            if not self.token.cancelled:
+                self.signals.url_ready.emit(self.video_id, info['url'], str(info.get('format_id', '')))
         except Exception as e:
             print(f"Error fetching stream URL: {e}")
-            self.signals.error.emit(str(e))
+            if not self.token.cancelled:
+                self.signals.error.emit(str(e))
 
 # --- Video Card Widget ---
 class VideoCard(QFrame):
     playClicked = pyqtSignal(str) 
     seekRequested = pyqtSignal(str, int) 
     downloadClicked = pyqtSignal(str, str) # id, title
+    sectionDownloadClicked = pyqtSignal(str, str, str) # id, title, section spec
+    selectionClicked = pyqtSignal(str, bool) # id, checked (user clicks only)
 
-    def __init__(self, video_data):
+    def __init__(self, video):
         super().__init__()
-        self.video_id = video_data['id']
-        self.title = video_data['title']
-        self.published_at = video_data['published_at'] 
+        self.video_id = video.id
+        self.title = video.title
+        self.published = video.published # Unix seconds
         self.setStyleSheet("""
             QFrame {
                 background-color: #252526;
@@ -304,7 +336,7 @@ class VideoCard(QFrame):
         center_layout.setContentsMargins(0, 2, 0, 2)
         
         # Title
-        self.title_label = QLabel(video_data['title'])
+        self.title_label = QLabel(self.title)
         self.title_label.setObjectName("titleLabel")
         self.title_label.setWordWrap(False) 
         self.title_label.setStyleSheet("color: #fff; font-weight: bold; font-size: 14px;")
@@ -315,10 +347,16 @@ class VideoCard(QFrame):
         bottom_row.setSpacing(10)
 
         # Date Label
-        date_str = video_data['published_at'].split('T')[0]
+        date_str = video.published_at.split('T')[0]
         self.date_label = QLabel(date_str)
         self.date_label.setStyleSheet("color: #888; font-size: 12px;")
         bottom_row.addWidget(self.date_label)
+
+        # Estimated WAV size, known once the video has been extracted
+        self.estimated_size = None
+        self.size_label = QLabel("")
+        self.size_label.setStyleSheet("color: #888; font-size: 12px;")
+        bottom_row.addWidget(self.size_label)
         
         # Slider
         self.slider = QSlider(Qt.Orientation.Horizontal)
@@ -352,6 +390,13 @@ class VideoCard(QFrame):
         self.slider.sliderReleased.connect(self.on_slider_release)
         bottom_row.addWidget(self.slider)
 
+        # Waveform (shown instead of the slider for downloaded tracks)
+        self.waveform = WaveformScrubber()
+        self.waveform.setFixedHeight(16)
+        self.waveform.seekRequested.connect(lambda ms: self.seekRequested.emit(self.video_id, ms))
+        self.waveform.hide()
+        bottom_row.addWidget(self.waveform)
+
         # Time Labels
         self.time_label = QLabel("0:00 / 0:00")
         self.time_label.setStyleSheet("color: #aaa; font-size: 11px;")
@@ -371,6 +416,9 @@ class VideoCard(QFrame):
         self.download_btn.setIcon(QIcon(QApplication.style().standardIcon(QStyle.StandardPixmap.SP_ArrowDown))) 
         self.download_btn.setIconSize(QSize(14, 14))
         self.download_btn.clicked.connect(self.on_download_click)
+        self.download_btn.setToolTip("Download (right-click to download part of the video)")
+        self.download_btn.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.download_btn.customContextMenuRequested.connect(self.show_download_menu)
         bottom_row.addWidget(self.download_btn)
 
         center_layout.addLayout(bottom_row)
@@ -396,6 +444,7 @@ class VideoCard(QFrame):
                 border-color: #666;
             }
         """)
+        self.checkbox.clicked.connect(lambda checked: self.selectionClicked.emit(self.video_id, checked))
         layout.addWidget(self.checkbox)
 
         self.is_playing = False
@@ -404,29 +453,13 @@ class VideoCard(QFrame):
     def is_checked(self):
         return self.checkbox.isChecked()
 
-    def set_thumbnail(self, data):
-        pixmap = QPixmap()
-        pixmap.loadFromData(data)
-        
-        # Crop to square 60x60
-        size = 60
-        scaled = pixmap.scaled(QSize(size, size), Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
-        x = (scaled.width() - size) // 2
-        y = (scaled.height() - size) // 2
-        cropped = scaled.copy(x, y, size, size)
-        
-        # Rounded corners
-        rounded = QPixmap(size, size)
-        rounded.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(rounded)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        path = QPainterPath()
-        path.addRoundedRect(0, 0, size, size, 8, 8)
-        painter.setClipPath(path)
-        painter.drawPixmap(0, 0, cropped)
-        painter.end()
-        
-        self.thumb_label.setPixmap(rounded)
+    def set_estimated_size(self, size):
+        self.estimated_size = size
+        self.size_label.setText(f"≈ {format_size(size)}" if size else "")
+
+    def set_thumbnail(self, image):
+        # Already decoded, cropped and rounded by ImageWorker
+        self.thumb_label.setPixmap(QPixmap.fromImage(image))
 
     def on_play_click(self):
         self.playClicked.emit(self.video_id)
@@ -434,6 +467,28 @@ class VideoCard(QFrame):
     def on_download_click(self):
         self.downloadClicked.emit(self.video_id, self.title)
 
+    def show_download_menu(self, pos):
+        menu = QMenu(self)
+        part_action = menu.addAction("Download Part...")
+        split_action = menu.addAction("Download Split by Chapters")
+        chosen = menu.exec(self.download_btn.mapToGlobal(pos))
+        if chosen is split_action:
+            self.sectionDownloadClicked.emit(self.video_id, self.title, SPLIT)
+        elif chosen is part_action:
+            spec, ok = QInputDialog.getText(
+                self, "Download Part",
+                "Time ranges and chapters, comma-separated:\n"
+                "  1:30-4:00    -5:00 (first five minutes)    58:00- (to the end)\n"
+                "  chapter:intro (chapters whose title matches)")
+            if not ok or not spec.strip():
+                return
+            try:
+                parse_sections(spec)
+            except ValueError as e:
+                QMessageBox.warning(self, "Download Part", str(e))
+                return
+            self.sectionDownloadClicked.emit(self.video_id, self.title, spec.strip())
+
     def set_playing_state(self, playing):
         self.is_playing = playing
         icon = QStyle.StandardPixmap.SP_MediaPause if playing else QStyle.StandardPixmap.SP_MediaPlay
@@ -471,10 +526,16 @@ class VideoCard(QFrame):
         minutes = (ms // 60000)
         return f"{minutes}:{seconds:02}"
 
+    def set_waveform(self, pyramid):
+        self.waveform.set_pyramid(pyramid)
+        self.slider.hide()
+        self.waveform.show()
+
     def update_slider(self, position, duration):
         if not self.is_seeking:
             self.slider.setMaximum(duration)
             self.slider.setValue(position)
+            self.waveform.set_position(position, duration)
         
         curr = self.format_time(position)
         total = self.format_time(duration)
@@ -493,30 +554,92 @@ class VideoCard(QFrame):
     def reset_ui(self):
         self.set_playing_state(False)
         self.slider.setValue(0)
+        self.waveform.set_position(0, 0)
         self.time_label.setText("0:00 / 0:00")
 
 # --- Views ---
 
+FIRST_SCREEN_CARDS = 15 # Built before the first frame; the rest follow in batches
+CARD_BATCH = 100
+
+def parse_query(text):
+    """Splits 'words after:YYYY-MM-DD before:YYYY-MM-DD' into (text, since, until). Raises ValueError."""
+    words, since, until = [], None, None
+    for token in text.split():
+        if token.startswith("after:"):
+            since = parse_timestamp(token[len("after:"):] + "T00:00:00Z")
+        elif token.startswith("before:"):
+            until = parse_timestamp(token[len("before:"):] + "T00:00:00Z")
+        else:
+            words.append(token)
+    return " ".join(words), since, until
+
 class HomeView(QWidget):
     requestDownload = pyqtSignal(str, str) # id, title
+    requestDownloads = pyqtSignal(list) # [(id, title[, section spec]), ...] in one batch
 
     def __init__(self):
         super().__init__()
-        self.threadpool = QThreadPool()
+        # Clicks (fetch, play) get their own threads; thumbnails and preloading can't delay them
+        self.lanes = WorkLanes()
+        self.watchdog = None # StallWatchdog, set by MainWindow; adds to the status tooltip
         # ... (rest of init) ...
         self.current_channel = None
+        self.catalog = VideoCatalog()
         self.video_widgets = [] 
         self.video_map = {} 
+        self.selection_anchor = None # Last clicked video, for shift-click ranges
+        self.catalog_saved_at = None # Set while showing a stored copy instead of a fresh fetch
+        self.filter_rows = None # Rows matching the search box, or None for all
+        self.carry_checked = set() # Selection kept across a refresh
+        # Shared by all work started for the cards on screen; replaced (and
+        # cancelled) whenever they are cleared, so stale results never land
+        self.token = CancelToken()
+        # Duplicate requests (stream URL, thumbnail, catalog) join the one in flight; scoped like the token
+        self.flights = SingleFlight()
+
+        # Every fetched channel is kept for instant startup and offline browsing
+        self.snapshot = SnapshotStore(app_data_file("snapshot.sqlite3"))
+        self.pending_rows = deque() # Catalog rows whose cards haven't been built yet
+        self.pending_head = [] # Rows above a restored scroll position, built bottom-up
+        self.card_timer = QTimer(self)
+        self.card_timer.setSingleShot(True)
+        self.card_timer.setInterval(0)
+        self.card_timer.timeout.connect(self.build_batch)
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(150)
+        self.filter_timer.timeout.connect(self.apply_filter)
+
+        # Thumbnails go through one asyncio loop when aiohttp is available
+        self.fetcher = None
+        if async_fetch.aiohttp:
+            self.fetcher = async_fetch.AsyncFetcher()
+            self.fetcher.batchReady.connect(self.on_images_loaded)
 
         # Audio Player
         self.player = QMediaPlayer()
         self.audio_output = QAudioOutput()
         self.player.setAudioOutput(self.audio_output)
-        self.player.positionChanged.connect(self.on_position_changed)
-        self.player.durationChanged.connect(self.on_duration_changed)
-        self.player.mediaStatusChanged.connect(self.on_media_status_changed)
+
+        # Second player that buffers the next track in "Play All" mode; the
+        # two swap roles at the end of each track
+        self.next_player = QMediaPlayer()
+        self.next_audio_output = QAudioOutput()
+        self.next_player.setAudioOutput(self.next_audio_output)
+        for player in (self.player, self.next_player):
+            # Only the active player drives the UI
+            player.positionChanged.connect(lambda pos, p=player: p is self.player and self.on_position_changed(pos))
+            player.durationChanged.connect(lambda dur, p=player: p is self.player and self.on_duration_changed(dur))
+            player.mediaStatusChanged.connect(lambda st, p=player: p is self.player and self.on_media_status_changed(st))
         
         self.current_video_id = None
+        self.play_all = False
+        self.preload_id = None # Video loaded (or being resolved) in next_player
+
+        # Local caching proxy the player streams through
+        self.audio_proxy = AudioProxy(preview_cache_dir())
+        self.info_cache = InfoCache(info_cache_path(preview_cache_dir()))
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -527,13 +650,25 @@ class HomeView(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Enter Channel ID or Handle (e.g. @GoogleDevelopers)")
         self.search_input.returnPressed.connect(self.start_new_search)
+        self.channel_model = QStringListModel()
+        completer = QCompleter(self.channel_model, self)
+        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.search_input.setCompleter(completer)
         header_layout.addWidget(self.search_input)
 
         self.search_btn = QPushButton("Fetch All Videos")
         self.search_btn.setProperty("class", "action-btn")
+        self.search_btn.setToolTip("Opens the saved copy if this channel was fetched before")
         self.search_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         self.search_btn.clicked.connect(self.start_new_search)
         header_layout.addWidget(self.search_btn)
+
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.setToolTip("Fetch this channel again in the background")
+        self.refresh_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.refresh_btn.setEnabled(False)
+        self.refresh_btn.clicked.connect(self.refresh_channel)
+        header_layout.addWidget(self.refresh_btn)
         
         # Sort Dropdown
         self.sort_combo = QComboBox()
@@ -554,6 +689,13 @@ class HomeView(QWidget):
         """)
         header_layout.addWidget(self.sort_combo)
 
+        # Play All (follows the current sort order)
+        self.play_all_btn = QPushButton("Play All")
+        self.play_all_btn.setCheckable(True)
+        self.play_all_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.play_all_btn.toggled.connect(self.toggle_play_all)
+        header_layout.addWidget(self.play_all_btn)
+
         # Download Selected Button
         self.download_selected_btn = QPushButton("Download Selected")
         self.download_selected_btn.setCursor(Qt.CursorShape.PointingHandCursor)
@@ -575,6 +717,30 @@ class HomeView(QWidget):
 
         layout.addLayout(header_layout)
 
+        # Selection Tools
+        selection_layout = QHBoxLayout()
+        for text, handler in (("Select All", self.select_all), ("Select None", self.select_none)):
+            btn = QPushButton(text)
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn.clicked.connect(handler)
+            selection_layout.addWidget(btn)
+
+        self.select_filter_input = QLineEdit()
+        self.select_filter_input.setPlaceholderText("Search: title words, after:2020-01-01, before:2021-01-01")
+        self.select_filter_input.textChanged.connect(self.filter_timer.start)
+        self.select_filter_input.returnPressed.connect(self.select_matching)
+        selection_layout.addWidget(self.select_filter_input)
+
+        select_matching_btn = QPushButton("Select Matching")
+        select_matching_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        select_matching_btn.clicked.connect(self.select_matching)
+        selection_layout.addWidget(select_matching_btn)
+
+        self.selection_label = QLabel("")
+        self.selection_label.setStyleSheet("color: #aaa; font-size: 12px;")
+        selection_layout.addWidget(self.selection_label)
+        layout.addLayout(selection_layout)
+
         # Scroll Area
         self.scroll = QScrollArea()
         self.scroll.setWidgetResizable(True)
@@ -588,13 +754,86 @@ class HomeView(QWidget):
         
         self.scroll.setWidget(self.scroll_content)
         layout.addWidget(self.scroll)
+        self.scroll_target = None # Video to scroll to once its card is laid out
+        self.scroll_offset = 0 # Pixels from the top of scroll_target's card to the top of the view
+        self.scroll.verticalScrollBar().rangeChanged.connect(self.apply_scroll_target)
+        self.scroll.verticalScrollBar().actionTriggered.connect(lambda _: setattr(self, 'scroll_target', None))
 
         # Status Label
         self.status_label = QLabel("Ready to fetch.")
         self.status_label.setObjectName("statusLabel")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.status_label.installEventFilter(self) # Tooltip with per-lane queue waits
         layout.addWidget(self.status_label)
 
+        self.update_channel_list()
+        self.restore_session()
+
+    def eventFilter(self, obj, event):
+        if obj is self.status_label and event.type() == QEvent.Type.ToolTip:
+            text = self.lanes.describe()
+            if self.watchdog and self.watchdog.is_running():
+                text += "\n" + self.watchdog.describe()
+            QToolTip.showText(event.globalPos(), text, self.status_label)
+            return True
+        return super().eventFilter(obj, event)
+
+    # --- Session Snapshot ---
+    def restore_session(self):
+        """Shows the channel from the last session, from the local store only."""
+        settings = QSettings("YouTubeFetcher", "Config")
+        self.sort_combo.setCurrentIndex(int_setting(settings, "session/sort"))
+        channel = settings.value("session/channel", "")
+        saved = self.snapshot.load_catalog(channel) if channel else None
+        if not saved:
+            return
+        self.current_channel = channel
+        self.search_input.setText(channel)
+        self.select_filter_input.setText(settings.value("session/query", ""))
+        self.filter_timer.stop() # show_catalog() applies it
+        self.show_catalog(saved[0], saved[1], top_video_id=settings.value("session/top_video", ""))
+
+    def save_session(self):
+        settings = QSettings("YouTubeFetcher", "Config")
+        settings.setValue("session/channel", self.current_channel or "")
+        settings.setValue("session/sort", self.sort_combo.currentIndex())
+        settings.setValue("session/query", self.select_filter_input.text())
+        settings.setValue("session/top_video", self.top_visible_video() or "")
+
+    def top_visible_video(self):
+        if self.scroll_target:
+            return self.scroll_target # Still restoring; geometry isn't final yet
+        card = self.top_visible_card()
+        return card.video_id if card else None
+
+    def top_visible_card(self):
+        offset = self.scroll.verticalScrollBar().value()
+        for card in self.video_widgets:
+            if not card.isHidden() and card.geometry().bottom() >= offset:
+                return card
+        return None
+
+    def anchor_scroll(self):
+        # Cards inserted above the view would push it down; pin the card at the top instead
+        if self.scroll_target:
+            return
+        card = self.top_visible_card()
+        if card is not None:
+            self.scroll_target = card.video_id
+            self.scroll_offset = self.scroll.verticalScrollBar().value() - card.y()
+
+    def apply_scroll_target(self):
+        # Cards get their geometry (and the scroll range grows) a few events
+        # after they're added, so this runs on every range change until the
+        # user scrolls themselves
+        card = self.video_map.get(self.scroll_target)
+        if card is not None and card.isVisible():
+            self.scroll.verticalScrollBar().setValue(card.y() + self.scroll_offset)
+
+    def update_channel_list(self):
+        self.channel_model.setStringList([name for name, _, _ in self.snapshot.channels()])
+
+    # --- Channel Loading ---
     def start_new_search(self):
         channel = self.search_input.text().strip()
         if not channel:
@@ -602,52 +841,204 @@ class HomeView(QWidget):
 
         self.stop_current_video()
         self.current_channel = channel
-        self.video_widgets.clear()
-        self.video_map.clear()
-        
-        while self.list_layout.count():
-            item = self.list_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
+        saved = self.snapshot.load_catalog(channel)
+        if saved:
+            # Previously fetched: no network until Refresh is pressed
+            self.show_catalog(*saved)
+            return
 
+        self.clear_cards()
+        self.catalog = VideoCatalog()
+        self.refresh_btn.setEnabled(False)
         self.status_label.setText("Fetching all videos... This might take a while.")
         self.search_btn.setEnabled(False)
         self.search_input.setEnabled(False)
         self.fetch_videos()
 
-    def fetch_videos(self):
-        worker = FetchWorker(self.current_channel)
-        worker.signals.finished.connect(self.on_fetch_finished)
-        worker.signals.error.connect(self.on_fetch_error)
-        self.threadpool.start(worker)
+    def refresh_channel(self):
+        if not self.current_channel:
+            return
+        self.refresh_btn.setEnabled(False)
+        self.status_label.setText(f"{len(self.catalog)} videos · refreshing in the background...")
+        self.fetch_videos()
 
-    def on_fetch_finished(self, videos, _):
+    def fetch_videos(self):
+        key = ('catalog', channel_key(self.current_channel), '')
+        if not self.flights.join(key, self.on_fetch_finished, self.on_fetch_error):
+            return # Already being fetched
+        flights = self.flights
+        worker = FetchWorker(self.current_channel, self.snapshot, self.token)
+        worker.signals.finished.connect(lambda catalog, channel: flights.finish(key, catalog, channel))
+        worker.signals.error.connect(lambda e: flights.fail(key, e))
+        self.lanes.start(worker, INTERACTIVE)
+
+    def on_fetch_finished(self, catalog, channel):
         self.search_btn.setEnabled(True)
         self.search_input.setEnabled(True)
-        start_index = len(self.video_widgets)
-        
-        for i, video in enumerate(videos):
+        self.update_channel_list()
+        if channel != self.current_channel:
+            return # A background refresh for a channel that is no longer shown
+
+        top_video_id = self.top_visible_video()
+        checked = {card.video_id for card in self.video_widgets if card.is_checked()}
+        self.stop_current_video()
+        self.show_catalog(catalog, top_video_id=top_video_id, checked=checked)
+
+    def clear_cards(self):
+        # Drops queued thumbnail/stream/fetch work for the old cards and aborts running thumbnail GETs
+        self.token.cancel()
+        self.token = CancelToken()
+        self.flights = SingleFlight() # Cancelled work never finishes its flights
+        self.card_timer.stop()
+        self.pending_rows.clear()
+        self.pending_head.clear()
+        self.scroll_target = None
+        self.video_widgets.clear()
+        self.video_map.clear()
+        self.selection_anchor = None
+        self.update_selection_label()
+
+        while self.list_layout.count():
+            item = self.list_layout.takeAt(0)
+            widget = item.widget()
+            if widget:
+                widget.deleteLater()
+
+    def show_catalog(self, catalog, saved_at=None, top_video_id=None, checked=()):
+        """
+        Replaces the cards with catalog (a stored copy if saved_at is set).
+        Only the first screen of cards is built right away, starting at
+        top_video_id if given; the rest are built in batches between events
+        so the window stays responsive.
+        """
+        self.clear_cards()
+        self.catalog = catalog
+        self.catalog_saved_at = saved_at
+        self.carry_checked = set(checked)
+        self.refresh_btn.setEnabled(True)
+        self.apply_filter()
+
+        rows = catalog.rows_by_date(newest_first=self.sort_combo.currentIndex() == 0)
+        start = rows.index(catalog.row_of[top_video_id]) if top_video_id in catalog else 0
+        self.pending_head.extend(rows[:start])
+        self.pending_rows.extend(rows[start:])
+        self.build_cards(FIRST_SCREEN_CARDS)
+        if top_video_id in catalog:
+            self.scroll_target = top_video_id
+            self.scroll_offset = 0
+        self.update_status()
+
+    def build_batch(self):
+        # Above a restored position and below it fill in together
+        above = min(len(self.pending_head), CARD_BATCH // 2)
+        self.build_cards_above(above)
+        self.build_cards(CARD_BATCH - above)
+
+    def build_cards(self, count):
+        """Builds up to count pending cards below the built ones."""
+        rows = [self.pending_rows.popleft() for _ in range(min(count, len(self.pending_rows)))]
+        self.add_cards(rows, len(self.video_widgets))
+        if self.pending_rows or self.pending_head:
+            self.card_timer.start()
+
+    def build_cards_above(self, count):
+        """Builds the count pending cards nearest above the built ones."""
+        if not count:
+            return
+        rows = self.pending_head[-count:]
+        del self.pending_head[-count:]
+        self.anchor_scroll()
+        self.add_cards(rows, 0)
+
+    def add_cards(self, rows, index):
+        """Creates cards for rows and inserts them at index in the list."""
+        cards = []
+        dpr = self.devicePixelRatioF()
+        pixels = round(THUMB_SIZE * dpr)
+        video_ids = [self.catalog.ids[row] for row in rows]
+        stored = self.snapshot.thumbnails(video_ids, pixels, dpr)
+
+        for row in rows:
+            video = self.catalog[row]
             card = VideoCard(video)
             card.playClicked.connect(self.handle_play_click)
             card.seekRequested.connect(self.handle_seek)
             card.downloadClicked.connect(self.requestDownload.emit)
-            self.list_layout.addWidget(card)
-            self.video_widgets.append(card)
-            self.video_map[video['id']] = card
-
-            if video['thumbnail']:
-                worker = ImageWorker(video['thumbnail'], start_index + i)
-                worker.signals.image_loaded.connect(self.on_image_loaded)
-                self.threadpool.start(worker)
-
-        self.status_label.setText(f"Found {len(self.video_widgets)} videos.")
-        self.sort_videos() 
+            card.sectionDownloadClicked.connect(
+                lambda video_id, title, spec: self.requestDownloads.emit([(video_id, title, spec)]))
+            card.selectionClicked.connect(self.on_selection_clicked)
+            if video.id in self.carry_checked:
+                card.checkbox.setChecked(True)
+            if self.filter_rows is not None and row not in self.filter_rows:
+                card.hide()
+            self.list_layout.insertWidget(index + len(cards), card)
+            cards.append(card)
+            self.video_map[video.id] = card
+
+            if video.id in stored:
+                card.set_thumbnail(stored[video.id])
+                continue
+            if self.catalog_saved_at:
+                continue # Offline copy: missing thumbnails wait for a refresh
+            thumbnail = pick_thumbnail(video.thumbnails, THUMB_SIZE * dpr)
+            key = ('thumbnail', video.id, pixels)
+            if not thumbnail or not self.flights.join(key, self.on_image_loaded):
+                continue
+            processor = partial(render_and_store, self.snapshot, video.id, dpr=dpr)
+            if self.fetcher:
+                self.fetcher.fetch(thumbnail, (self.token, key), processor, self.token)
+            else:
+                worker = ImageWorker(thumbnail, video.id, dpr, processor, self.token)
+                worker.signals.image_loaded.connect(
+                    lambda video_id, image, token=self.token, key=key:
+                        token is self.token and self.flights.finish(key, video_id, image))
+                worker.signals.failed.connect(
+                    lambda _, token=self.token, key=key: token is self.token and self.flights.fail(key, None))
+                self.lanes.start(worker, BACKGROUND)
+
+        self.video_widgets[index:index] = cards
+        self.update_estimates(video_ids)
+
+    def finish_cards(self):
+        """Builds any cards still pending, for operations that need all of them."""
+        self.card_timer.stop()
+        self.build_cards_above(len(self.pending_head))
+        self.build_cards(len(self.pending_rows))
+
+    def update_status(self):
+        total = len(self.catalog)
+        if self.filter_rows is not None:
+            text = f"{len(self.filter_rows)} of {total} videos match."
+        else:
+            text = f"Found {total} videos."
+        if self.catalog_saved_at:
+            saved = datetime.fromtimestamp(self.catalog_saved_at).strftime('%Y-%m-%d %H:%M')
+            text += f" Saved copy from {saved}; Refresh to update."
+        self.status_label.setText(text)
+
+    def apply_filter(self):
+        """Shows only the videos matching the search box. Works on the catalog, so offline too."""
+        try:
+            text, since, until = parse_query(self.select_filter_input.text())
+        except ValueError:
+            return # Incomplete date while typing
+        self.scroll_target = None
+        if text or since is not None or until is not None:
+            self.filter_rows = set(self.catalog.match_rows(text, since, until))
+        else:
+            self.filter_rows = None
+        row_of = self.catalog.row_of
+        for card in self.video_widgets:
+            card.setVisible(self.filter_rows is None or row_of[card.video_id] in self.filter_rows)
+        if self.catalog:
+            self.update_status()
 
     def sort_videos(self):
+        self.scroll_target = None
+        self.finish_cards() # Pending rows are in the old order
         if not self.video_widgets:
             return
-            
+
         sort_mode = self.sort_combo.currentIndex() # 0 = Newest, 1 = Oldest
         
         # Remove all from layout
@@ -656,33 +1047,102 @@ class HomeView(QWidget):
             
         # Sort
         reverse = (sort_mode == 0) 
-        self.video_widgets.sort(key=lambda x: x.published_at, reverse=reverse)
+        self.video_widgets.sort(key=lambda x: x.published, reverse=reverse)
         
         # Add back
         for card in self.video_widgets:
             self.list_layout.addWidget(card)
 
+    # --- Selection ---
+    def set_selected(self, cards, checked):
+        for card in cards:
+            card.checkbox.setChecked(checked)
+        self.update_selection_label()
+
+    def select_all(self):
+        self.finish_cards()
+        self.set_selected(self.video_widgets, True)
+
+    def select_none(self):
+        self.set_selected(self.video_widgets, False)
+
+    def on_selection_clicked(self, video_id, checked):
+        anchor = self.selection_anchor
+        self.selection_anchor = video_id
+        if anchor in self.video_map and QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier:
+            # Shift-click: apply to everything between the two clicks, in display order
+            start = self.video_widgets.index(self.video_map[anchor])
+            end = self.video_widgets.index(self.video_map[video_id])
+            if start > end:
+                start, end = end, start
+            self.set_selected(self.video_widgets[start:end + 1], checked)
+        else:
+            self.update_selection_label()
+
+    def select_matching(self):
+        try:
+            text, since, until = parse_query(self.select_filter_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Select Matching", "Dates must be written as YYYY-MM-DD.")
+            return
+        # Matched against the catalog columns, then reflected on the cards
+        self.finish_cards()
+        rows = self.catalog.match_rows(text, since, until)
+        self.set_selected([self.video_map[self.catalog.ids[row]] for row in rows], True)
+
+    def update_estimates(self, video_ids):
+        # Local lookup only; videos never extracted stay unknown
+        for video_id, (duration, _) in self.info_cache.estimates(video_ids).items():
+            if video_id in self.video_map:
+                self.video_map[video_id].set_estimated_size(estimated_wav_size(duration))
+        self.update_selection_label()
+
+    def update_selection_label(self):
+        selected = [card for card in self.video_widgets if card.is_checked()]
+        if not selected:
+            self.selection_label.setText("")
+            return
+        known = [card.estimated_size for card in selected if card.estimated_size]
+        text = f"{len(selected)} selected"
+        if known:
+            text += f" · ≈ {format_size(sum(known))}"
+            if len(known) < len(selected):
+                text += f" for {len(known)} (others unknown)"
+        self.selection_label.setText(text)
+
     def download_selected_videos(self):
-        count = 0
-        for card in self.video_widgets:
-            if card.checkbox.isChecked():
-                self.requestDownload.emit(card.video_id, card.title)
-                count += 1
-        
-        if count > 0:
-            QMessageBox.information(self, "Batch Download", f"Started {count} downloads.")
+        videos = [(card.video_id, card.title) for card in self.video_widgets if card.is_checked()]
+        if videos:
+            self.requestDownloads.emit(videos)
+            QMessageBox.information(self, "Batch Download", f"Queued {len(videos)} downloads.")
         else:
             QMessageBox.warning(self, "Batch Download", "No videos selected.")
 
     def on_fetch_error(self, error):
         self.search_btn.setEnabled(True)
         self.search_input.setEnabled(True)
+        if self.video_widgets:
+            # A refresh failed (offline?); the stored copy stays usable
+            self.refresh_btn.setEnabled(True)
+            self.status_label.setText(f"Refresh failed, still showing {len(self.catalog)} saved videos: {error}")
+            return
         self.status_label.setText("Error occurred.")
         QMessageBox.critical(self, "Error", str(error))
 
-    def on_image_loaded(self, index, data):
-        if 0 <= index < len(self.video_widgets):
-            self.video_widgets[index].set_thumbnail(data)
+    def on_images_loaded(self, batch):
+        for (token, key), image in batch:
+            if token is not self.token:
+                continue
+            if image is not None:
+                self.flights.finish(key, key[1], image)
+            else:
+                self.flights.fail(key, None)
+
+    def on_image_loaded(self, video_id, image):
+        # Keyed by ID, so sorting or filtering in the meantime doesn't matter
+        card = self.video_map.get(video_id)
+        if card is not None:
+            card.set_thumbnail(image)
 
     def handle_play_click(self, video_id):
         if self.current_video_id == video_id:
@@ -696,24 +1156,130 @@ class HomeView(QWidget):
             self.stop_current_video()
             self.current_video_id = video_id
             self.video_map[video_id].set_playing_state(True)
+
+            # Already downloaded or fully cached: play locally, no extraction
+            local_url = self.local_source_url(video_id)
+            if local_url:
+                self.play_source(local_url)
+                return
+
             self.status_label.setText("Fetching audio stream...")
-            worker = StreamUrlWorker(video_id)
-            worker.signals.url_ready.connect(self.on_url_ready)
-            worker.signals.error.connect(self.on_stream_error)
-            self.threadpool.start(worker)
+            self.resolve_stream(video_id, self.on_stream_error, INTERACTIVE)
+
+    def resolve_stream(self, video_id, on_error, lane, priority=0):
+        """
+        Resolves video_id's stream URL for on_url_ready. A play click on the
+        video being preloaded joins that request instead of starting another,
+        and its error handler replaces the preload's.
+        """
+        key = ('stream', video_id, AUDIO_FORMAT)
+        if not self.flights.join(key, self.on_url_ready, on_error, upgrade=lane == INTERACTIVE):
+            return
+        flights = self.flights
+        worker = StreamUrlWorker(video_id, self.info_cache, self.token)
+        worker.signals.url_ready.connect(lambda *result: flights.finish(key, *result))
+        worker.signals.error.connect(lambda e: flights.fail(key, e))
+        self.lanes.start(worker, lane, priority)
 
     def stop_current_video(self):
         if self.current_video_id and self.current_video_id in self.video_map:
             self.video_map[self.current_video_id].reset_ui()
         self.player.stop()
         self.current_video_id = None
+        self.clear_preload()
 
-    def on_url_ready(self, video_id, url):
-        if self.current_video_id != video_id:
-            return 
+    # --- Play All ---
+    def toggle_play_all(self, enabled):
+        self.play_all = enabled
+        if not enabled:
+            self.clear_preload()
+            return
+        if self.current_video_id:
+            self.preload_next()
+        elif self.video_widgets:
+            self.handle_play_click(self.video_widgets[0].video_id)
+
+    def next_in_order(self, video_id):
+        # Looked up on demand so re-sorting and filtering mid-playback are respected
+        card = self.video_map.get(video_id)
+        if card is None or card not in self.video_widgets:
+            return None
+        for card in self.video_widgets[self.video_widgets.index(card) + 1:]:
+            if not card.isHidden():
+                return card.video_id
+        # Past the built cards the order continues with the pending rows; only
+        # the cards up to the next match are built, since it needs one to play in
+        for index, row in enumerate(self.pending_rows):
+            if self.filter_rows is None or row in self.filter_rows:
+                self.build_cards(index + 1)
+                return self.catalog.ids[row]
+        return None
+
+    def preload_next(self):
+        if not self.play_all:
+            return
+        next_id = self.next_in_order(self.current_video_id)
+        if not next_id or next_id == self.preload_id:
+            return
+        self.clear_preload()
+        self.preload_id = next_id
+        local_url = self.local_source_url(next_id)
+        if local_url:
+            self.next_player.setSource(QUrl(local_url))
+            return
+        self.resolve_stream(next_id, lambda e: print(f"Preload failed: {e}"),
+                            BACKGROUND, priority=1) # Ahead of thumbnails
+
+    def clear_preload(self):
+        self.preload_id = None
+        self.next_player.stop()
+        self.next_player.setSource(QUrl())
+
+    def advance_play_all(self):
+        next_id = self.next_in_order(self.current_video_id)
+        if not next_id:
+            self.play_all_btn.setChecked(False)
+            return False
+        if next_id != self.preload_id or self.next_player.source().isEmpty():
+            self.handle_play_click(next_id) # Not buffered yet; take the normal path
+            return True
+
+        # Swap: the buffered player starts immediately, the old one becomes the preloader
+        self.next_player.play()
+        self.player, self.next_player = self.next_player, self.player
+        self.audio_output, self.next_audio_output = self.next_audio_output, self.audio_output
+        self.video_map[self.current_video_id].reset_ui()
+        self.current_video_id = next_id
+        self.video_map[next_id].set_playing_state(True)
+        self.preload_id = None
+        self.next_player.setSource(QUrl())
+        self.preload_next()
+        return True
+
+    def local_source_url(self, video_id):
+        path = get_history().find_path(video_id)
+        if path and os.path.exists(path):
+            peaks = sidecar_path(path)
+            if os.path.exists(peaks):
+                self.video_map[video_id].set_waveform(PeakPyramid(peaks))
+            return self.audio_proxy.register_file(video_id, path)
+        return self.audio_proxy.cached_url(video_id)
+
+    def play_source(self, url):
         self.player.setSource(QUrl(url))
         self.player.play()
         self.status_label.setText("Playing audio...")
+        self.preload_next()
+
+    def on_url_ready(self, video_id, url, format_id):
+        self.update_estimates([video_id])
+        if video_id == self.preload_id and video_id != self.current_video_id:
+            # Setting the source makes the idle player start buffering through the proxy
+            self.next_player.setSource(QUrl(self.audio_proxy.register_remote(video_id, url, format_id)))
+            return
+        if self.current_video_id != video_id:
+            return 
+        self.play_source(self.audio_proxy.register_remote(video_id, url, format_id))
 
     def on_stream_error(self, error):
         self.status_label.setText("Error fetching stream.")
@@ -737,6 +1303,8 @@ class HomeView(QWidget):
             
     def on_media_status_changed(self, status):
         if status == QMediaPlayer.MediaStatus.EndOfMedia:
+            if self.play_all and self.current_video_id and self.advance_play_all():
+                return
             if self.current_video_id:
                 self.video_map[self.current_video_id].set_playing_state(False)
                 self.video_map[self.current_video_id].slider.setValue(0)
@@ -744,6 +1312,8 @@ class HomeView(QWidget):
 # Removed DownloadsView (Imported from downloads.py)
 
 class SettingsView(QWidget):
+    settingsChanged = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.settings = QSettings("YouTubeFetcher", "Config")
@@ -813,6 +1383,187 @@ class SettingsView(QWidget):
             }
         """)
         form_layout.addWidget(self.api_input)
+
+        # Bandwidth Limit
+        limit_label = QLabel("Bandwidth Limit (0 = Unlimited):")
+        limit_label.setStyleSheet("color: #aaa; font-size: 14px; margin-top: 10px;")
+        form_layout.addWidget(limit_label)
+
+        self.limit_spin = QSpinBox()
+        self.limit_spin.setRange(0, 1000000)
+        self.limit_spin.setSingleStep(256)
+        self.limit_spin.setSuffix(" KB/s")
+        self.limit_spin.setSpecialValueText("Unlimited")
+        self.limit_spin.setStyleSheet("""
+            QSpinBox {
+                padding: 10px;
+                background-color: #252526;
+                border: 1px solid #333;
+                border-radius: 5px;
+                color: #fff;
+            }
+        """)
+        form_layout.addWidget(self.limit_spin)
+
+        # Bandwidth Schedule
+        schedule_label = QLabel("Bandwidth Schedule (overrides limit, e.g. 08:00=512, 18:00=0):")
+        schedule_label.setStyleSheet("color: #aaa; font-size: 14px; margin-top: 10px;")
+        form_layout.addWidget(schedule_label)
+
+        self.schedule_input = QLineEdit()
+        self.schedule_input.setPlaceholderText("HH:MM=KBps, HH:MM=KBps")
+        self.schedule_input.setStyleSheet("""
+            QLineEdit {
+                padding: 10px;
+                background-color: #252526;
+                border: 1px solid #333;
+                border-radius: 5px;
+                color: #fff;
+            }
+        """)
+        form_layout.addWidget(self.schedule_input)
+
+        self.limit_thumbs_check = QCheckBox("Apply limit to thumbnail fetches")
+        self.limit_thumbs_check.setStyleSheet("color: #aaa; font-size: 14px;")
+        form_layout.addWidget(self.limit_thumbs_check)
+
+        # Parallel downloads (upper bound; lowered automatically when throttled)
+        max_downloads_label = QLabel("Max Parallel Downloads:")
+        max_downloads_label.setStyleSheet("color: #aaa; font-size: 14px; margin-top: 10px;")
+        form_layout.addWidget(max_downloads_label)
+
+        self.max_downloads_spin = QSpinBox()
+        self.max_downloads_spin.setRange(1, 32)
+        self.max_downloads_spin.setStyleSheet("""
+            QSpinBox {
+                padding: 10px;
+                background-color: #252526;
+                border: 1px solid #333;
+                border-radius: 5px;
+                color: #fff;
+            }
+        """)
+        form_layout.addWidget(self.max_downloads_spin)
+
+        self.process_downloads_check = QCheckBox("Run downloads in separate processes (for many parallel downloads)")
+        self.process_downloads_check.setStyleSheet("color: #aaa; font-size: 14px;")
+        form_layout.addWidget(self.process_downloads_check)
+
+        # Output formats (all encoded from one decode of the download)
+        formats_label = QLabel("Output Formats (first is the main file):")
+        formats_label.setStyleSheet("color: #aaa; font-size: 14px; margin-top: 10px;")
+        form_layout.addWidget(formats_label)
+
+        self.formats_input = QLineEdit()
+        self.formats_input.setPlaceholderText(f"e.g. wav, mp3 — available: {', '.join(PROFILES)}")
+        self.formats_input.setStyleSheet("""
+            QLineEdit {
+                padding: 10px;
+                background-color: #252526;
+                border: 1px solid #333;
+                border-radius: 5px;
+                color: #fff;
+            }
+        """)
+        form_layout.addWidget(self.formats_input)
+
+        # Staging (fast local disk; finished files are moved into the download folder)
+        staging_label = QLabel("Staging Folder (optional) and Minimum Free Space:")
+        staging_label.setStyleSheet("color: #aaa; font-size: 14px; margin-top: 10px;")
+        form_layout.addWidget(staging_label)
+
+        staging_row = QHBoxLayout()
+        self.staging_input = QLineEdit()
+        self.staging_input.setPlaceholderText("Download and convert here first, e.g. a local SSD")
+        self.staging_input.setStyleSheet("""
+            QLineEdit {
+                padding: 10px;
+                background-color: #252526;
+                border: 1px solid #333;
+                border-radius: 5px;
+                color: #fff;
+            }
+        """)
+        staging_row.addWidget(self.staging_input)
+
+        self.min_free_spin = QSpinBox()
+        self.min_free_spin.setRange(0, 1000000)
+        self.min_free_spin.setSingleStep(512)
+        self.min_free_spin.setSuffix(" MB free")
+        self.min_free_spin.setStyleSheet("""
+            QSpinBox {
+                padding: 10px;
+                background-color: #252526;
+                border: 1px solid #333;
+                border-radius: 5px;
+                color: #fff;
+            }
+        """)
+        staging_row.addWidget(self.min_free_spin)
+        form_layout.addLayout(staging_row)
+
+        # Shared queue (coordinator mode)
+        shared_label = QLabel("Shared Queue File (optional; workers run work_queue.py):")
+        shared_label.setStyleSheet("color: #aaa; font-size: 14px; margin-top: 10px;")
+        form_layout.addWidget(shared_label)
+
+        self.shared_queue_input = QLineEdit()
+        self.shared_queue_input.setPlaceholderText("/shared/queue.sqlite3")
+        self.shared_queue_input.setStyleSheet("""
+            QLineEdit {
+                padding: 10px;
+                background-color: #252526;
+                border: 1px solid #333;
+                border-radius: 5px;
+                color: #fff;
+            }
+        """)
+        form_layout.addWidget(self.shared_queue_input)
+
+        # Post-download analysis
+        self.analyze_check = QCheckBox("Analyze downloads (duration, loudness, silence)")
+        self.analyze_check.setStyleSheet("color: #aaa; font-size: 14px;")
+        form_layout.addWidget(self.analyze_check)
+
+        # UI stall watchdog (report written on exit)
+        self.watchdog_check = QCheckBox("Detect UI stalls and save a report of their causes on exit")
+        self.watchdog_check.setStyleSheet("color: #aaa; font-size: 14px;")
+        form_layout.addWidget(self.watchdog_check)
+
+        # Watched Channels
+        watch_label = QLabel("Watched Channels (new uploads are queued automatically):")
+        watch_label.setStyleSheet("color: #aaa; font-size: 14px; margin-top: 10px;")
+        form_layout.addWidget(watch_label)
+
+        watch_row = QHBoxLayout()
+        self.watch_input = QLineEdit()
+        self.watch_input.setPlaceholderText("@handle, UC..., https://youtube.com/@handle")
+        self.watch_input.setStyleSheet("""
+            QLineEdit {
+                padding: 10px;
+                background-color: #252526;
+                border: 1px solid #333;
+                border-radius: 5px;
+                color: #fff;
+            }
+        """)
+        watch_row.addWidget(self.watch_input)
+
+        self.watch_interval_spin = QSpinBox()
+        self.watch_interval_spin.setRange(1, 24 * 60)
+        self.watch_interval_spin.setPrefix("Every ")
+        self.watch_interval_spin.setSuffix(" min")
+        self.watch_interval_spin.setStyleSheet("""
+            QSpinBox {
+                padding: 10px;
+                background-color: #252526;
+                border: 1px solid #333;
+                border-radius: 5px;
+                color: #fff;
+            }
+        """)
+        watch_row.addWidget(self.watch_interval_spin)
+        form_layout.addLayout(watch_row)
         
         # Save Button
         save_btn = QPushButton("Save Settings")
@@ -854,9 +1605,47 @@ class SettingsView(QWidget):
         api_key = self.settings.value("api_key", "")
         self.api_input.setText(api_key)
 
+        # Bandwidth
+        self.limit_spin.setValue(int_setting(self.settings, "bandwidth_limit"))
+        self.schedule_input.setText(self.settings.value("bandwidth_schedule", ""))
+        self.limit_thumbs_check.setChecked(str(self.settings.value("limit_thumbnails", "false")).lower() == "true")
+        self.analyze_check.setChecked(str(self.settings.value("analyze_downloads", "false")).lower() == "true")
+        self.watchdog_check.setChecked(str(self.settings.value("stall_watchdog", "false")).lower() == "true")
+        self.max_downloads_spin.setValue(int_setting(self.settings, "max_downloads", DEFAULT_MAX_DOWNLOADS))
+        self.process_downloads_check.setChecked(str(self.settings.value("process_downloads", "false")).lower() == "true")
+        self.shared_queue_input.setText(self.settings.value("shared_queue", ""))
+        self.staging_input.setText(self.settings.value("staging_path", ""))
+        self.min_free_spin.setValue(int_setting(self.settings, "min_free_mb", DEFAULT_MIN_FREE_MB))
+        self.formats_input.setText(self.settings.value("output_formats", DEFAULT_FORMATS))
+
+        # Watched Channels
+        self.watch_input.setText(", ".join(parse_channels(self.settings.value("watched_channels", ""))))
+        self.watch_interval_spin.setValue(int_setting(self.settings, "watch_interval", DEFAULT_INTERVAL_MINUTES))
+
     def save_settings(self):
+        try:
+            parse_schedule(self.schedule_input.text())
+            formats = parse_formats(self.formats_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Settings", str(e))
+            return
+
         self.settings.setValue("download_path", self.path_input.text())
         self.settings.setValue("api_key", self.api_input.text())
+        self.settings.setValue("bandwidth_limit", self.limit_spin.value())
+        self.settings.setValue("bandwidth_schedule", self.schedule_input.text().strip())
+        self.settings.setValue("limit_thumbnails", self.limit_thumbs_check.isChecked())
+        self.settings.setValue("analyze_downloads", self.analyze_check.isChecked())
+        self.settings.setValue("stall_watchdog", self.watchdog_check.isChecked())
+        self.settings.setValue("max_downloads", self.max_downloads_spin.value())
+        self.settings.setValue("process_downloads", self.process_downloads_check.isChecked())
+        self.settings.setValue("shared_queue", self.shared_queue_input.text().strip())
+        self.settings.setValue("staging_path", self.staging_input.text().strip())
+        self.settings.setValue("min_free_mb", self.min_free_spin.value())
+        self.settings.setValue("output_formats", ",".join(formats))
+        self.settings.setValue("watched_channels", ", ".join(parse_channels(self.watch_input.text())))
+        self.settings.setValue("watch_interval", self.watch_interval_spin.value())
+        self.settingsChanged.emit()
         QMessageBox.information(self, "Settings", "Settings saved successfully!")
 
 class Sidebar(QWidget):
@@ -927,6 +1716,20 @@ class MainWindow(QMainWindow):
         # Connect Download Signal
         self.home_view.requestDownload.connect(self.downloads_view.add_download)
         self.home_view.requestDownload.connect(lambda: self.switch_view(1)) # Auto switch to downloads
+        self.home_view.requestDownloads.connect(self.downloads_view.add_downloads)
+        self.home_view.requestDownloads.connect(lambda: self.switch_view(1))
+        self.settings_view.settingsChanged.connect(self.downloads_view.reload_settings)
+
+        # Watched channels: new uploads go straight into the download queue
+        self.watcher = ChannelWatcher()
+        self.watcher.newUploads.connect(self.on_new_uploads)
+        self.settings_view.settingsChanged.connect(self.watcher.reload_settings)
+
+        # Event-loop latency and stall sampling, off unless enabled in Settings
+        self.watchdog = StallWatchdog(parent=self)
+        self.home_view.watchdog = self.watchdog
+        self.settings_view.settingsChanged.connect(self.reload_watchdog)
+        self.reload_watchdog()
 
         # Connect Navigation
         self.sidebar.btn_home.clicked.connect(lambda: self.switch_view(0))
@@ -937,6 +1740,22 @@ class MainWindow(QMainWindow):
         self.sidebar.btn_home.setChecked(True)
         self.switch_view(0)
 
+    def on_new_uploads(self, videos):
+        self.downloads_view.add_downloads(videos)
+
+    def reload_watchdog(self):
+        settings = QSettings("YouTubeFetcher", "Config")
+        if str(settings.value("stall_watchdog", "false")).lower() == "true":
+            self.watchdog.start()
+        else:
+            self.watchdog.stop()
+
+    def save_stall_report(self):
+        self.watchdog.stop()
+        path = app_data_file("stall_report.txt")
+        if self.watchdog.write_report(path):
+            print(f"UI stall report: {path}")
+
     def switch_view(self, index):
         self.stack.setCurrentIndex(index)
         # Update button states
@@ -947,6 +1766,10 @@ class MainWindow(QMainWindow):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     qdarktheme.setup_theme(additional_qss=STYLESHEET) 
+    app.aboutToQuit.connect(analysis.shutdown)
     window = MainWindow()
+    app.aboutToQuit.connect(window.downloads_view.shutdown)
+    app.aboutToQuit.connect(window.home_view.save_session)
+    app.aboutToQuit.connect(window.save_stall_report)
     window.show()
     sys.exit(app.exec())
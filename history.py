@@ -0,0 +1,121 @@
+import json
+import time
+import sqlite3
+from paths import app_data_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    channel TEXT NOT NULL DEFAULT '',
+    path TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    finished_at REAL NOT NULL,
+    error TEXT NOT NULL DEFAULT '',
+    analysis TEXT NOT NULL DEFAULT '',
+    warnings TEXT NOT NULL DEFAULT '',
+    peaks BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_downloads_finished ON downloads (finished_at);
+CREATE INDEX IF NOT EXISTS idx_downloads_video ON downloads (video_id);
+CREATE INDEX IF NOT EXISTS idx_downloads_channel ON downloads (channel);
+"""
+
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+
+class HistoryRecord:
+    """Lightweight row for the Completed list; no widgets, no Qt objects."""
+    __slots__ = ('id', 'video_id', 'title', 'channel', 'path', 'status', 'size',
+                 'finished_at', 'error', 'analysis', 'warnings', 'peaks')
+
+    def __init__(self, row):
+        for name, value in zip(self.__slots__, row):
+            setattr(self, name, value)
+
+_history = None
+
+def get_history():
+    # Shared instance; only used from the GUI thread
+    global _history
+    if _history is None:
+        _history = DownloadHistory()
+    return _history
+
+class DownloadHistory:
+    """Persistent record of finished and failed downloads (SQLite)."""
+    def __init__(self, path=None):
+        self.path = path or app_data_file("history.sqlite3")
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(downloads)")}
+        if 'section' not in columns: # Files from before partial downloads
+            self.db.execute("ALTER TABLE downloads ADD COLUMN section TEXT NOT NULL DEFAULT ''")
+        self.db.commit()
+
+    def add(self, video_id, title, status, channel='', path='', size=0, error='', section=''):
+        """section labels one part of a partial download; such files never stand in for the whole video."""
+        cursor = self.db.execute(
+            "INSERT INTO downloads (video_id, title, channel, path, status, size, finished_at, error, section) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (video_id, title, channel, path, status, size, time.time(), error, section))
+        self.db.commit()
+        return cursor.lastrowid
+
+    def set_analysis(self, record_id, result, warnings):
+        self.db.execute("UPDATE downloads SET analysis = ?, warnings = ? WHERE id = ?",
+                        (json.dumps(result), ", ".join(warnings), record_id))
+        self.db.commit()
+
+    def set_peaks(self, record_id, peaks):
+        self.db.execute("UPDATE downloads SET peaks = ? WHERE id = ?", (peaks, record_id))
+        self.db.commit()
+
+    def find_path(self, video_id):
+        """Most recent completed file for a video, or None."""
+        row = self.db.execute(
+            "SELECT path FROM downloads WHERE video_id = ? AND status = ? AND path != '' AND section = '' "
+            "ORDER BY finished_at DESC LIMIT 1", (video_id, STATUS_COMPLETED)).fetchone()
+        return row[0] if row else None
+
+    def where_clause(self, since=None, channel=None, status=None):
+        clauses, params = [], []
+        if since:
+            clauses.append("finished_at >= ?")
+            params.append(since)
+        if channel:
+            clauses.append("channel = ?")
+            params.append(channel)
+        if status == 'warnings':
+            clauses.append("warnings != ''")
+        elif status:
+            clauses.append("status = ?")
+            params.append(status)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, **filters):
+        where, params = self.where_clause(**filters)
+        return self.db.execute(f"SELECT COUNT(*) FROM downloads{where}", params).fetchone()[0]
+
+    def page(self, offset, limit, **filters):
+        where, params = self.where_clause(**filters)
+        columns = ", ".join(HistoryRecord.__slots__)
+        rows = self.db.execute(
+            f"SELECT {columns} FROM downloads{where} ORDER BY finished_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]).fetchall()
+        return [HistoryRecord(row) for row in rows]
+
+    def get(self, record_id):
+        columns = ", ".join(HistoryRecord.__slots__)
+        row = self.db.execute(f"SELECT {columns} FROM downloads WHERE id = ?", (record_id,)).fetchone()
+        return HistoryRecord(row) if row else None
+
+    def channels(self):
+        rows = self.db.execute(
+            "SELECT DISTINCT channel FROM downloads WHERE channel != '' ORDER BY channel").fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        self.db.close()
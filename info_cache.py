@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+from contextlib import closing
+from urllib.parse import urlparse, parse_qs
+from staging import WAV_BYTES_PER_SECOND
+from singleflight import SingleFlight
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS info (
+    video_id TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    expires REAL NOT NULL,
+    fetched_at REAL NOT NULL,
+    duration REAL NOT NULL DEFAULT 0,
+    source_size INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+DEFAULT_TTL = 5 * 3600 # Stream URLs without an expire= parameter
+EXPIRY_MARGIN = 15 * 60 # Long enough to finish a download started just before expiry
+AUDIO_FORMAT = 'bestaudio/best' # What both previews and downloads select
+# Large fields yt-dlp doesn't need to download audio again
+DROPPED_KEYS = ('automatic_captions', 'subtitles', 'heatmap', 'thumbnails', 'description')
+
+def info_cache_path(cache_dir):
+    """The info cache lives next to the preview cache directory."""
+    return os.path.join(os.path.dirname(cache_dir.rstrip(os.sep)), "info_cache.sqlite3")
+
+def url_expiry(info, fetched_at):
+    """Earliest expire= timestamp among the selected format URLs."""
+    formats = info.get('requested_formats') or [info]
+    expiries = []
+    for f in formats:
+        expire = parse_qs(urlparse(f.get('url') or '').query).get('expire')
+        if expire and expire[0].isdigit():
+            expiries.append(int(expire[0]))
+    return min(expiries) if expiries else fetched_at + DEFAULT_TTL
+
+def source_size(info):
+    formats = info.get('requested_formats') or [info]
+    return sum(f.get('filesize') or f.get('filesize_approx') or 0 for f in formats)
+
+def estimated_wav_size(duration):
+    return int(duration * WAV_BYTES_PER_SECOND)
+
+# Extractions running in this process, so a preview started while the
+# download of the same video is extracting waits for that one
+extractions = SingleFlight()
+
+def extract_shared(ydl, video_id, info_cache=None):
+    """
+    Extracts video_id with ydl (whose format must be AUDIO_FORMAT) and stores
+    the result in info_cache. Concurrent calls for the same video share one
+    extraction. Returns a sanitized info dict, ready for process_ie_result().
+    """
+    def extract():
+        info = ydl.sanitize_info(ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False))
+        if info_cache:
+            info_cache.put(video_id, info)
+        return info
+    return extractions.do(('extract', video_id, AUDIO_FORMAT), extract)
+
+class InfoCache:
+    """
+    Extracted yt-dlp info dicts keyed by video ID (SQLite, zlib-compressed
+    JSON). Entries are only handed out for downloading while their stream
+    URLs are valid; duration and size stay usable for estimates after that.
+    Opens a connection per call, so it is safe from worker threads and
+    processes.
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.connect() as db:
+            db.executescript(SCHEMA)
+
+    def connect(self):
+        return closing(sqlite3.connect(self.path, timeout=10))
+
+    def get(self, video_id):
+        """Info dict whose URLs are still valid, or None."""
+        with self.connect() as db:
+            row = db.execute("SELECT body FROM info WHERE video_id = ? AND expires > ?",
+                             (video_id, time.time() + EXPIRY_MARGIN)).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def put(self, video_id, info):
+        """Stores a sanitized (JSON-safe) info dict, e.g. from YoutubeDL.sanitize_info."""
+        now = time.time()
+        slim = {k: v for k, v in info.items() if k not in DROPPED_KEYS}
+        with self.connect() as db:
+            db.execute("INSERT OR REPLACE INTO info (video_id, body, expires, fetched_at, duration, source_size) "
+                       "VALUES (?, ?, ?, ?, ?, ?)",
+                       (video_id, zlib.compress(json.dumps(slim).encode('utf-8')), url_expiry(info, now),
+                        now, info.get('duration') or 0, source_size(info)))
+            db.commit()
+
+    def drop(self, video_id):
+        with self.connect() as db:
+            db.execute("DELETE FROM info WHERE video_id = ?", (video_id,))
+            db.commit()
+
+    def estimates(self, video_ids):
+        """video_id -> (duration, source_size) for every cached video, expired or not. No network."""
+        result = {}
+        video_ids = list(video_ids)
+        with self.connect() as db:
+            for i in range(0, len(video_ids), 500): # Stay under SQLite's variable limit
+                chunk = video_ids[i:i + 500]
+                rows = db.execute(f"SELECT video_id, duration, source_size FROM info "
+                                  f"WHERE video_id IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+                result.update((row[0], (row[1], row[2])) for row in rows)
+        return result
+
@@ -0,0 +1,74 @@
+import time
+import threading
+from collections import deque
+from PyQt6.QtCore import QRunnable, QThreadPool, QThread
+from tracing import tracer, PROCESS_OTHER
+
+INTERACTIVE = 'interactive' # Started by a click and watched: fetch, play, seek
+BACKGROUND = 'background' # Bulk work nobody waits on: thumbnails, preloading
+WAIT_SAMPLES = 1000 # Recent queue waits kept per lane for percentiles
+
+class _TimedRunnable(QRunnable):
+    """Runs another runnable and reports how long it sat in the queue."""
+    def __init__(self, runnable, lane):
+        super().__init__()
+        self.runnable = runnable
+        self.lane = lane
+        self.queued_at = time.monotonic()
+
+    def run(self):
+        self.lane.record_wait(self.queued_at, time.monotonic())
+        self.runnable.run()
+
+class Lane:
+    """One thread pool plus its queue-wait statistics."""
+    def __init__(self, name, max_threads):
+        self.name = name
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+        self.started = 0
+        self.lock = threading.Lock()
+        self.track = tracer.track(f"{name} lane queue", PROCESS_OTHER)
+
+    def start(self, runnable, priority=0):
+        self.pool.start(_TimedRunnable(runnable, self), priority)
+
+    def record_wait(self, queued_at, started_at):
+        with self.lock:
+            self.waits.append(started_at - queued_at)
+            self.started += 1
+        tracer.complete("queue wait", queued_at, started_at, track=self.track)
+
+    def summary(self):
+        """{'started', 'p50', 'p95', 'max'}; waits in seconds over the recent samples."""
+        with self.lock:
+            waits = sorted(self.waits)
+            started = self.started
+        if not waits:
+            return {'started': started, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+        return {'started': started, 'p50': waits[len(waits) // 2],
+                'p95': waits[min(len(waits) - 1, int(len(waits) * 0.95))], 'max': waits[-1]}
+
+class WorkLanes:
+    """
+    Separate pools for interactive and background work, so a play click never
+    queues behind thousands of thumbnail jobs: the interactive lane has its
+    own threads, and background jobs can't occupy them. Within a lane, the
+    priority argument orders queued jobs as in QThreadPool.start().
+    """
+    def __init__(self, interactive_threads=4, background_threads=None):
+        background_threads = background_threads or max(4, QThread.idealThreadCount())
+        self.lanes = {INTERACTIVE: Lane(INTERACTIVE, interactive_threads),
+                      BACKGROUND: Lane(BACKGROUND, background_threads)}
+
+    def start(self, runnable, lane=BACKGROUND, priority=0):
+        self.lanes[lane].start(runnable, priority)
+
+    def describe(self):
+        lines = []
+        for name, lane in self.lanes.items():
+            s = lane.summary()
+            lines.append(f"{name}: {s['started']} jobs, queue wait p50 {s['p50'] * 1000:.0f} ms, "
+                         f"p95 {s['p95'] * 1000:.0f} ms, max {s['max'] * 1000:.0f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,8 @@
+import os
+from PyQt6.QtCore import QStandardPaths
+
+def app_data_file(name):
+    """Path of a file in the per-user application data directory."""
+    data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, name)
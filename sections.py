@@ -0,0 +1,159 @@
+"""
+Partial downloads: time ranges and chapters of a video.
+
+A section spec is a comma-separated string, stored as-is on jobs:
+
+    1:30-4:00          a time range (h:mm:ss, m:ss or seconds)
+    -5:00              the first five minutes
+    58:00-             from 58:00 to the end
+    chapter:intro      chapters whose title matches the regex (case-insensitive)
+    split              the whole video, one file per chapter
+
+Ranges and chapters are fetched with yt-dlp's download_ranges, which hands
+each section to FFmpeg; FFmpeg seeks in the remote stream with HTTP range
+requests, so only the needed part is transferred and converted.
+"""
+import os
+import re
+from yt_dlp.utils import download_range_func
+
+SPLIT = "split"
+CHAPTER_PREFIX = "chapter:"
+
+# One file per section; chapter titles are added when the section is a chapter
+SECTION_OUTTMPL = '%(title)s - %(section_start>%H-%M-%S)s%(section_title& {}|)s.%(ext)s'
+CHAPTER_OUTTMPL = '%(title)s - %(section_number)02d %(section_title)s.%(ext)s'
+
+def parse_time(text):
+    """'1:02:03', '4:05' or '90' -> seconds."""
+    parts = text.strip().split(':')
+    if not 1 <= len(parts) <= 3 or not all(re.fullmatch(r'\d+(\.\d+)?', p) for p in parts):
+        raise ValueError(f"Not a time: {text!r}")
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def format_time(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60}:{rest % 60:02d}"
+
+class Sections:
+    __slots__ = ('ranges', 'chapters', 'split')
+
+    def __init__(self, ranges=(), chapters=(), split=False):
+        self.ranges = list(ranges) # [(start, end)], end may be inf
+        self.chapters = list(chapters) # Title regexes
+        self.split = split
+
+def parse_sections(spec):
+    """Parses a section spec (see module docstring). Raises ValueError."""
+    sections = Sections()
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        if item.lower() == SPLIT:
+            sections.split = True
+        elif item.lower().startswith(CHAPTER_PREFIX):
+            pattern = item[len(CHAPTER_PREFIX):].strip()
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Bad chapter pattern {pattern!r}: {e}")
+            sections.chapters.append(pattern)
+        elif '-' in item:
+            start, _, end = item.partition('-')
+            start = parse_time(start) if start.strip() else 0.0
+            end = parse_time(end) if end.strip() else float('inf')
+            if end <= start:
+                raise ValueError(f"Range ends before it starts: {item!r}")
+            sections.ranges.append((start, end))
+        else:
+            raise ValueError(f"Expected a range like 1:30-4:00, chapter:<title> or split, got {item!r}")
+    if sections.split and (sections.ranges or sections.chapters):
+        raise ValueError("split downloads the whole video; it can't be combined with ranges or chapters.")
+    return sections
+
+def describe(spec):
+    """Short label for the UI, e.g. '1:30–4:00, chapter intro'."""
+    sections = parse_sections(spec)
+    if sections.split:
+        return "split by chapters"
+    labels = [f"{format_time(start)}–{'end' if end == float('inf') else format_time(end)}"
+              for start, end in sections.ranges]
+    labels += [f"chapter {pattern}" for pattern in sections.chapters]
+    return ", ".join(labels)
+
+def ydl_options(spec, directory):
+    """
+    yt-dlp options for a spec: download_ranges plus a per-section output
+    template, or a chapter splitter that runs after the WAV conversion.
+    Returns {} for an empty spec.
+    """
+    sections = parse_sections(spec)
+    if sections.split:
+        return {
+            'outtmpl': {'chapter': os.path.join(directory, CHAPTER_OUTTMPL)},
+            'postprocessors': [{'key': 'FFmpegSplitChapters', 'force_keyframes': False}],
+        }
+    if sections.ranges or sections.chapters:
+        return {
+            'download_ranges': download_range_func([f"(?i){p}" for p in sections.chapters], sections.ranges),
+            'outtmpl': {'default': os.path.join(directory, SECTION_OUTTMPL)},
+        }
+    return {}
+
+def requested_duration(info, spec):
+    """
+    Seconds of audio a spec downloads from a video (the sum of its ranges
+    and matching chapters), or None if unknown. Split downloads the whole
+    video.
+    """
+    sections = parse_sections(spec)
+    duration = info.get('duration')
+    if sections.split:
+        return duration
+    total = 0.0
+    for start, end in sections.ranges:
+        if end == float('inf') or (duration and end > duration):
+            if not duration:
+                return None
+            end = duration
+        total += max(0.0, end - start)
+    if sections.chapters:
+        chapters = info.get('chapters') or []
+        # Matched like download_range_func does
+        total += sum(chapter_length(c) or 0 for c in chapters
+                     if any(re.search(f"(?i){p}", c.get('title') or '') for p in sections.chapters))
+    return total
+
+def section_outputs(info, spec):
+    """
+    [(path, label, duration)] of the files a finished partial download
+    produced; duration is the part's expected length in seconds, or None
+    if unknown (e.g. a range to the end of a video of unknown length). For
+    split, the full-length file is deleted once its chapters exist.
+    """
+    downloads = info.get('requested_downloads') or []
+    if parse_sections(spec).split:
+        source = downloads[0] if downloads else info
+        chapters = [c for c in source.get('chapters') or info.get('chapters') or []
+                    if c.get('filepath') and os.path.exists(c['filepath'])]
+        if not chapters:
+            return [(source.get('filepath') or '', "no chapters", info.get('duration') or None)] # Keep the full file
+        if source.get('filepath') and os.path.exists(source['filepath']):
+            os.remove(source['filepath'])
+        return [(c['filepath'], c.get('title') or f"chapter {i + 1}", chapter_length(c)) for i, c in enumerate(chapters)]
+
+    outputs = []
+    for d in downloads:
+        start, end = d.get('section_start') or 0, d.get('section_end')
+        label = d.get('section_title') or f"{format_time(start)}–{format_time(end) if end else 'end'}"
+        outputs.append((d.get('filepath') or '', label, end - start if end else None))
+    return outputs
+
+def chapter_length(chapter):
+    start, end = chapter.get('start_time'), chapter.get('end_time')
+    return end - start if start is not None and end is not None else None
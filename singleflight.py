@@ -0,0 +1,91 @@
+import copy
+import threading
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Collapses identical concurrent requests into one operation. Keys are
+    (operation, video_id, format) tuples. The first join() for a key starts
+    the work; later ones attach to it, and all of them are called back with
+    the same result when it finishes. Thread-safe; callbacks run on the
+    thread that calls finish()/fail() (the GUI thread for signal-driven
+    work).
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {} # key -> [(on_done, on_error), ...]
+        self.running = {} # key -> _Call, for do()
+
+    def join(self, key, on_done=None, on_error=None, upgrade=False):
+        """
+        Registers the callbacks for key. Returns True if the caller should
+        start the work, False if it is already in flight. Each on_done is
+        called once per flight with a single error handler: the one it was
+        first registered with, or this on_error if upgrade is set (e.g. a
+        click taking over a background preload's request).
+        """
+        with self.lock:
+            waiters = self.calls.get(key)
+            first = waiters is None
+            if first:
+                waiters = self.calls[key] = []
+            index = next((i for i, (done, _) in enumerate(waiters) if on_done and done == on_done), None)
+            if index is not None:
+                if upgrade:
+                    waiters[index] = (on_done, on_error)
+            elif (on_done, on_error) != (None, None) and (on_done, on_error) not in waiters:
+                waiters.append((on_done, on_error))
+        return first
+
+    def in_flight(self, key):
+        with self.lock:
+            return key in self.calls
+
+    def finish(self, key, *result):
+        """Ends the flight and calls every on_done with result."""
+        for on_done, _ in self._pop(key):
+            if on_done:
+                on_done(*result)
+
+    def fail(self, key, error):
+        """Ends the flight and calls every on_error with error."""
+        for _, on_error in self._pop(key):
+            if on_error:
+                on_error(error)
+
+    def _pop(self, key):
+        with self.lock:
+            return self.calls.pop(key, [])
+
+    def do(self, key, fn):
+        """
+        Blocking form for worker threads: runs fn() once for concurrent
+        callers with the same key. Every caller gets its own deep copy of
+        the result (so it can mutate it), or the same exception.
+        """
+        with self.lock:
+            call = self.running.get(key)
+            leader = call is None
+            if leader:
+                call = self.running[key] = _Call()
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self.lock:
+                    del self.running[key]
+                call.done.set()
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return copy.deepcopy(call.result)
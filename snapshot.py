@@ -0,0 +1,104 @@
+import time
+import zlib
+import sqlite3
+from contextlib import closing
+from PyQt6.QtCore import QBuffer, QIODevice
+from PyQt6.QtGui import QImage
+from catalog import VideoCatalog
+from thumbnails import render_thumbnail
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    channel TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    count INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS thumbnails (
+    video_id TEXT NOT NULL,
+    pixels INTEGER NOT NULL,
+    png BLOB NOT NULL,
+    PRIMARY KEY (video_id, pixels)
+);
+"""
+
+def channel_key(channel):
+    # "@Handle", "@handle " and the channel URL typed twice are the same search
+    return channel.strip().lower()
+
+def encode_png(image):
+    buffer = QBuffer()
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(buffer.data())
+
+class SnapshotStore:
+    """
+    Every channel catalog fetched so far plus the rendered thumbnails, so the
+    last session reappears without the network and old channels can be
+    browsed and searched offline. Thumbnails are stored at their device-pixel
+    size and only need a PNG decode to show. Opens a connection per call, so
+    it is safe from worker threads.
+    """
+    def __init__(self, path):
+        self.path = path
+        with self.connect() as db:
+            db.execute("PRAGMA journal_mode=WAL") # Thumbnail writers don't block startup reads
+            db.executescript(SCHEMA)
+
+    def connect(self):
+        return closing(sqlite3.connect(self.path, timeout=10))
+
+    def save_catalog(self, channel, catalog):
+        with self.connect() as db:
+            db.execute("INSERT OR REPLACE INTO channels (channel, name, fetched_at, count, body) VALUES (?, ?, ?, ?, ?)",
+                       (channel_key(channel), channel.strip(), time.time(), len(catalog),
+                        zlib.compress(catalog.to_bytes())))
+            db.commit()
+
+    def load_catalog(self, channel):
+        """Returns (VideoCatalog, fetched_at) or None if the channel was never fetched."""
+        with self.connect() as db:
+            row = db.execute("SELECT body, fetched_at FROM channels WHERE channel = ?",
+                             (channel_key(channel),)).fetchone()
+        if not row:
+            return None
+        try:
+            return VideoCatalog.from_bytes(zlib.decompress(row[0])), row[1]
+        except (ValueError, zlib.error):
+            return None # Written by another version; the next fetch replaces it
+
+    def channels(self):
+        """[(name, fetched_at, count), ...], most recently fetched first."""
+        with self.connect() as db:
+            return db.execute("SELECT name, fetched_at, count FROM channels ORDER BY fetched_at DESC").fetchall()
+
+    def put_thumbnail(self, video_id, image):
+        with self.connect() as db:
+            db.execute("INSERT OR REPLACE INTO thumbnails (video_id, pixels, png) VALUES (?, ?, ?)",
+                       (video_id, image.width(), encode_png(image)))
+            db.commit()
+
+    def thumbnails(self, video_ids, pixels, dpr=1.0):
+        """video_id -> QImage for every stored thumbnail of that size."""
+        result = {}
+        video_ids = list(video_ids)
+        with self.connect() as db:
+            for i in range(0, len(video_ids), 500): # Stay under SQLite's variable limit
+                chunk = video_ids[i:i + 500]
+                rows = db.execute(f"SELECT video_id, png FROM thumbnails WHERE pixels = ? "
+                                  f"AND video_id IN ({', '.join('?' * len(chunk))})", [pixels] + chunk).fetchall()
+                for video_id, png in rows:
+                    image = QImage.fromData(png, "PNG")
+                    if not image.isNull():
+                        image.setDevicePixelRatio(dpr)
+                        result[video_id] = image
+        return result
+
+def render_and_store(store, video_id, data, dpr=1.0):
+    """Thumbnail processor: renders as usual and keeps a copy for the next session."""
+    image = render_thumbnail(data, dpr=dpr)
+    if image is not None:
+        store.put_thumbnail(video_id, image)
+    return image
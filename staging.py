@@ -0,0 +1,99 @@
+import os
+import shutil
+
+COPY_CHUNK = 8 * 1024 * 1024 # Large sequential writes; NAS shares handle these far better
+WAV_BYTES_PER_SECOND = 44100 * 2 * 2 # 16-bit stereo, what FFmpegExtractAudio usually produces
+DEFAULT_MIN_FREE_MB = 2048
+INSUFFICIENT_SPACE = "Insufficient disk space"
+DISK_TOO_SMALL = "Not enough disk capacity" # Permanent, unlike INSUFFICIENT_SPACE
+
+class InsufficientSpace(Exception):
+    pass
+
+def disk_usage(path):
+    """shutil.disk_usage() of the filesystem holding path (or its nearest existing parent)."""
+    while path and not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return shutil.disk_usage(path or '.')
+
+def free_bytes(path):
+    return disk_usage(path).free
+
+def estimate_output_size(info, output_bytes_per_second=WAV_BYTES_PER_SECOND, duration=None):
+    """
+    Bytes needed for the source file plus the converted outputs (a WAV by
+    default). duration is the seconds actually downloaded when that is only
+    part of the video; the source is scaled down to match.
+    """
+    full = info.get('duration') or 0
+    source = info.get('filesize') or info.get('filesize_approx') or 0
+    if duration is None:
+        duration = full
+    elif full:
+        source = int(source * min(1.0, duration / full))
+    return source + int(duration * output_bytes_per_second)
+
+def preallocate(f, size):
+    """Reserves size bytes for an open file so it is written contiguously. Best effort."""
+    if size <= 0:
+        return
+    try:
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(f.fileno(), 0, size)
+        else:
+            f.truncate(size) # Sparse on most filesystems, but sets the final length up front
+    except OSError:
+        pass # Not supported here (e.g. some network filesystems)
+
+def copy_preallocated(src, dst):
+    """Copies src to dst in large chunks into a preallocated file."""
+    size = os.path.getsize(src)
+    with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+        preallocate(fout, size)
+        while True:
+            chunk = fin.read(COPY_CHUNK)
+            if not chunk:
+                break
+            fout.write(chunk)
+        fout.truncate(size)
+        fout.flush()
+        os.fsync(fout.fileno())
+
+def unique_path(path):
+    """path, or 'name (2).ext', 'name (3).ext', ... if it is taken."""
+    root, ext = os.path.splitext(path)
+    n = 2
+    while os.path.exists(path):
+        path = f"{root} ({n}){ext}"
+        n += 1
+    return path
+
+def finalize(path, target_dir):
+    """
+    Moves a finished file from staging into target_dir so it appears there
+    complete or not at all, and returns the new path. An existing file with
+    the same name is kept; the new one gets a numbered name instead. Across
+    filesystems the file is copied to a hidden temporary name next to the
+    target and renamed.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    dest = unique_path(os.path.join(target_dir, os.path.basename(path)))
+    try:
+        os.replace(path, dest)
+        return dest
+    except OSError:
+        pass # Different filesystem
+
+    tmp = os.path.join(target_dir, '.' + os.path.basename(path) + '.partial')
+    try:
+        copy_preallocated(path, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.remove(path)
+    return dest
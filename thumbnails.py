@@ -0,0 +1,143 @@
+import sys
+import time
+import requests
+from PyQt6.QtCore import Qt, QSize, QRunnable, QObject, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QPainter, QPainterPath
+from bandwidth import limiter
+
+# --- Thumbnail Rendering ---
+THUMB_SIZE = 60
+THUMB_RADIUS = 8
+
+def render_thumbnail(data, size=THUMB_SIZE, radius=THUMB_RADIUS, dpr=1.0):
+    """
+    Decodes, crops to a centered square and rounds the corners at the exact
+    device-pixel size. Uses QImage only, so it is safe off the GUI thread.
+    """
+    image = QImage()
+    if not image.loadFromData(data):
+        return None
+
+    pixels = max(1, round(size * dpr))
+    scaled = image.scaled(QSize(pixels, pixels), Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                          Qt.TransformationMode.SmoothTransformation)
+    x = (scaled.width() - pixels) // 2
+    y = (scaled.height() - pixels) // 2
+    cropped = scaled.copy(x, y, pixels, pixels)
+
+    rounded = QImage(pixels, pixels, QImage.Format.Format_ARGB32_Premultiplied)
+    rounded.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(rounded)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    path = QPainterPath()
+    path.addRoundedRect(0, 0, pixels, pixels, radius * dpr, radius * dpr)
+    painter.setClipPath(path)
+    painter.drawImage(0, 0, cropped)
+    painter.end()
+
+    rounded.setDevicePixelRatio(dpr)
+    return rounded
+
+# --- Image Worker ---
+# Thread-pool path, used when aiohttp is unavailable
+class ThumbnailSignals(QObject):
+    image_loaded = pyqtSignal(str, QImage) # video id, rendered thumbnail
+    failed = pyqtSignal(str) # video id
+
+
+class ImageWorker(QRunnable):
+    def __init__(self, url, video_id, dpr=1.0, processor=None, token=None):
+        super().__init__()
+        self.url = url
+        self.video_id = video_id
+        self.dpr = dpr
+        self.processor = processor # Replaces render_thumbnail, e.g. to also store the result
+        self.token = token # CancelToken of the search this thumbnail belongs to
+        self.signals = ThumbnailSignals()
+
+    def run(self):
+        if self.token and self.token.cancelled:
+            return # Queued for a search that has since been replaced
+        try:
+            with requests.get(self.url, timeout=10, stream=True) as response:
+                # Closing the response from the cancelling thread aborts the read below
+                remove = self.token.on_cancel(response.close) if self.token else None
+                try:
+                    if response.status_code != 200:
+                        self.signals.failed.emit(self.video_id)
+                        return
+                    chunks = []
+                    for chunk in response.iter_content(16384):
+                        if limiter.limit_thumbnails:
+                            limiter.consume(len(chunk))
+                        chunks.append(chunk)
+                    data = b''.join(chunks)
+                finally:
+                    if remove:
+                        remove()
+            if self.token and self.token.cancelled:
+                return
+
+            # Decode/scale/round here so the GUI thread only wraps a pixmap
+            image = self.processor(data) if self.processor else render_thumbnail(data, dpr=self.dpr)
+            if image is not None:
+                self.signals.image_loaded.emit(self.video_id, image)
+            else:
+                self.signals.failed.emit(self.video_id)
+        except:
+            self.signals.failed.emit(self.video_id)
+
+# --- Throughput Benchmark ---
+def benchmark(count=1000, latency_ms=20):
+    """
+    Thumbnails/sec on the local fake server: one ImageWorker per thumbnail on
+    a QThreadPool (the old path) versus the shared AsyncFetcher.
+    """
+    from functools import partial
+    from PyQt6.QtCore import QEventLoop
+    from PyQt6.QtGui import QGuiApplication
+    import devserver
+    from async_fetch import AsyncFetcher
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    server = devserver.start_server(channels=1, videos=1, latency_ms=latency_ms)
+    port = server.server_address[1]
+    urls = [f"http://127.0.0.1:{port}/vi/{i:011d}/default.jpg" for i in range(count)]
+
+    def run(start_all):
+        loop = QEventLoop()
+        received = [0]
+
+        def on_result(n=1):
+            received[0] += n
+            if received[0] >= count:
+                loop.quit()
+
+        started = time.perf_counter()
+        start_all(on_result)
+        loop.exec()
+        return count / (time.perf_counter() - started)
+
+    pool = QThreadPool()
+    workers = []
+    def start_thread_pool(on_result):
+        for i, url in enumerate(urls):
+            worker = ImageWorker(url, str(i))
+            worker.signals.image_loaded.connect(lambda *_: on_result())
+            workers.append(worker)
+            pool.start(worker)
+
+    fetcher = AsyncFetcher()
+    def start_async(on_result):
+        fetcher.batchReady.connect(lambda batch: on_result(len(batch)))
+        for i, url in enumerate(urls):
+            fetcher.fetch(url, i, partial(render_thumbnail, dpr=1.0))
+
+    print(f"{count} thumbnails, {latency_ms} ms server latency, {pool.maxThreadCount()} pool threads")
+    print(f"  QThreadPool + requests: {run(start_thread_pool):8.1f} thumbnails/sec")
+    print(f"  AsyncFetcher (aiohttp): {run(start_async):8.1f} thumbnails/sec")
+    fetcher.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    benchmark(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,111 @@
+import json
+import time
+import itertools
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Trace "processes" group tracks in the viewer
+PROCESS_OTHER = 0
+PROCESS_DOWNLOADS = 1
+PROCESS_CATALOG = 2
+PROCESS_NAMES = {
+    PROCESS_OTHER: "Other threads",
+    PROCESS_DOWNLOADS: "Downloads",
+    PROCESS_CATALOG: "Catalog fetches",
+}
+MAX_EVENTS = 200000
+
+# --- Tracer ---
+class Tracer:
+    """
+    Collects timeline spans as Chrome trace events (viewable in Perfetto or
+    chrome://tracing). Each download job or catalog fetch gets its own track;
+    code running on a thread records onto the track set with on_track().
+
+    Timestamps come from time.monotonic(), which is system-wide, so events
+    recorded in worker processes line up with the GUI process.
+    """
+    def __init__(self, max_events=MAX_EVENTS):
+        self.events = deque(maxlen=max_events) # Oldest events drop off first
+        self.tracks = {} # (process, tid) -> name
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.tids = itertools.count(1)
+
+    def track(self, name, process=PROCESS_DOWNLOADS):
+        """Allocates a named track. Returns a (process, tid) pair."""
+        track = (process, next(self.tids))
+        with self.lock:
+            self.tracks[track] = name
+        return track
+
+    @contextmanager
+    def on_track(self, track):
+        previous = getattr(self.local, 'track', None)
+        self.local.track = track or previous
+        try:
+            yield
+        finally:
+            self.local.track = previous
+
+    def current_track(self):
+        return getattr(self.local, 'track', None) or (PROCESS_OTHER, threading.get_ident())
+
+    def complete(self, name, start, end, args=None, cat='job', track=None):
+        """Records a span from two time.monotonic() readings."""
+        process, tid = track or self.current_track()
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'ts': start * 1e6,
+                 'dur': max(0.0, end - start) * 1e6, 'pid': process, 'tid': tid}
+        if args:
+            event['args'] = args
+        with self.lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, cat='job', track=None):
+        """Times the block. Yields a dict; anything put in it becomes the span's args."""
+        args = {}
+        start = time.monotonic()
+        try:
+            yield args
+        except BaseException as e:
+            args['error'] = str(e)[:200]
+            raise
+        finally:
+            self.complete(name, start, time.monotonic(), args, cat, track)
+
+    def instant(self, name, args=None, cat='job'):
+        process, tid = self.current_track()
+        event = {'name': name, 'cat': cat, 'ph': 'i', 's': 't', 'ts': time.monotonic() * 1e6,
+                 'pid': process, 'tid': tid}
+        if args:
+            event['args'] = args
+        with self.lock:
+            self.events.append(event)
+
+    def drain(self):
+        """Removes and returns all recorded events (used to ship them out of worker processes)."""
+        with self.lock:
+            events = list(self.events)
+            self.events.clear()
+        return events
+
+    def extend(self, events):
+        with self.lock:
+            self.events.extend(events)
+
+    def export(self, path):
+        """Writes a Chrome trace JSON file. Returns the number of events."""
+        with self.lock:
+            tracks = dict(self.tracks)
+            events = list(self.events)
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': process, 'args': {'name': name}}
+                    for process, name in PROCESS_NAMES.items()]
+        metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': process, 'tid': tid, 'args': {'name': name}}
+                     for (process, tid), name in tracks.items()]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+tracer = Tracer()
@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import threading
+from collections import deque
+from PyQt6.QtCore import QObject, QTimer, Qt
+from tracing import tracer, PROCESS_OTHER
+
+HEARTBEAT_MS = 10 # Main-thread timer; a late beat is event-loop latency
+DEFAULT_THRESHOLD_MS = 50
+SAMPLE_INTERVAL = 0.005 # Seconds between stack samples while the loop is stalled
+STACK_DEPTH = 16 # Innermost frames kept per sample
+LATENCY_SAMPLES = 5000
+REPORT_LIMIT = 10
+# Stands in for the innermost frame when the main thread is inside Qt itself
+IN_QT = ("(Qt)", 0, "C++ event processing: layout, painting, style polish")
+
+def format_stack(stack):
+    return "\n".join(f"    {filename}:{lineno} in {name}" for filename, lineno, name in stack)
+
+class StallWatchdog(QObject):
+    """
+    Measures GUI event-loop latency with a main-thread heartbeat timer. While
+    the heartbeat is overdue by more than the threshold, a sampler thread
+    captures the main thread's Python stack every few milliseconds; when the
+    loop comes back, the stall's duration is split between the sampled
+    stacks. report() lists the stacks that stalled the UI the longest.
+
+    Cheap enough for production builds: the heartbeat is a 10 ms timer and
+    the sampler only walks frames during a stall.
+    """
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.main_ident = threading.get_ident() # Created on the GUI thread
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.samples = [] # Stacks sampled during the current stall
+        self.offenders = {} # stack -> [stalls, stalled seconds, worst stall seconds]
+        self.stalls = 0
+        self.stalled = 0.0
+        self.last_beat = time.monotonic()
+        self.loop_frame = None # Python frame running the event loop, e.g. the app.exec() call
+        self.track = tracer.track("GUI event loop", PROCESS_OTHER)
+        self.running = threading.Event()
+        self.sampler = None
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(HEARTBEAT_MS)
+        self.timer.timeout.connect(self.on_beat)
+
+    def start(self):
+        if self.running.is_set():
+            return
+        self.last_beat = time.monotonic()
+        self.running.set()
+        self.sampler = threading.Thread(target=self.sample_loop, name="stall sampler", daemon=True)
+        self.sampler.start()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.running.clear()
+        if self.sampler:
+            self.sampler.join()
+            self.sampler = None
+
+    def is_running(self):
+        return self.running.is_set()
+
+    # --- Main thread ---
+    def on_beat(self):
+        now = time.monotonic()
+        gap = now - self.last_beat
+        self.last_beat = now
+        self.loop_frame = sys._getframe().f_back
+        with self.lock:
+            samples, self.samples = self.samples, []
+            self.latencies.append(max(0.0, gap - HEARTBEAT_MS / 1000))
+        if gap > self.threshold:
+            self.record_stall(now - gap, now, samples)
+
+    def record_stall(self, start, end, samples):
+        duration = end - start
+        samples = samples or [(("(not sampled)", 0, "stall shorter than the sampling interval"),)]
+        share = duration / len(samples)
+        with self.lock:
+            self.stalls += 1
+            self.stalled += duration
+            for stack in set(samples):
+                entry = self.offenders.setdefault(stack, [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += share * samples.count(stack)
+                entry[2] = max(entry[2], duration)
+        where = samples[-1][-1]
+        tracer.complete("UI stall", start, end, {'where': f"{where[0]}:{where[1]} {where[2]}"},
+                        cat='stall', track=self.track)
+
+    # --- Sampler thread ---
+    def sample_loop(self):
+        while self.running.is_set():
+            time.sleep(SAMPLE_INTERVAL)
+            if time.monotonic() - self.last_beat <= self.threshold:
+                continue
+            frame = sys._current_frames().get(self.main_ident)
+            if frame is None:
+                continue
+            stack = [IN_QT] if frame is self.loop_frame else []
+            while frame is not None and len(stack) < STACK_DEPTH:
+                code = frame.f_code
+                stack.append((os.path.basename(code.co_filename), frame.f_lineno, code.co_name))
+                frame = frame.f_back
+            del frame
+            with self.lock:
+                self.samples.append(tuple(reversed(stack))) # Outermost first, like a traceback
+
+    # --- Reporting ---
+    def summary(self):
+        """{'stalls', 'stalled', 'p50', 'p95', 'max'}; latencies and stalled time in seconds."""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stalls, stalled = self.stalls, self.stalled
+        if not latencies:
+            return {'stalls': stalls, 'stalled': stalled, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+        return {'stalls': stalls, 'stalled': stalled, 'p50': latencies[len(latencies) // 2],
+                'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 'max': latencies[-1]}
+
+    def describe(self):
+        s = self.summary()
+        return (f"UI event loop: latency p50 {s['p50'] * 1000:.0f} ms, p95 {s['p95'] * 1000:.0f} ms, "
+                f"max {s['max'] * 1000:.0f} ms · {s['stalls']} stalls over {self.threshold * 1000:.0f} ms, "
+                f"{s['stalled']:.1f} s total")
+
+    def report(self, limit=REPORT_LIMIT):
+        """The worst offenders by total stalled time, with their stacks."""
+        with self.lock:
+            offenders = sorted(self.offenders.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        lines = [self.describe(), ""]
+        for rank, (stack, (stalls, stalled, worst)) in enumerate(offenders, 1):
+            lines.append(f"#{rank}  {stalled * 1000:.0f} ms in {stalls} stalls, worst {worst * 1000:.0f} ms")
+            lines.append(format_stack(stack))
+            lines.append("")
+        return "\n".join(lines)
+
+    def write_report(self, path):
+        """Writes report() to path if anything stalled. Returns True if written."""
+        if not self.stalls:
+            return False
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.report())
+        return True
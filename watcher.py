@@ -0,0 +1,100 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QSettings, pyqtSignal
+from youtube_api import YouTubeManager
+from paths import app_data_file
+from tracing import tracer, PROCESS_CATALOG
+from bandwidth import int_setting
+
+DEFAULT_INTERVAL_MINUTES = 30
+
+def etag_cache_path():
+    return app_data_file("api_cache.sqlite3")
+
+def state_key(channel):
+    # Channel URLs contain '/', which QSettings treats as a group separator
+    return "watch_state/" + channel.replace('/', '|')
+
+def parse_channels(text):
+    return [c.strip() for c in (text or "").replace('\n', ',').split(',') if c.strip()]
+
+# --- Poll Worker ---
+class PollSignals(QObject):
+    result = pyqtSignal(str, list) # channel, new videos (newest first)
+    error = pyqtSignal(str, str) # channel, message
+    finished = pyqtSignal()
+
+class PollWorker(QRunnable):
+    def __init__(self, channels, since):
+        super().__init__()
+        self.channels = channels
+        self.since = since # channel -> latest published_at seen
+        self.signals = PollSignals()
+
+    def run(self):
+        try:
+            yt = YouTubeManager(etag_cache_path())
+        except Exception as e:
+            self.signals.error.emit("", str(e))
+            self.signals.finished.emit()
+            return
+
+        for channel in self.channels:
+            try:
+                with tracer.on_track(tracer.track(f"Poll {channel}", PROCESS_CATALOG)), \
+                        tracer.span("poll channel", cat='api') as args:
+                    videos = yt.get_new_uploads(channel, self.since.get(channel, ""))
+                    args['new'] = len(videos)
+                self.signals.result.emit(channel, videos)
+            except Exception as e:
+                self.signals.error.emit(channel, str(e))
+        self.signals.finished.emit()
+
+# --- Channel Watcher ---
+class ChannelWatcher(QObject):
+    """
+    Polls the watched channels on a timer using conditional (ETag) requests
+    and emits newUploads for videos published since the previous poll.
+    """
+    newUploads = pyqtSignal(list) # [(video_id, title), ...]
+
+    def __init__(self):
+        super().__init__()
+        self.threadpool = QThreadPool()
+        self.threadpool.setMaxThreadCount(1)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+        self.polling = False
+        self.reload_settings()
+
+    def reload_settings(self):
+        settings = QSettings("YouTubeFetcher", "Config")
+        self.channels = parse_channels(settings.value("watched_channels", ""))
+        minutes = int_setting(settings, "watch_interval", DEFAULT_INTERVAL_MINUTES)
+        self.timer.stop()
+        if self.channels:
+            self.timer.start(max(1, minutes) * 60 * 1000)
+            QTimer.singleShot(5000, self.poll) # Don't wait a full interval after startup
+
+    def poll(self):
+        if self.polling or not self.channels:
+            return
+        self.polling = True
+        settings = QSettings("YouTubeFetcher", "Config")
+        since = {c: settings.value(state_key(c), "") for c in self.channels}
+
+        worker = PollWorker(list(self.channels), since)
+        worker.signals.result.connect(lambda channel, videos: self.on_result(channel, videos, since.get(channel)))
+        worker.signals.error.connect(lambda channel, e: print(f"Watch poll failed for {channel or 'all'}: {e}"))
+        worker.signals.finished.connect(self.on_finished)
+        self.threadpool.start(worker)
+
+    def on_result(self, channel, videos, since):
+        if not videos:
+            return
+        settings = QSettings("YouTubeFetcher", "Config")
+        settings.setValue(state_key(channel), videos[0]['published_at'])
+        if since:
+            # Oldest first so the queue follows upload order
+            self.newUploads.emit([(v['id'], v['title']) for v in reversed(videos)])
+
+    def on_finished(self):
+        self.polling = False
@@ -0,0 +1,265 @@
+import os
+import struct
+import numpy as np
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, pyqtSignal, QRunnable, QObject, QRectF
+from PyQt6.QtGui import QPainter, QColor
+
+BASE_BLOCK = 1024 # Frames per peak at the finest level
+CHUNK_BLOCKS = 4096 # Blocks per memory-mapped chunk (~4M frames)
+PEAK_SCALE = 32767
+
+# --- WAV Parsing ---
+def read_wav_layout(path):
+    """
+    Walks the RIFF chunks of a PCM/float WAV file and returns
+    (dtype, channels, sample_rate, data_offset, frames) for memory mapping.
+    """
+    with open(path, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f"{path} is not a WAV file.")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} has no data chunk.")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"{path} has data before fmt chunk.")
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+    audio_format, channels, sample_rate = struct.unpack('<HHI', fmt[:8])
+    bits = struct.unpack('<H', fmt[14:16])[0]
+    if audio_format == 0xFFFE and len(fmt) >= 26:
+        audio_format = struct.unpack('<H', fmt[24:26])[0] # WAVE_FORMAT_EXTENSIBLE subformat
+
+    dtypes = {
+        (1, 8): np.uint8,
+        (1, 16): np.int16,
+        (1, 32): np.int32,
+        (3, 32): np.float32,
+        (3, 64): np.float64,
+    }
+    if (audio_format, bits) not in dtypes:
+        raise ValueError(f"Unsupported WAV encoding (format {audio_format}, {bits} bit).")
+    dtype = np.dtype(dtypes[(audio_format, bits)])
+
+    # ffmpeg writes 0xFFFFFFFF sizes when streaming; trust the file size instead
+    data_size = os.path.getsize(path) - data_offset
+    frames = data_size // (dtype.itemsize * channels)
+    return dtype, channels, sample_rate, data_offset, frames
+
+def normalize(samples, dtype):
+    """Maps raw samples to float32 in [-1, 1]."""
+    if dtype == np.uint8:
+        return (samples.astype(np.float32) - 128) / 128
+    if dtype.kind == 'i':
+        return np.clip(samples.astype(np.float32) / np.iinfo(dtype).max, -1, 1)
+    return np.clip(samples.astype(np.float32), -1, 1)
+
+# --- Peak Pyramid ---
+def sidecar_path(wav_path):
+    return wav_path + '.peaks.npz'
+
+def compute_peaks(wav_path, block=BASE_BLOCK):
+    """
+    Streams a WAV file through a memory map in fixed-size chunks and writes a
+    min/max peak pyramid sidecar. Memory use is bounded by the chunk size,
+    regardless of file length. Returns the sidecar path.
+    """
+    dtype, channels, sample_rate, data_offset, frames = read_wav_layout(wav_path)
+    num_blocks = -(-frames // block)
+    mins = np.empty(num_blocks, dtype=np.int16)
+    maxs = np.empty(num_blocks, dtype=np.int16)
+
+    if frames:
+        data = np.memmap(wav_path, dtype=dtype, mode='r', offset=data_offset, shape=(frames, channels))
+        chunk_frames = block * CHUNK_BLOCKS
+        for chunk_start in range(0, frames, chunk_frames):
+            chunk = data[chunk_start:chunk_start + chunk_frames]
+            first_block = chunk_start // block
+            full = len(chunk) // block
+
+            if full:
+                blocks = normalize(chunk[:full * block], dtype).reshape(full, block * channels)
+                mins[first_block:first_block + full] = blocks.min(axis=1) * PEAK_SCALE
+                maxs[first_block:first_block + full] = blocks.max(axis=1) * PEAK_SCALE
+            if len(chunk) % block:
+                tail = normalize(chunk[full * block:], dtype)
+                mins[first_block + full] = tail.min() * PEAK_SCALE
+                maxs[first_block + full] = tail.max() * PEAK_SCALE
+        del data
+
+    levels = {'min0': mins, 'max0': maxs}
+    level = 0
+    while len(mins) > 1:
+        if len(mins) % 2:
+            mins = np.append(mins, mins[-1])
+            maxs = np.append(maxs, maxs[-1])
+        mins = np.minimum(mins[0::2], mins[1::2])
+        maxs = np.maximum(maxs[0::2], maxs[1::2])
+        level += 1
+        levels[f'min{level}'] = mins
+        levels[f'max{level}'] = maxs
+
+    path = sidecar_path(wav_path)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, block=block, sample_rate=sample_rate, frames=frames, levels=level + 1, **levels)
+    os.replace(tmp_path, path)
+    return path
+
+class PeakPyramid:
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.block = int(data['block'])
+            self.sample_rate = int(data['sample_rate'])
+            self.frames = int(data['frames'])
+            count = int(data['levels'])
+            self.mins = [data[f'min{i}'] for i in range(count)]
+            self.maxs = [data[f'max{i}'] for i in range(count)]
+
+    @property
+    def duration_ms(self):
+        return int(self.frames * 1000 / self.sample_rate) if self.sample_rate else 0
+
+    def peaks(self, start_frame, end_frame, columns):
+        """
+        Returns (mins, maxs) float arrays of length `columns` covering the frame
+        range, in [-1, 1]. Picks the coarsest level with at least one peak per
+        column, so the work is proportional to `columns`, not to the zoom.
+        """
+        columns = max(1, int(columns))
+        start_frame = max(0, int(start_frame))
+        end_frame = max(start_frame + 1, min(int(end_frame), self.frames))
+        frames_per_column = (end_frame - start_frame) / columns
+
+        level = 0
+        while (level + 1 < len(self.mins)
+               and self.block * (2 ** (level + 1)) <= frames_per_column):
+            level += 1
+
+        size = self.block * (2 ** level)
+        first = start_frame // size
+        last = max(first + 1, -(-end_frame // size))
+        mins = self.mins[level][first:last]
+        maxs = self.maxs[level][first:last]
+        if not len(mins):
+            return np.zeros(columns), np.zeros(columns)
+
+        edges = np.linspace(0, len(mins), columns + 1).astype(np.int64)[:-1]
+        edges = np.minimum(edges, len(mins) - 1)
+        return (np.minimum.reduceat(mins, edges) / PEAK_SCALE,
+                np.maximum.reduceat(maxs, edges) / PEAK_SCALE)
+
+def overview_peaks(pyramid, count=160):
+    """Tiny fixed-size overview (abs peak per column, 0-255) for list rows."""
+    mins, maxs = pyramid.peaks(0, pyramid.frames, count)
+    return (np.maximum(np.abs(mins), np.abs(maxs)) * 255).astype(np.uint8).tobytes()
+
+# --- Worker ---
+class WaveformSignals(QObject):
+    finished = pyqtSignal(str, str) # wav_path, sidecar_path
+    error = pyqtSignal(str)
+
+class WaveformWorker(QRunnable):
+    def __init__(self, wav_path):
+        super().__init__()
+        self.wav_path = wav_path
+        self.signals = WaveformSignals()
+
+    def run(self):
+        try:
+            path = sidecar_path(self.wav_path)
+            if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(self.wav_path):
+                path = compute_peaks(self.wav_path)
+            self.signals.finished.emit(self.wav_path, path)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+# --- Waveform Scrubber ---
+class WaveformScrubber(QWidget):
+    """
+    Paints a waveform from a PeakPyramid at any zoom. Click/drag seeks,
+    mouse wheel zooms around the cursor.
+    """
+    seekRequested = pyqtSignal(int) # position ms
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pyramid = None
+        self.position = 0
+        self.duration = 0
+        self.view_start = 0.0 # Visible window as fraction of the track
+        self.view_end = 1.0
+        self.setMinimumHeight(16)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+
+    def set_pyramid(self, pyramid):
+        self.pyramid = pyramid
+        self.duration = pyramid.duration_ms if pyramid else 0
+        self.view_start, self.view_end = 0.0, 1.0
+        self.update()
+
+    def set_position(self, position, duration):
+        self.position = position
+        if duration:
+            self.duration = duration
+        self.update()
+
+    def x_to_ms(self, x):
+        fraction = self.view_start + (x / max(1, self.width())) * (self.view_end - self.view_start)
+        return int(min(max(fraction, 0.0), 1.0) * self.duration)
+
+    def mousePressEvent(self, event):
+        if self.duration:
+            self.seekRequested.emit(self.x_to_ms(event.position().x()))
+
+    def mouseMoveEvent(self, event):
+        if self.duration and event.buttons() & Qt.MouseButton.LeftButton:
+            self.position = self.x_to_ms(event.position().x())
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        if self.duration:
+            self.seekRequested.emit(self.x_to_ms(event.position().x()))
+
+    def wheelEvent(self, event):
+        span = self.view_end - self.view_start
+        anchor = self.view_start + (event.position().x() / max(1, self.width())) * span
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        new_span = min(1.0, max(span * factor, 0.001))
+        self.view_start = max(0.0, anchor - (anchor - self.view_start) * new_span / span)
+        self.view_end = min(1.0, self.view_start + new_span)
+        self.view_start = max(0.0, self.view_end - new_span)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        width, height = self.width(), self.height()
+        mid = height / 2
+
+        if not self.pyramid or not self.pyramid.frames:
+            painter.fillRect(QRectF(0, mid - 2, width, 4), QColor("#333"))
+            return
+
+        frames = self.pyramid.frames
+        mins, maxs = self.pyramid.peaks(self.view_start * frames, self.view_end * frames, width)
+        played_fraction = self.position / self.duration if self.duration else 0
+        span = self.view_end - self.view_start
+        played_x = (played_fraction - self.view_start) / span * width if span else 0
+
+        played, remaining = QColor("#3ea6ff"), QColor("#555")
+        for x in range(len(mins)):
+            top = mid - maxs[x] * mid
+            bottom = mid - mins[x] * mid
+            painter.fillRect(QRectF(x, top, 1, max(1.0, bottom - top)), played if x < played_x else remaining)
@@ -0,0 +1,327 @@
+"""
+Download backlog shared between machines through one SQLite file.
+
+The GUI (coordinator) enqueues jobs; headless workers on any node that can
+open the file claim a job under a time-limited lease, renew it while they
+work and report the result. A worker that crashes stops renewing, its lease
+expires and the job is handed to the next worker that asks.
+
+    python work_queue.py worker --queue /shared/queue.sqlite3 --download-path ~/Music
+    python work_queue.py enqueue --queue /shared/queue.sqlite3 --channel @handle
+    python work_queue.py status --queue /shared/queue.sqlite3
+
+Put the file on storage with working POSIX/SMB locks; SQLite locking is not
+reliable on every NFS setup.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+from download_processes import PipeSignal
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT NOT NULL DEFAULT '',
+    lease_expires REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    progress REAL NOT NULL DEFAULT 0,
+    path TEXT NOT NULL DEFAULT '',
+    error TEXT NOT NULL DEFAULT '',
+    meta TEXT NOT NULL DEFAULT '',
+    reported INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    sections TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_video ON jobs (video_id);
+"""
+
+STATUS_PENDING = 'pending'
+STATUS_LEASED = 'leased'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+DEFAULT_LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3
+LEASE_EXPIRED_TOO_OFTEN = "lease expired too many times"
+
+class LeaseLost(Exception):
+    """The job's lease expired and may now belong to another worker."""
+
+class QueueJob:
+    __slots__ = ('id', 'video_id', 'title', 'status', 'worker', 'lease_expires',
+                 'attempts', 'progress', 'path', 'error', 'meta', 'sections')
+
+    def __init__(self, row):
+        for name, value in zip(self.__slots__, row):
+            setattr(self, name, value)
+
+class WorkQueue:
+    """Leased job queue in a SQLite file; safe to open from many processes."""
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(jobs)")}
+        if 'sections' not in columns: # Queue files from before partial downloads
+            self.db.execute("ALTER TABLE jobs ADD COLUMN sections TEXT NOT NULL DEFAULT ''")
+
+    def transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can't
+        # both read the same pending row and then claim it
+        return _Transaction(self.db)
+
+    def enqueue(self, videos):
+        """
+        Adds [(video_id, title), ...] in one transaction; an optional third
+        item is a section spec (see sections.py). Videos with the same spec
+        already pending or leased are skipped. Returns the count added.
+        """
+        now = time.time()
+        with self.transaction():
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT INTO jobs (video_id, title, created_at, sections) SELECT ?, ?, ?, ? WHERE NOT EXISTS "
+                "(SELECT 1 FROM jobs WHERE video_id = ? AND sections = ? AND status IN (?, ?))",
+                [(video[0], video[1], now, sections, video[0], sections, STATUS_PENDING, STATUS_LEASED)
+                 for video in videos for sections in [video[2] if len(video) > 2 else '']])
+            return self.db.total_changes - before
+
+    def claim(self, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Leases the oldest available job (pending or with an expired lease), or returns None."""
+        now = time.time()
+        columns = ", ".join(QueueJob.__slots__)
+        with self.transaction():
+            self._fail_exhausted(now)
+            row = self.db.execute(
+                f"SELECT {columns} FROM jobs WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1", (STATUS_PENDING, STATUS_LEASED, now)).fetchone()
+            if not row:
+                return None
+            job = QueueJob(row)
+            self.db.execute(
+                "UPDATE jobs SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                "progress = 0 WHERE id = ?", (STATUS_LEASED, worker, now + lease_seconds, job.id))
+        job.status, job.worker, job.attempts = STATUS_LEASED, worker, job.attempts + 1
+        return job
+
+    def renew(self, job_id, worker, lease_seconds=DEFAULT_LEASE_SECONDS, progress=None):
+        """Extends a lease. Returns False if the lease is no longer ours."""
+        cursor = self.db.execute(
+            "UPDATE jobs SET lease_expires = ?, progress = COALESCE(?, progress) "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (time.time() + lease_seconds, progress, job_id, worker, STATUS_LEASED))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker, path, meta=None):
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = ?, path = ?, meta = ?, progress = 100 "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (STATUS_DONE, path, json.dumps(meta or {}), job_id, worker, STATUS_LEASED))
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, error, retry=True):
+        """Records a failure; the job goes back to pending until MAX_ATTEMPTS."""
+        with self.transaction():
+            row = self.db.execute("SELECT attempts FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                                  (job_id, worker, STATUS_LEASED)).fetchone()
+            if not row:
+                return False
+            status = STATUS_PENDING if retry and row[0] < MAX_ATTEMPTS else STATUS_FAILED
+            self.db.execute("UPDATE jobs SET status = ?, error = ?, worker = '', lease_expires = 0 WHERE id = ?",
+                            (status, error, job_id))
+        return True
+
+    def requeue_expired(self):
+        """Returns expired leases to pending so the coordinator shows them as such."""
+        now = time.time()
+        with self.transaction():
+            self._fail_exhausted(now)
+            cursor = self.db.execute(
+                "UPDATE jobs SET status = ?, worker = '' WHERE status = ? AND lease_expires < ?",
+                (STATUS_PENDING, STATUS_LEASED, now))
+        return cursor.rowcount
+
+    def _fail_exhausted(self, now):
+        # A job whose lease keeps expiring is likely killing its worker (OOM, crash,
+        # kill -9); fail() never runs for it, so MAX_ATTEMPTS is enforced here
+        self.db.execute(
+            "UPDATE jobs SET status = ?, error = ?, worker = '', lease_expires = 0 "
+            "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (STATUS_FAILED, LEASE_EXPIRED_TOO_OFTEN, STATUS_LEASED, now, MAX_ATTEMPTS))
+
+    def counts(self):
+        rows = self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def leased(self):
+        columns = ", ".join(QueueJob.__slots__)
+        rows = self.db.execute(f"SELECT {columns} FROM jobs WHERE status = ? ORDER BY id",
+                               (STATUS_LEASED,)).fetchall()
+        return [QueueJob(row) for row in rows]
+
+    def take_unreported(self):
+        """Finished/failed jobs the coordinator hasn't recorded yet; marks them reported."""
+        columns = ", ".join(QueueJob.__slots__)
+        with self.transaction():
+            rows = self.db.execute(f"SELECT {columns} FROM jobs WHERE status IN (?, ?) AND reported = 0",
+                                   (STATUS_DONE, STATUS_FAILED)).fetchall()
+            self.db.execute("UPDATE jobs SET reported = 1 WHERE status IN (?, ?) AND reported = 0",
+                            (STATUS_DONE, STATUS_FAILED))
+        return [QueueJob(row) for row in rows]
+
+    def close(self):
+        self.db.close()
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+# --- Headless Worker ---
+class LeaseSignals:
+    """
+    Stands in for DownloadSignals in a headless worker: progress is written
+    to the queue, and a lost lease aborts the download from the progress hook.
+    """
+    def __init__(self, job, heartbeat):
+        self.job = job
+        self.heartbeat = heartbeat
+        self.result = None
+        self.progress = PipeSignal(self.on_progress)
+        self.finished = PipeSignal(lambda path, meta: setattr(self, 'result', ('done', path, meta)))
+        self.error = PipeSignal(lambda message: setattr(self, 'result', ('error', message, None)))
+
+    def on_progress(self, data):
+        self.heartbeat.progress = data.get('percent')
+        if self.heartbeat.lost:
+            raise LeaseLost(f"Lease on job {self.job.id} expired.")
+
+class Heartbeat(threading.Thread):
+    """Renews a lease every third of its length, including during extraction and conversion."""
+    def __init__(self, queue_path, job, worker, lease_seconds):
+        super().__init__(daemon=True)
+        self.queue_path = queue_path
+        self.job = job
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.progress = None
+        self.lost = False
+        self.stopped = threading.Event()
+
+    def run(self):
+        queue = WorkQueue(self.queue_path) # sqlite3 connections are per thread
+        try:
+            while not self.stopped.wait(self.lease_seconds / 3):
+                if not queue.renew(self.job.id, self.worker, self.lease_seconds, self.progress):
+                    self.lost = True
+                    return
+        finally:
+            queue.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+def run_worker(queue_path, download_path, worker=None, lease_seconds=DEFAULT_LEASE_SECONDS,
+               poll_seconds=5.0, once=False, staging_path=None, formats=None):
+    """Claims and downloads jobs until interrupted (or the queue is empty, with once=True)."""
+    from downloads import DownloadWorker
+    from concurrency import is_throttle_error
+    from staging import INSUFFICIENT_SPACE
+    from encoding import DEFAULT_FORMATS
+
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(queue_path)
+    print(f"Worker {worker} draining {queue_path}")
+    while True:
+        job = queue.claim(worker, lease_seconds)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_seconds)
+            continue
+
+        print(f"[{job.id}] {job.title} (attempt {job.attempts})")
+        heartbeat = Heartbeat(queue_path, job, worker, lease_seconds)
+        heartbeat.start()
+        download = DownloadWorker(job.video_id, job.title, download_path, staging_path=staging_path,
+                                  sections=job.sections, formats=formats or DEFAULT_FORMATS)
+        download.signals = signals = LeaseSignals(job, heartbeat)
+        download.run()
+        heartbeat.stop()
+
+        kind, value, meta = signals.result or ('error', "Worker produced no result.", None)
+        if heartbeat.lost:
+            print(f"[{job.id}] lease lost, dropping result")
+        elif kind == 'done':
+            queue.complete(job.id, worker, value, meta)
+            print(f"[{job.id}] done: {value}")
+        else:
+            transient = is_throttle_error(value) or value.startswith(INSUFFICIENT_SPACE)
+            queue.fail(job.id, worker, value, retry=transient)
+            print(f"[{job.id}] failed: {value}")
+            if transient:
+                time.sleep(poll_seconds) # Give the remote side (or the disk) a break before the next claim
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared download queue")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    worker_parser = sub.add_parser('worker', help="Claim and download jobs")
+    worker_parser.add_argument('--queue', required=True)
+    worker_parser.add_argument('--download-path', default='downloads')
+    worker_parser.add_argument('--staging-path', help="Local directory to download and convert in")
+    worker_parser.add_argument('--formats', help="Output formats, e.g. 'wav,mp3' (default wav)")
+    worker_parser.add_argument('--id', help="Worker name (default host:pid)")
+    worker_parser.add_argument('--lease', type=int, default=DEFAULT_LEASE_SECONDS, help="Lease length (s)")
+    worker_parser.add_argument('--once', action='store_true', help="Exit when the queue is empty")
+
+    enqueue_parser = sub.add_parser('enqueue', help="Queue a channel's uploads or video IDs")
+    enqueue_parser.add_argument('--queue', required=True)
+    enqueue_parser.add_argument('--channel')
+    enqueue_parser.add_argument('--sections', default='', help="Partial download, e.g. '-5:00' or 'split'")
+    enqueue_parser.add_argument('ids', nargs='*')
+
+    status_parser = sub.add_parser('status', help="Show queue counts and active leases")
+    status_parser.add_argument('--queue', required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == 'worker':
+        if args.formats:
+            from encoding import parse_formats
+            parse_formats(args.formats) # Fail at startup, not on every job
+        run_worker(args.queue, args.download_path, args.id, args.lease, once=args.once,
+                   staging_path=args.staging_path, formats=args.formats)
+    elif args.command == 'enqueue':
+        if args.sections:
+            from sections import parse_sections
+            parse_sections(args.sections) # Reject typos here rather than on every worker
+        videos = [(video_id, video_id, args.sections) for video_id in args.ids]
+        if args.channel:
+            from youtube_api import YouTubeManager
+            videos += [(video.id, video.title, args.sections)
+                       for video in YouTubeManager().get_channel_videos(args.channel)]
+        print(f"Queued {WorkQueue(args.queue).enqueue(videos)} jobs")
+    else:
+        queue = WorkQueue(args.queue)
+        print(json.dumps(queue.counts()))
+        for job in queue.leased():
+            print(f"  [{job.id}] {job.worker} {job.progress:.0f}% {job.title}")
+
+if __name__ == "__main__":
+    sys.exit(main())
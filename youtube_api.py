@@ -1,114 +1,238 @@
 import os
+import re
+import json
+import zlib
+import sqlite3
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
 import isodate
+from catalog import VideoCatalog
+from tracing import tracer
+
+# Thumbnail variants in ascending size (default sizes per the Data API)
+THUMBNAIL_SIZES = [
+    ('default', 120, 90),
+    ('medium', 320, 180),
+    ('high', 480, 360),
+    ('standard', 640, 480),
+    ('maxres', 1280, 720),
+]
+
+def pick_thumbnail(thumbnails, min_side):
+    """
+    Returns the URL of the smallest thumbnail whose shorter side covers
+    min_side pixels, falling back to the largest available.
+    """
+    best = None
+    for name, width, height in THUMBNAIL_SIZES:
+        variant = thumbnails.get(name)
+        if not variant:
+            continue
+        best = variant.get('url')
+        side = min(variant.get('width', width), variant.get('height', height))
+        if side >= min_side:
+            return best
+    return best
+
+# --- ETag Cache ---
+class EtagCache:
+    """
+    Stores the last response body and ETag per API request so repeated
+    requests can be sent with If-None-Match and answered with 304.
+    """
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, timeout=10)
+        self.db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, etag TEXT, body BLOB)")
+        self.db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        row = self.db.execute("SELECT etag, body FROM responses WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None, None
+        return row[0], json.loads(zlib.decompress(row[1]))
+
+    def put(self, key, etag, body):
+        self.db.execute("INSERT OR REPLACE INTO responses (key, etag, body) VALUES (?, ?, ?)",
+                        (key, etag, zlib.compress(json.dumps(body).encode('utf-8'))))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+def request_key(request):
+    # The URI minus the API key identifies the request
+    return re.sub(r'([?&])key=[^&]*&?', r'\1', request.uri).rstrip('?&')
 
 class YouTubeManager:
-    def __init__(self):
+    def __init__(self, etag_cache_path=None):
         load_dotenv()
         self.api_key = os.getenv("YOUTUBE_API_KEY")
         if not self.api_key:
             print("Warning: YOUTUBE_API_KEY not found in .env")
             # In a real app, we might raise an error or prompt the user
-            
+
         self.youtube = None
         if self.api_key:
-            self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+            # YOUTUBE_API_ENDPOINT points the client at a local fake API (see devserver.py)
+            endpoint = os.getenv("YOUTUBE_API_ENDPOINT")
+            client_options = {'api_endpoint': endpoint} if endpoint else None
+            self.youtube = build('youtube', 'v3', developerKey=self.api_key,
+                                 client_options=client_options, static_discovery=True)
 
-    def get_channel_videos(self, channel_id_or_handle):
-        """
-        Fetches ALL videos from a channel's 'uploads' playlist.
-        Returns a list of dictionaries with video details.
-        """
+        self.etags = EtagCache(etag_cache_path) if etag_cache_path else None
+
+    def execute(self, request):
+        """Executes a request, conditionally if a cached ETag exists. Each call is a trace span."""
+        with tracer.span(getattr(request, 'methodId', None) or "api request", cat='api') as args:
+            if not self.etags:
+                response = request.execute()
+                args['items'] = len(response.get('items', []))
+                return response
+
+            key = request_key(request)
+            etag, cached = self.etags.get(key)
+            if etag:
+                request.headers['If-None-Match'] = etag
+            try:
+                response = request.execute()
+            except HttpError as e:
+                args['status'] = e.resp.status
+                if e.resp.status == 304 and cached is not None:
+                    self.etags.hits += 1
+                    return cached
+                raise
+
+            self.etags.misses += 1
+            args['items'] = len(response.get('items', []))
+            if response.get('etag'):
+                self.etags.put(key, response['etag'], response)
+            return response
+
+    def resolve_uploads_playlist(self, channel_id_or_handle):
+        """Returns (uploads_playlist_id, channel_title) for a URL, handle or ID."""
         if not self.youtube:
             raise ValueError("YouTube API Key is missing.")
 
-        try:
-            # 1. Parse Input (Handle URL or ID)
-            import re
-            channel_input = channel_id_or_handle.strip()
-            
-            # Regex to extract handle from URL
-            handle_match = re.search(r'(?:https?://)?(?:www\.)?youtube\.com/(?:@)([a-zA-Z0-9_.-]+)', channel_input)
-            if handle_match:
-                channel_input = '@' + handle_match.group(1)
-            elif 'youtube.com/channel/' in channel_input:
-                channel_input = channel_input.split('/channel/')[-1].split('/')[0]
-            
-            # 2. Resolve Handle to Channel ID
-            channel_id = channel_input
-            if channel_input.startswith('@'):
-                request = self.youtube.search().list(
-                    part="snippet",
-                    q=channel_input,
-                    type="channel",
-                    maxResults=1
-                )
-                response = request.execute()
-                if 'items' not in response:
-                     raise ValueError(f"API Error: 'items' key missing in search response. Response: {response}")
-                if not response['items']:
-                    raise ValueError(f"Channel handle '{channel_input}' not found.")
-                channel_id = response['items'][0]['snippet']['channelId']
-
-            # 3. Get Channel Details (Uploads Playlist ID)
-            request = self.youtube.channels().list(
-                part="contentDetails,snippet",
-                id=channel_id
+        # 1. Parse Input (Handle URL or ID)
+        channel_input = channel_id_or_handle.strip()
+
+        # Regex to extract handle from URL
+        handle_match = re.search(r'(?:https?://)?(?:www\.)?youtube\.com/(?:@)([a-zA-Z0-9_.-]+)', channel_input)
+        if handle_match:
+            channel_input = '@' + handle_match.group(1)
+        elif 'youtube.com/channel/' in channel_input:
+            channel_input = channel_input.split('/channel/')[-1].split('/')[0]
+
+        # 2. Resolve Handle to Channel ID
+        channel_id = channel_input
+        if channel_input.startswith('@'):
+            request = self.youtube.search().list(
+                part="snippet",
+                q=channel_input,
+                type="channel",
+                maxResults=1
             )
-            response = request.execute()
-            
+            response = self.execute(request)
             if 'items' not in response:
-                 raise ValueError(f"API Error: 'items' key missing in channels response. Response: {response}")
-            
+                 raise ValueError(f"API Error: 'items' key missing in search response. Response: {response}")
             if not response['items']:
-                raise ValueError(f"Channel ID '{channel_id}' not found.")
+                raise ValueError(f"Channel handle '{channel_input}' not found.")
+            channel_id = response['items'][0]['snippet']['channelId']
 
-            uploads_playlist_id = response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-            channel_title = response['items'][0]['snippet']['title']
+        # 3. Get Channel Details (Uploads Playlist ID)
+        request = self.youtube.channels().list(
+            part="contentDetails,snippet",
+            id=channel_id
+        )
+        response = self.execute(request)
+
+        if 'items' not in response:
+             raise ValueError(f"API Error: 'items' key missing in channels response. Response: {response}")
+
+        if not response['items']:
+            raise ValueError(f"Channel ID '{channel_id}' not found.")
+
+        uploads_playlist_id = response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+        channel_title = response['items'][0]['snippet']['title']
+        return uploads_playlist_id, channel_title
+
+    def iter_playlist_pages(self, playlist_id, channel_title, token=None):
+        """
+        Yields one list of video dicts per playlist page, newest first. A
+        CancelToken stops it (with Cancelled) before the next request.
+        """
+        next_page_token = None
+
+        while True:
+            if token:
+                token.check()
+            pl_request = self.youtube.playlistItems().list(
+                part="snippet,contentDetails",
+                playlistId=playlist_id,
+                maxResults=50, # Max allowed by API
+                pageToken=next_page_token
+            )
+            pl_response = self.execute(pl_request)
 
-            # 4. Fetch All Playlist Items
             videos = []
-            next_page_token = None
-            
-            while True:
-                pl_request = self.youtube.playlistItems().list(
-                    part="snippet,contentDetails",
-                    playlistId=uploads_playlist_id,
-                    maxResults=50, # Max allowed by API
-                    pageToken=next_page_token
-                )
-                pl_response = pl_request.execute()
-
-                for item in pl_response['items']:
-                    video_id = item['contentDetails']['videoId']
-                    title = item['snippet']['title']
-                    published_at = item['snippet']['publishedAt']
-                    thumbnail = item['snippet']['thumbnails'].get('high', {}).get('url')
-                    
-                    videos.append({
-                        'id': video_id,
-                        'title': title,
-                        'published_at': published_at,
-                        'thumbnail': thumbnail,
-                        'channel': channel_title
-                    })
-
-                next_page_token = pl_response.get('nextPageToken')
-                if not next_page_token:
-                    break
-            
-            return videos
-
-        except Exception as e:
-            raise e
-
-        except Exception as e:
-            raise e
+            for item in pl_response['items']:
+                video_id = item['contentDetails']['videoId']
+                title = item['snippet']['title']
+                published_at = item['snippet']['publishedAt']
+                thumbnails = item['snippet']['thumbnails']
+                thumbnail = thumbnails.get('high', {}).get('url')
+
+                videos.append({
+                    'id': video_id,
+                    'title': title,
+                    'published_at': published_at,
+                    'thumbnail': thumbnail,
+                    'thumbnails': thumbnails,
+                    'channel': channel_title
+                })
+            yield videos
+
+            next_page_token = pl_response.get('nextPageToken')
+            if not next_page_token:
+                break
+
+    def get_channel_videos(self, channel_id_or_handle, token=None):
+        """
+        Fetches ALL videos from a channel's 'uploads' playlist.
+        Returns a VideoCatalog with the video details.
+        """
+        uploads_playlist_id, channel_title = self.resolve_uploads_playlist(channel_id_or_handle)
+
+        # 4. Fetch All Playlist Items (page dicts are folded into the column store)
+        videos = VideoCatalog()
+        for page in self.iter_playlist_pages(uploads_playlist_id, channel_title, token):
+            videos.extend(page)
+        return videos
+
+    def get_new_uploads(self, channel_id_or_handle, since_published_at):
+        """
+        Returns videos published after since_published_at (ISO string), newest
+        first. Stops paging at the first older video, so an unchanged channel
+        costs a couple of 304 responses.
+        """
+        uploads_playlist_id, channel_title = self.resolve_uploads_playlist(channel_id_or_handle)
+
+        new_videos = []
+        for page in self.iter_playlist_pages(uploads_playlist_id, channel_title):
+            for video in page:
+                if since_published_at and video['published_at'] <= since_published_at:
+                    return new_videos
+                new_videos.append(video)
+            if not since_published_at:
+                break # First poll only needs the latest upload
+        return new_videos
 
 if __name__ == "__main__":
     # Test
     yt = YouTubeManager()
     # Replace with a valid ID for testing if key is present
-    # print(yt.get_channel_videos("UC_x5XG1OV2P6uZZ5FSM9Ttw")) 
+    # print(yt.get_channel_videos("UC_x5XG1OV2P6uZZ5FSM9Ttw"))
     pass